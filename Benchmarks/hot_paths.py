@@ -0,0 +1,264 @@
+# hot_paths.py
+# Microbenchmarks for the NEAT hot paths, with baselines and regression checks.
+#
+# Builds synthetic genomes of several sizes (inputs, hidden nodes, connection density,
+# share of recurrent connections) and times Network.run, Network.copy, Crossover,
+# Mutate.mutate and parent selection on each, plus whole generations (Population.step)
+# at several population sizes. Every benchmark reports ops/sec and the peak memory
+# allocated by one operation (tracemalloc).
+#
+#   python Benchmarks/hot_paths.py --save Benchmarks/baseline.json      # record a baseline
+#   python Benchmarks/hot_paths.py --compare Benchmarks/baseline.json   # fail on regressions
+#
+# Baselines are only comparable on the same machine, so none is committed.
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from NEAT.Network import Network
+from NEAT.Node import Node, NodeType
+from NEAT.Connection import Connection
+from NEAT.Activations import ActivationFunctions
+from NEAT.InnovationTracker import InnovationTracker
+from NEAT.Crossover import Crossover
+from NEAT.Mutate import Mutate
+from NEAT.Population import Population
+from NEAT.PopulationEvaluator import PopulationEvaluator
+
+# name -> (inputs, hidden nodes, outputs, connection density, recurrent share)
+GENOME_SIZES = {
+    "small": (2, 4, 1, 0.5, 0.0),
+    "medium": (8, 40, 2, 0.2, 0.0),
+    "medium-recurrent": (8, 40, 2, 0.2, 0.1),
+    "large": (32, 200, 4, 0.05, 0.0),
+}
+QUICK_SIZES = ["small", "medium-recurrent"]
+POPULATION_SIZES = [50, 200, 1000]
+QUICK_POPULATION_SIZES = [50, 200]
+
+ACTIVATIONS = [ActivationFunctions.Sigmoid, ActivationFunctions.ReLu, ActivationFunctions.TanH]
+
+def make_network(n_in: int, n_hidden: int, n_out: int, density: float, recurrence: float, rng) -> Network:
+    """
+    Build a random network.
+
+    Every feed-forward connection (input or hidden -> later hidden or output) exists with
+    probability `density`. On top of that, recurrence * (number of forward connections)
+    connections point backwards (to an earlier or the same hidden/output node).
+    """
+    nodes = [Node(i + 1, NodeType.INPUT, 0.0) for i in range(n_in)]
+    nodes += [Node(n_in + i + 1, NodeType.OUTPUT, 0.0, ActivationFunctions.TanH) for i in range(n_out)]
+    nodes += [Node(n_in + n_out + i + 1, NodeType.HIDDEN, float(rng.uniform(-1, 1)),
+                   ACTIVATIONS[rng.integers(len(ACTIVATIONS))]) for i in range(n_hidden)]
+
+    inputs, outputs, hidden = nodes[:n_in], nodes[n_in:n_in + n_out], nodes[n_in + n_out:]
+    rank = {node.id: r for r, node in enumerate(inputs + hidden + outputs)}
+    sources = inputs + hidden
+    targets = hidden + outputs
+
+    edges = [(s, d) for s in sources for d in targets if rank[s.id] < rank[d.id] and rng.random() < density]
+    # Keep every output reachable so no benchmark runs on a network without a path through it
+    for d in outputs:
+        if not any(e[1] is d for e in edges):
+            edges.append((inputs[rng.integers(n_in)], d))
+
+    backward = [(s, d) for s in targets for d in targets if rank[s.id] >= rank[d.id]]
+    for k in rng.choice(len(backward), size=min(len(backward), int(recurrence * len(edges))), replace=False) if backward else []:
+        edges.append(backward[k])
+
+    conns = [Connection(i + 1, float(rng.normal()), s, d) for i, (s, d) in enumerate(edges)]
+    return Network(nodes, conns)
+
+def measure(make, min_time: float) -> dict:
+    """
+    Time a benchmark.
+
+    Args:
+        make: Called as make(n), untimed. Returns a function that performs n operations.
+        min_time (float): Grow n until one timed call takes at least this many seconds.
+
+    Returns:
+        dict: ops_per_sec, and peak_kib, the peak memory allocated while performing one operation.
+    """
+    n = 1
+    while True:
+        run = make(n)
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        n = max(n * 2, int(n * min_time / max(elapsed, 1e-9) * 1.2))
+
+    # Best of three at the final n, like timeit.repeat
+    for _ in range(2):
+        run = make(n)
+        start = time.perf_counter()
+        run()
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    run = make(1)
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"ops_per_sec": n / elapsed, "peak_kib": peak / 1024}
+
+def genome_benchmarks(size: str, seed: int) -> dict:
+    """name -> make(n) for every benchmark on one genome size."""
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+    n_in, n_hidden, n_out, density, recurrence = GENOME_SIZES[size]
+
+    network = make_network(n_in, n_hidden, n_out, density, recurrence, rng)
+    tracker = InnovationTracker()
+    tracker.register_network(network)
+    network.fitness = 1.0
+
+    other = network.copy()
+    mutate = Mutate(other, tracker)
+    for _ in range(10):
+        mutate.mutate(1.0)
+    other.fitness = 0.5
+    crossover = Crossover(seed=seed)
+    values = rng.random(n_in).tolist()
+
+    def run(n):
+        def ops():
+            for node, value in zip(network.nodes[:n_in], values):
+                node.value = value
+            for _ in range(n):
+                network.run()
+        return ops
+
+    def copy(n):
+        def ops():
+            for _ in range(n):
+                network.copy()
+        return ops
+
+    def cross(n):
+        def ops():
+            for _ in range(n):
+                crossover.Crossover(network, other)
+        return ops
+
+    def mutate_(n):
+        copies = [network.copy() for _ in range(n)]  # Mutations change the network, so every op gets a fresh one
+        def ops():
+            for copied in copies:
+                Mutate(copied, tracker).mutate(1.0)
+        return ops
+
+    return {"network.run": run, "network.copy": copy, "crossover": cross, "mutate": mutate_}
+
+def xor_evaluator() -> PopulationEvaluator:
+    inputs = np.array([[0, 0], [0, 1], [1, 0], [1, 1]], dtype=float)
+    expected = np.array([0, 1, 1, 0], dtype=float)
+    return PopulationEvaluator(inputs, lambda outputs: -((outputs[:, :, 0] - expected) ** 2).sum(axis=1))
+
+def population_benchmarks(size: int, seed: int) -> dict:
+    """name -> make(n) for the population-level benchmarks at one population size."""
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+    template = make_network(2, 1, 1, 1.0, 0.0, rng)
+
+    def select(n):
+        population = Population(template, evaluator=xor_evaluator(), size=size, seed=seed)
+        fitness = rng.random(size)
+        def ops():
+            for _ in range(n):
+                population.select_pairs(population.genomes, fitness, size)
+        return ops
+
+    def generation(n):
+        random.seed(seed)
+        population = Population(template, evaluator=xor_evaluator(), size=size, seed=seed)
+        population.step()  # Warm up: the first generation compiles every network
+        def ops():
+            for _ in range(n):
+                population.step()
+        return ops
+
+    return {"select_pairs": select, "population.step": generation}
+
+def run_suite(quick: bool, min_time: float, seed: int, only: str = None) -> dict:
+    results = {}
+    jobs = []
+    for size in (QUICK_SIZES if quick else GENOME_SIZES):
+        for name, make in genome_benchmarks(size, seed).items():
+            jobs.append((f"{name}/{size}", make, dict(zip(("inputs", "hidden", "outputs", "density", "recurrence"), GENOME_SIZES[size]))))
+    for size in (QUICK_POPULATION_SIZES if quick else POPULATION_SIZES):
+        for name, make in population_benchmarks(size, seed).items():
+            jobs.append((f"{name}/pop{size}", make, {"population": size}))
+
+    for key, make, params in jobs:
+        if only and only not in key:
+            continue
+        result = measure(make, min_time)
+        result["params"] = params
+        results[key] = result
+        print(f"{key:<36} {result['ops_per_sec']:>14,.1f} ops/s {result['peak_kib']:>12,.1f} KiB peak", flush=True)
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return (key, baseline ops/sec, ops/sec) for every benchmark that got slower than the tolerance allows."""
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get("results", {}).get(key)
+        if before is None:
+            continue
+        ratio = result["ops_per_sec"] / before["ops_per_sec"]
+        print(f"{key:<36} {ratio:>7.2f}x vs baseline")
+        if ratio < 1 - tolerance:
+            regressions.append((key, before["ops_per_sec"], result["ops_per_sec"]))
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time the NEAT hot paths and compare them to a baseline.")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against, fails on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before a benchmark counts as a regression")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds each timed run should at least take")
+    parser.add_argument("--quick", action="store_true", help="Only run a few sizes")
+    parser.add_argument("--only", help="Only run benchmarks whose name contains this string")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = run_suite(args.quick, args.min_time, args.seed, args.only)
+
+    if args.save:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "results": results,
+        }
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for key, before, after in regressions:
+            print(f"FAIL: {key} dropped from {before:,.1f} to {after:,.1f} ops/s")
+        if regressions:
+            return 1
+        print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
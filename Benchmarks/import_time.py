@@ -0,0 +1,65 @@
+# import_time.py
+# Import-time regression check for the headless NEAT core.
+#
+# Every worker process pays the cost of `import NEAT`, so this starts fresh interpreters,
+# measures the import with `python -X importtime`, and fails when the best run is over
+# budget or when a plotting library got pulled in at import time.
+#
+#   python Benchmarks/import_time.py --budget-ms 300 --runs 5
+import argparse
+import os
+import subprocess
+import sys
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Modules that must only be loaded when something is actually drawn
+PLOTTING_MODULES = ["matplotlib", "networkx", "plotly"]
+
+CHECK_SCRIPT = (
+    "import sys, NEAT; "
+    f"print(','.join(m for m in {PLOTTING_MODULES!r} if m in sys.modules))"
+)
+
+def measure_once() -> tuple:
+    """Import NEAT in a fresh interpreter, return (cumulative import time in ms, plotting modules loaded)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHECK_SCRIPT],
+        cwd=base_path, capture_output=True, text=True, check=True,
+    )
+
+    import_ms = None
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == "NEAT":
+            import_ms = int(parts[1]) / 1000
+
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return import_ms, loaded
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fail when importing the NEAT core gets too slow.")
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="Maximum allowed import time in milliseconds")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to measure (best run counts)")
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(args.runs):
+        import_ms, loaded = measure_once()
+        if loaded:
+            print(f"FAIL: importing NEAT loaded plotting modules: {', '.join(loaded)}")
+            return 1
+        timings.append(import_ms)
+
+    best = min(timings)
+    print(f"import NEAT: best {best:.1f} ms, worst {max(timings):.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+
+    if best > args.budget_ms:
+        print("FAIL: import time is over budget")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,10 @@
 # Activations.py
 import math
-from random import choices
+import random
+from bisect import bisect
+from itertools import accumulate
+
+import numpy as np
 
 class ActivationFunctions:
     @staticmethod
@@ -29,13 +33,88 @@ class ActivationFunctions:
         return math.exp(-x**2)
 
     @staticmethod
-    def random_activation():
-        activations = [
-            ActivationFunctions.Sigmoid,
-            ActivationFunctions.ReLu,
-            ActivationFunctions.TanH,
-            ActivationFunctions.Sine,
-            ActivationFunctions.Linear,
-            ActivationFunctions.Gaussian
-        ]
-        return choices(activations, weights=[0.8, 0.8, 0.8, 0.5, 0.4, 0.4])[0]
\ No newline at end of file
+    def random_activation(rng: random.Random = None):
+        """Draw one of the registered activations, by their `weight`, from `rng` (the global `random` by default)."""
+        activations, cum_weights, total = _random_table
+        draw = (rng or random).random()
+        return activations[bisect(cum_weights, draw * total, 0, len(cum_weights) - 1)].scalar
+
+class Activation:
+    """
+    A registered activation function.
+
+    Attributes:
+        id (int): Stable id, used in saved files and to group nodes in the batched evaluators.
+        name (str): Stable name, used by Network.encode() and the structure hash.
+        scalar: The function nodes store, float -> float.
+        vector: NumPy version of `scalar`, applied to whole arrays at once.
+        weight (float): Relative chance of random_activation() picking it, 0 to never pick it.
+    """
+    __slots__ = ("id", "name", "scalar", "vector", "weight")
+
+    def __init__(self, id: int, name: str, scalar, vector, weight: float):
+        self.id = id
+        self.name = name
+        self.scalar = scalar
+        self.vector = vector
+        self.weight = weight
+
+    def __repr__(self):
+        return f"Activation({self.id}, {self.name!r})"
+
+_registry = [None]  # id -> Activation, id 0 means "no activation"
+_by_name = {}
+_by_function = {}
+_random_table = ((), [], 0.0)  # (activations, cumulative weights, total weight) for random_activation()
+
+def register_activation(name: str, scalar, vector=None, weight: float = 0.0) -> Activation:
+    """
+    Add an activation to the registry.
+
+    Ids are handed out in registration order, so custom activations keep their id (and
+    stay loadable from saved files) as long as they are registered in the same order.
+
+    Args:
+        name (str): Unique name.
+        scalar: The function nodes use, float -> float.
+        vector: NumPy version of `scalar`. Defaults to np.vectorize(scalar), which works but is slow.
+        weight (float): Relative chance of random_activation() picking it.
+
+    Returns:
+        Activation: The registry entry.
+    """
+    global _random_table
+    if name in _by_name or scalar in _by_function:
+        raise ValueError(f"Activation {name!r} is already registered")
+
+    activation = Activation(len(_registry), name, scalar,
+                            vector if vector is not None else np.vectorize(scalar, otypes=[float]), weight)
+    _registry.append(activation)
+    _by_name[name] = activation
+    _by_function[scalar] = activation
+
+    # Precomputed once here instead of on every random_activation() call
+    weighted = tuple(a for a in _registry[1:] if a.weight > 0)
+    cum_weights = list(accumulate(a.weight for a in weighted))
+    _random_table = (weighted, cum_weights, cum_weights[-1] if cum_weights else 0.0)
+    return activation
+
+def get_activation(key):
+    """Look up a registered activation by id, name or scalar function. Returns None if it isn't registered."""
+    if isinstance(key, int):
+        return _registry[key] if 0 <= key < len(_registry) else None
+    if isinstance(key, str):
+        return _by_name.get(key)
+    return _by_function.get(key)
+
+def activation_names() -> tuple:
+    """Names of all registered activations, indexed by id (None for id 0)."""
+    return tuple(a.name if a is not None else None for a in _registry)
+
+# Built-in activations. Their ids are stored in saved genomes, so never reorder these.
+register_activation("Sigmoid", ActivationFunctions.Sigmoid, lambda x: 1 / (1 + np.exp(-x)), weight=0.8)
+register_activation("ReLu", ActivationFunctions.ReLu, lambda x: np.maximum(0, x), weight=0.8)
+register_activation("TanH", ActivationFunctions.TanH, np.tanh, weight=0.8)
+register_activation("Sine", ActivationFunctions.Sine, np.sin, weight=0.5)
+register_activation("Linear", ActivationFunctions.Linear, lambda x: x, weight=0.4)
+register_activation("Gaussian", ActivationFunctions.Gaussian, lambda x: np.exp(-x**2), weight=0.4)
@@ -0,0 +1,354 @@
+# Checkpoint.py
+from .Population import Population
+from .Genome import Genome
+from .Lineage import LineageLog
+from .FitnessCache import FitnessCache
+from .Crossover import Crossover
+from .Species import Species, Speciation
+from .GenomeIO import PopulationFile, save_population, _atomic_write
+from .Profiler import GenerationProfiler
+
+from collections import Counter, deque
+import os
+import pickle
+import queue
+import random
+import re
+import threading
+import numpy as np
+
+_MANIFEST = re.compile(r"checkpoint-(\d+)\.pkl$")
+
+class Checkpointer:
+    """
+    Periodic, incremental checkpoints of a Population that a run can be resumed from exactly.
+
+    A checkpoint is a small manifest (generation, settings, innovation tracker, RNG states,
+    statistics, species and where every genome is stored) plus one segment file with the
+    genomes that no earlier checkpoint stored yet. Genomes are keyed by (genome.id,
+    network.revision), so elites and other unchanged genomes are written once. Segment
+    files are population files (see GenomeIO), every file is written atomically, and files
+    that the newest checkpoints no longer refer to are deleted.
+
+    The expensive part (encoding and writing the genomes) runs on a background thread.
+    Only the state capture happens in the generation loop, so the genomes of a checkpoint
+    must not be changed in place afterwards (Population never does this, it only changes
+    new children).
+
+        checkpointer = Checkpointer("checkpoints", every=10)
+        population.run(1000, callback=checkpointer)
+        checkpointer.close()
+
+        # Later, after a crash
+        population = Checkpointer("checkpoints").restore(evaluator=evaluator)
+    """
+
+    def __init__(self, directory: str, every: int = 1, keep: int = 2):
+        """
+        Args:
+            directory (str): Directory for the checkpoint files, created if needed.
+            every (int): Write a checkpoint every `every` generations.
+            keep (int): Number of most recent checkpoints to keep.
+        """
+        self.directory = directory
+        self.every = every
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+
+        self._stored = {}  # (genome id, network revision) -> (segment, row)
+        self._segment_sizes = {}  # segment -> number of genomes in it
+        self._recent = deque(maxlen=keep)  # Keys used by the last `keep` checkpoints, the rest of _stored is dropped
+        self._next_segment = 1 + max((segment for segment in self._segments_on_disk()), default=0)
+        self._queue = queue.Queue(maxsize=2)
+        self._error = None
+        self._thread = None
+
+    def __call__(self, population: Population, fitness=None):
+        """Population.run() callback: checkpoint every `every` generations."""
+        if population.generation % self.every == 0:
+            self.save(population)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _segments_on_disk(self) -> list:
+        return [int(name[8:14]) for name in os.listdir(self.directory) if re.fullmatch(r"segment-\d{6}\.neatpop", name)]
+
+    def _manifests_on_disk(self) -> list:
+        return sorted(int(match[1]) for match in map(_MANIFEST.match, os.listdir(self.directory)) if match)
+
+    def save(self, population: Population):
+        """
+        Capture the state of `population` and queue it for writing.
+
+        Call this between generations (after Population.step()).
+        """
+        with population._phase("io"):
+            self._save(population)
+
+    def _save(self, population: Population):
+        self._raise_error()
+        if population.lineage is not None:
+            # The lineage file must hold every genome the checkpoint refers to
+            population.lineage.flush()
+
+        # Genomes the checkpoint refers to: the population, the best genome and the species representatives
+        genomes = list(population.genomes)
+        extra = [population.best_genome] if population.best_genome is not None else []
+        if population.speciation is not None:
+            extra += [species.representative for species in population.speciation.species]
+
+        all_genomes = genomes + extra
+        keys = [(genome.id, genome.network.revision) for genome in all_genomes]
+
+        # Compaction: genomes that are the last live ones in a mostly dead segment are written
+        # again, so the old segment can be deleted once no kept checkpoint refers to it
+        live = Counter(self._stored[key][0] for key in set(keys) if key in self._stored)
+        sparse = {segment for segment, count in live.items() if count * 4 < self._segment_sizes.get(segment, 0)}
+
+        segment = self._next_segment
+        new_genomes = []
+        new_fitness = []
+        refs = {}
+        for genome, key in zip(all_genomes, keys):
+            stored = self._stored.get(key)
+            if (stored is None or stored[0] in sparse) and key not in refs:
+                refs[key] = (segment, len(new_genomes))
+                new_genomes.append(genome)
+                new_fitness.append(genome.network.fitness)
+        if new_genomes:
+            self._segment_sizes[segment] = len(new_genomes)
+            self._next_segment += 1
+        self._stored.update(refs)
+
+        # Forget genomes that no kept checkpoint refers to
+        self._recent.append(set(keys))
+        live_keys = set().union(*self._recent)
+        if len(self._stored) > len(live_keys):
+            self._stored = {key: value for key, value in self._stored.items() if key in live_keys}
+            used = {segment for segment, _ in self._stored.values()}
+            self._segment_sizes = {segment: size for segment, size in self._segment_sizes.items() if segment in used}
+
+        def ref(genome):
+            return self._stored[(genome.id, genome.network.revision)]
+
+        speciation = None
+        if population.speciation is not None:
+            spec = population.speciation
+            speciation = {
+                "settings": (spec.compatibility_threshold, spec.c1, spec.c2, spec.c3, spec.normalize_threshold, spec.max_elements),
+                "next_id": spec._next_id,
+                "species": [(species.id, ref(species.representative), species.adjusted_fitness) for species in spec.species],
+            }
+
+        manifest = {
+            "generation": population.generation,
+            "settings": {
+                "size": population.size,
+                "elite_count": population.elite_count,
+                "mutation_rate": population.mutation_rate,
+                "selection": population.selection,
+                "tournament_size": population.tournament_size,
+            },
+            "fitness_cache_size": population.fitness_cache.max_size if population.fitness_cache is not None else None,
+            "cutoff": population.cutoff,
+            "genomes": [(ref(genome), list(genome.parent_ids), genome.species_id) for genome in genomes],
+            "best": (ref(population.best_genome), population.best_genome.network.fitness) if population.best_genome is not None else None,
+            "best_fitnesses": list(population.best_fitnesses),
+            "avg_fitnesses": list(population.avg_fitnesses),
+            "next_genome_id": Genome._next_id,
+            "tracker": pickle.dumps(population.tracker, protocol=pickle.HIGHEST_PROTOCOL),
+            "speciation": speciation,
+            "random_state": random.getstate(),
+            "rng_state": population.rng.bit_generator.state,
+            "crossover_rng_state": population.crossover.rng.bit_generator.state,
+            "py_rng_state": population.py_rng.getstate() if population.py_rng is not None else None,
+        }
+
+        self._start_thread()
+        self._queue.put((segment if new_genomes else None, new_genomes, new_fitness, manifest))
+
+    def _start_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="neat-checkpoint", daemon=True)
+            self._thread.start()
+
+    def _writer(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                if self._error is None:
+                    self._write(*job)
+            except BaseException as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _write(self, segment, genomes: list, fitness: list, manifest: dict):
+        if segment is not None:
+            save_population(genomes, self._path(f"segment-{segment:06d}.neatpop"), fitness)
+
+        data = pickle.dumps(manifest, protocol=pickle.HIGHEST_PROTOCOL)
+        _atomic_write(self._path(f"checkpoint-{manifest['generation']:06d}.pkl"), lambda f: f.write(data))
+        self._prune()
+
+    def _prune(self):
+        # Keep the newest manifests and the segments they refer to
+        manifests = self._manifests_on_disk()
+        for generation in manifests[:-self.keep]:
+            os.remove(self._path(f"checkpoint-{generation:06d}.pkl"))
+
+        used = set()
+        for generation in manifests[-self.keep:]:
+            with open(self._path(f"checkpoint-{generation:06d}.pkl"), "rb") as f:
+                manifest = pickle.load(f)
+            used.update(segment for (segment, _), _, _ in manifest["genomes"])
+            if manifest["best"] is not None:
+                used.add(manifest["best"][0][0])
+            if manifest["speciation"] is not None:
+                used.update(segment for _, (segment, _), _ in manifest["speciation"]["species"])
+
+        for segment in self._segments_on_disk():
+            if segment not in used and segment < self._next_segment:
+                os.remove(self._path(f"segment-{segment:06d}.neatpop"))
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Writing a checkpoint failed") from error
+
+    def wait(self):
+        """Block until every queued checkpoint is on disk."""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Write the queued checkpoints and stop the background thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def latest(self) -> int:
+        """Generation of the newest checkpoint on disk, None if there is none."""
+        manifests = self._manifests_on_disk()
+        return manifests[-1] if manifests else None
+
+    def restore(self, fitness_function=None, evaluator=None, generation: int = None, lineage: LineageLog = None,
+                profiler: GenerationProfiler = None) -> Population:
+        """
+        Rebuild the Population of a checkpoint, so that continuing it gives the same run
+        as if it had never stopped (given a deterministic fitness function).
+
+        This also restores the state of the global `random` module.
+
+        Args:
+            fitness_function: Passed on to the Population, like in Population().
+            evaluator: Passed on to the Population, like in Population().
+            generation (int): Checkpoint to restore, the newest one by default.
+            lineage (LineageLog): The run's lineage log, records of genomes created after the
+                                  checkpoint are dropped from it before the run continues.
+            profiler (GenerationProfiler): Passed on to the Population, like in Population().
+
+        Returns:
+            Population: The restored population, ready for Population.run().
+        """
+        if fitness_function is None and evaluator is None:
+            raise ValueError("Either a fitness_function or an evaluator is required")
+        self.wait()
+
+        if generation is None:
+            generation = self.latest()
+            if generation is None:
+                raise FileNotFoundError(f"No checkpoint found in {self.directory}")
+        with open(self._path(f"checkpoint-{generation:06d}.pkl"), "rb") as f:
+            manifest = pickle.load(f)
+
+        tracker = pickle.loads(manifest["tracker"])
+        files = {}
+        loaded = {}
+
+        def load(ref):
+            # Genomes referenced more than once (e.g. elites that are also the best genome) are decoded once
+            if ref not in loaded:
+                segment, row = ref
+                if segment not in files:
+                    files[segment] = PopulationFile(self._path(f"segment-{segment:06d}.neatpop"))
+                    self._segment_sizes[segment] = len(files[segment])
+                genome = files[segment].genome(row)
+                genome.mutator.tracker = tracker
+                genome.mutator.rng = population.py_rng
+                loaded[ref] = genome
+                # Restored networks get new revisions, map them to the rows they came from
+                self._stored[(genome.id, genome.network.revision)] = ref
+            return loaded[ref]
+
+        population = Population.__new__(Population)
+        population.fitness_function = fitness_function
+        population.evaluator = evaluator
+        for name, value in manifest["settings"].items():
+            setattr(population, name, value)
+
+        # The cache itself isn't saved, it only saves time and refills as the run goes on
+        cache_size = manifest["fitness_cache_size"]
+        population.fitness_cache = FitnessCache(cache_size) if cache_size is not None else None
+
+        population.rng = np.random.default_rng()
+        population.rng.bit_generator.state = manifest["rng_state"]
+        population.crossover = Crossover()
+        population.crossover.rng.bit_generator.state = manifest["crossover_rng_state"]
+        # Checkpoints written before Population had its own mutation generator used the global one
+        population.py_rng = None
+        if manifest.get("py_rng_state") is not None:
+            population.py_rng = random.Random()
+            population.py_rng.setstate(manifest["py_rng_state"])
+        population.tracker = tracker
+
+        population.generation = manifest["generation"]
+        population.genomes = []
+        for ref, parent_ids, species_id in manifest["genomes"]:
+            # Every entry gets its own Genome object, like the list that was saved
+            genome = load(ref).copy() if ref in loaded else load(ref)
+            genome.parent_ids = parent_ids
+            genome.species_id = species_id
+            population.genomes.append(genome)
+
+        population.best_genome = None
+        if manifest["best"] is not None:
+            ref, fitness = manifest["best"]
+            population.best_genome = load(ref)
+            population.best_genome.network.fitness = fitness
+        population.best_fitnesses = manifest["best_fitnesses"]
+        population.avg_fitnesses = manifest["avg_fitnesses"]
+        # Continue with the genome ids the original run would have used
+        Genome._next_id = max(Genome._next_id, manifest["next_genome_id"])
+        population.lineage = lineage
+        if lineage is not None:
+            lineage.truncate(manifest["next_genome_id"])
+        population.profiler = profiler
+        population.cutoff = manifest.get("cutoff")
+
+        population.speciation = None
+        if manifest["speciation"] is not None:
+            state = manifest["speciation"]
+            population.speciation = Speciation(*state["settings"])
+            population.speciation._next_id = state["next_id"]
+            for species_id, ref, adjusted_fitness in state["species"]:
+                species = Species(species_id, load(ref))
+                species.adjusted_fitness = adjusted_fitness
+                population.speciation.species.append(species)
+
+        self._recent.clear()
+        self._recent.append(set(key for key in self._stored if self._stored[key] in loaded))
+
+        random.setstate(manifest["random_state"])
+        return population
@@ -0,0 +1,138 @@
+# CodeGen.py
+import math
+
+from .Activations import ActivationFunctions
+from .CompiledNetwork import CompiledNetwork, vectorize_activation
+
+import numpy as np
+
+# Inlined built-in activations, "{v}" is the variable that holds the node's total
+_SCALAR_TEMPLATES = {
+    ActivationFunctions.Sigmoid: "1 / (1 + exp(-{v}))",
+    ActivationFunctions.ReLu: "{v} if {v} > 0 else 0",
+    ActivationFunctions.TanH: "tanh({v})",
+    ActivationFunctions.Sine: "sin({v})",
+    ActivationFunctions.Linear: None,
+    ActivationFunctions.Gaussian: "exp(-{v}**2)",
+}
+_VECTOR_TEMPLATES = {
+    ActivationFunctions.Sigmoid: "1 / (1 + exp(-{v}))",
+    ActivationFunctions.ReLu: "maximum(0, {v})",
+    ActivationFunctions.TanH: "tanh({v})",
+    ActivationFunctions.Sine: "sin({v})",
+    ActivationFunctions.Linear: None,
+    ActivationFunctions.Gaussian: "exp(-{v}**2)",
+}
+
+def _live_nodes(plan: CompiledNetwork) -> set:
+    """Node indices the outputs depend on, every other node can be left out of the generated code."""
+    sources = {}
+    for s, d in zip(plan.src, plan.dst):
+        sources.setdefault(d, []).append(s)
+    live = set(plan.output_idx)
+    stack = list(plan.output_idx)
+    while stack:
+        for s in sources.get(stack.pop(), ()):
+            if s not in live:
+                live.add(s)
+                stack.append(s)
+    return live
+
+def generate_source(plan: CompiledNetwork, vectorized: bool = False, name: str = "forward"):
+    """
+    Generate straight-line Python source for one forward pass of a plan.
+
+    Weights and biases are written as constants and the built-in activations are
+    inlined. Edges are summed in the same order as the plan does, so the generated
+    function returns exactly what CompiledNetwork.activate() (or evaluate_batch() for
+    the vectorized variant) returns. Nodes the outputs don't depend on are left out.
+
+    Args:
+        plan (CompiledNetwork): The execution plan, see Network.compile().
+        vectorized (bool): Generate the NumPy variant, taking [B, n_in] and returning [B, n_out].
+        name (str): Name of the generated function.
+
+    Returns:
+        tuple: (source, namespace), the namespace holds the names the source refers to.
+    """
+    templates = _VECTOR_TEMPLATES if vectorized else _SCALAR_TEMPLATES
+    if vectorized:
+        namespace = {"np": np, "exp": np.exp, "tanh": np.tanh, "sin": np.sin, "maximum": np.maximum}
+    else:
+        namespace = {"exp": math.exp, "tanh": math.tanh, "sin": math.sin}
+
+    def constant(value: float) -> str:
+        if math.isfinite(value):
+            return repr(float(value))
+        key = f"_c{len(namespace)}"
+        namespace[key] = float(value)
+        return key
+
+    def plus(value: float) -> str:
+        # a + -b and a - b are the same IEEE operation, the latter just reads better
+        return f" - {constant(-value)}" if value < 0 else f" + {constant(value)}"
+
+    def activation(act, v: str) -> list:
+        if act is None:
+            return []
+        if act in templates:
+            template = templates[act]
+            return [] if template is None else [f"{v} = {template.format(v=v)}"]
+        key = f"_a{plan.activations.index(act)}"
+        namespace[key] = vectorize_activation(act) if vectorized else act
+        return [f"{v} = {key}({v})"]
+
+    live = _live_nodes(plan)
+    lines = []
+
+    # Input nodes
+    n_in = len(plan.input_idx)
+    if vectorized:
+        lines.append("x = np.asarray(inputs, dtype=float)")
+        lines.append(f"if x.ndim != 2 or x.shape[1] != {n_in}:")
+        lines.append(f"    raise ValueError(f\"Expected inputs of shape [B, {n_in}], got {{x.shape}}\")")
+        inputs = [f"x[:, {col}]" for col in range(n_in)]
+    else:
+        inputs = [f"x{col}" for col in range(n_in)]
+        lines.append(f"{', '.join(inputs)}{',' if n_in == 1 else ''} = inputs" if n_in else "() = inputs")
+
+    for col, i in enumerate(plan.input_idx):
+        if i not in live:
+            continue
+        bias = plan.bias[i]
+        lines.append(f"v{i} = {inputs[col]}" + (plus(bias) if bias else ""))
+        lines.extend(activation(plan.activations[plan.act_id[i]], f"v{i}"))
+
+    # Every other node, in plan order
+    e = 0
+    for i, end in zip(plan.order, plan.edge_end):
+        terms = [f"v{plan.src[k]} * {constant(plan.weight[k])}" for k in range(e, end)]
+        e = end
+        if i not in live:
+            continue
+        bias = plan.bias[i]
+        if not terms:
+            terms = ["np.zeros(x.shape[0])" if vectorized else "0.0"]
+        total = " + ".join(terms) + (plus(bias) if bias else "")
+        lines.append(f"v{i} = {total}")
+        lines.extend(activation(plan.activations[plan.act_id[i]], f"v{i}"))
+
+    outputs = ", ".join(f"v{i}" for i in plan.output_idx)
+    if vectorized:
+        lines.append(f"return np.stack([{outputs}], axis=1)" if outputs else "return np.zeros((x.shape[0], 0))")
+        body = ["with np.errstate(over=\"ignore\"):"] + [f"    {line}" for line in lines]
+    else:
+        lines.append(f"return [{outputs}]")
+        body = lines
+
+    source = f"def {name}(inputs):\n" + "".join(f"    {line}\n" for line in body)
+    return source, namespace
+
+def generate_function(plan: CompiledNetwork, vectorized: bool = False):
+    """Generate and compile the forward pass of a plan (see generate_source), returning the function."""
+    source, namespace = generate_source(plan, vectorized)
+    code = compile(source, f"<neat-codegen-{id(plan):x}>", "exec")
+    exec(code, namespace)
+    function = namespace["forward"]
+    function.source = source
+    return function
@@ -0,0 +1,382 @@
+# CompiledNetwork.py
+from collections import deque
+import heapq
+
+from .Node import INPUT, OUTPUT
+from .Activations import get_activation
+
+import numpy as np
+
+def vectorize_activation(act):
+    """Return the NumPy version of an activation, falling back to np.vectorize for unregistered ones."""
+    if act is None:
+        return None
+    registered = get_activation(act)
+    if registered is not None:
+        return registered.vector
+    return np.vectorize(act, otypes=[float])
+
+class CompiledNetwork:
+    """
+    A flat execution plan for a Network.
+
+    The enabled graph is sorted topologically once and stored as flat arrays, so a
+    forward pass is a single linear sweep over the edges instead of a recursive walk
+    over the object graph. Every node is activated exactly once, after all of its
+    inputs have been summed.
+
+    Layout:
+        node_ids:   node id of every node, in network order
+        bias:       per-node bias
+        act_id:     per-node index into `activations` (0 means no activation)
+        order:      non-input node indices in evaluation order
+        src, dst:   per-edge source and target node indices, grouped by target
+        weight:     per-edge weight
+        edge_end:   for each entry of `order`, the end offset of its edges in src/dst/weight
+        level:      per-node depth, 0 for inputs and 1 + the deepest source for everything else
+
+    Connections that close a cycle are not part of the feed-forward sweep, they are
+    kept in `recurrent` as (src, dst, weight) tuples instead.
+    """
+
+    def __init__(self, network):
+        nodes = network.nodes
+        index = {node.id: i for i, node in enumerate(nodes)}
+        n = len(nodes)
+
+        self.node_ids = [node.id for node in nodes]
+        self.bias = [node.bias for node in nodes]
+        self.input_idx = [i for i, node in enumerate(nodes) if node.ntype is INPUT]
+        self.output_idx = [i for i, node in enumerate(nodes) if node.ntype is OUTPUT]
+
+        # Activation table, id 0 is reserved for "no activation"
+        self.activations = [None]
+        self.act_id = []
+        for node in nodes:
+            if node.activation is None:
+                self.act_id.append(0)
+                continue
+            if node.activation not in self.activations:
+                self.activations.append(node.activation)
+            self.act_id.append(self.activations.index(node.activation))
+
+        # Collect enabled edges, skipping connections whose nodes are not part of this network
+        edges = []
+        for conn in network.conns:
+            if not conn.enabled:
+                continue
+            s = index.get(conn.from_node.id)
+            d = index.get(conn.to_node.id)
+            if s is None or d is None:
+                continue
+            edges.append((s, d, conn.weight))
+
+        position = self._topological_positions(n, edges)
+
+        forward = [e for e in edges if position[e[0]] < position[e[1]]]
+        self.recurrent = [e for e in edges if position[e[0]] >= position[e[1]]]
+        forward.sort(key=lambda e: position[e[1]])
+
+        inputs = set(self.input_idx)
+        self.order = sorted((i for i in range(n) if i not in inputs), key=lambda i: position[i])
+        self.src = [e[0] for e in forward]
+        self.dst = [e[1] for e in forward]
+        self.weight = [e[2] for e in forward]
+
+        # End offset of each node's incoming edges (edges are grouped by target in `order`)
+        self.edge_end = []
+        e = 0
+        for i in self.order:
+            while e < len(self.dst) and self.dst[e] == i:
+                e += 1
+            self.edge_end.append(e)
+
+        # Nodes on the same level never feed each other, so they can be evaluated together
+        self.level = [0] * n
+        start = 0
+        for i, end in zip(self.order, self.edge_end):
+            self.level[i] = 1 + max((self.level[self.src[e]] for e in range(start, end)), default=0)
+            start = end
+
+        self._steps = [(i, end, self.bias[i], self.activations[self.act_id[i]]) for i, end in zip(self.order, self.edge_end)]
+        self._inputs = [(i, self.bias[i], self.activations[self.act_id[i]]) for i in self.input_idx]
+        self._vector_activations = None  # Built on the first evaluate_batch() call
+        self._batch_levels = None
+        self.generated = {}  # vectorized flag -> generated forward function, see Network.codegen()
+
+    @staticmethod
+    def _components(n: int, out_adj: list) -> list:
+        """Strongly connected components (Tarjan, iterative). Returns the component number of every node."""
+        component = [-1] * n
+        low = [0] * n
+        number = [-1] * n
+        stack = []
+        on_stack = [False] * n
+        counter = 0
+        count = 0
+
+        for root in range(n):
+            if number[root] >= 0:
+                continue
+            work = [(root, 0)]
+            while work:
+                i, k = work.pop()
+                if k == 0:
+                    number[i] = low[i] = counter
+                    counter += 1
+                    stack.append(i)
+                    on_stack[i] = True
+                elif k <= len(out_adj[i]):
+                    low[i] = min(low[i], low[out_adj[i][k - 1]])  # Returning from a child
+                while k < len(out_adj[i]):
+                    d = out_adj[i][k]
+                    k += 1
+                    if number[d] < 0:
+                        work.append((i, k))
+                        work.append((d, 0))
+                        break
+                    if on_stack[d]:
+                        low[i] = min(low[i], number[d])
+                else:
+                    if low[i] == number[i]:
+                        while True:
+                            d = stack.pop()
+                            on_stack[d] = False
+                            component[d] = count
+                            if d == i:
+                                break
+                        count += 1
+        return component
+
+    @staticmethod
+    def _topological_positions(n: int, edges: list) -> list:
+        """
+        Order the nodes so every edge that isn't part of a cycle points forward.
+
+        Acyclic graphs are sorted with Kahn's algorithm. Otherwise the strongly connected
+        components are placed in topological order (lowest node index first among the
+        ready ones, so the result does not depend on the order inputs were fed in).
+        Inside a component, a cycle is broken at a node that is entered from an already
+        placed node (or the lowest-index one), so only an edge inside the cycle ends up
+        pointing backwards.
+        """
+        out_adj = [[] for _ in range(n)]
+        in_adj = [[] for _ in range(n)]
+        for s, d, _ in edges:
+            if s != d:
+                out_adj[s].append(d)
+                in_adj[d].append(s)
+
+        # Acyclic networks, the common case, are done after one plain Kahn pass
+        indegree = [len(sources) for sources in in_adj]
+        ready = deque(i for i in range(n) if indegree[i] == 0)
+        position = [0] * n
+        count = 0
+        while ready:
+            i = ready.popleft()
+            position[i] = count
+            count += 1
+            for d in out_adj[i]:
+                indegree[d] -= 1
+                if indegree[d] == 0:
+                    ready.append(d)
+        if count == n:
+            return position
+
+        component = CompiledNetwork._components(n, out_adj)
+        members = [[] for _ in range(max(component, default=-1) + 1)]
+        for i in range(n):
+            members[component[i]].append(i)
+
+        # Kahn's algorithm over the condensed graph
+        comp_indegree = [0] * len(members)
+        for s in range(n):
+            for d in out_adj[s]:
+                if component[s] != component[d]:
+                    comp_indegree[component[d]] += 1
+        ready = [(members[c][0], c) for c in range(len(members)) if comp_indegree[c] == 0]
+        heapq.heapify(ready)
+
+        placed = [False] * n
+        position = [0] * n
+        count = 0
+        while ready:
+            _, c = heapq.heappop(ready)
+            nodes = members[c]
+            if len(nodes) == 1:
+                position[nodes[0]] = count
+                placed[nodes[0]] = True
+                count += 1
+            else:
+                count = CompiledNetwork._place_cycle(nodes, c, component, in_adj, out_adj, placed, position, count)
+
+            for i in nodes:
+                for d in out_adj[i]:
+                    other = component[d]
+                    if other != c:
+                        comp_indegree[other] -= 1
+                        if comp_indegree[other] == 0:
+                            heapq.heappush(ready, (members[other][0], other))
+
+        return position
+
+    @staticmethod
+    def _place_cycle(nodes, c, component, in_adj, out_adj, placed, position, count) -> int:
+        """Kahn's algorithm inside component c, breaking cycles at entered nodes. Returns the next free position."""
+        indegree = {i: sum(component[s] == c for s in in_adj[i]) for i in nodes}
+        # Nodes entered from already placed nodes are where a cycle is broken first
+        entries = [i for i in nodes if any(placed[s] for s in in_adj[i])]
+        heapq.heapify(entries)
+        fallback = iter(nodes)
+        local = deque()
+        remaining = len(nodes)
+        while remaining:
+            if not local:
+                while entries and placed[entries[0]]:
+                    heapq.heappop(entries)
+                if entries:
+                    local.append(heapq.heappop(entries))
+                else:
+                    local.append(next(i for i in fallback if not placed[i]))
+            i = local.popleft()
+            if placed[i]:
+                continue
+            placed[i] = True
+            position[i] = count
+            count += 1
+            remaining -= 1
+            for d in out_adj[i]:
+                if component[d] == c and not placed[d]:
+                    heapq.heappush(entries, d)
+                    indegree[d] -= 1
+                    if indegree[d] == 0:
+                        local.append(d)
+        return count
+
+    def _forward(self, inputs):
+        sums = [0.0] * len(self.node_ids)
+        outs = [0.0] * len(self.node_ids)
+
+        for (i, bias, act), value in zip(self._inputs, inputs):
+            sums[i] = value
+            outs[i] = act(value + bias) if act else value + bias
+
+        src, weight = self.src, self.weight
+        e = 0
+        for i, end, bias, act in self._steps:
+            total = 0.0
+            while e < end:
+                total += outs[src[e]] * weight[e]
+                e += 1
+            sums[i] = total
+            outs[i] = act(total + bias) if act else total + bias
+
+        return sums, outs
+
+    def sweep(self, inputs) -> list:
+        """
+        Run one forward pass.
+
+        Args:
+            inputs: One value per input node, in network order.
+
+        Returns:
+            list: The summed (pre-bias, pre-activation) input of every node, in network order.
+                  For input nodes this is the value that was fed in.
+        """
+        return self._forward(inputs)[0]
+
+    def activate(self, inputs) -> list:
+        """Run one forward pass and return the activated values of the output nodes."""
+        outs = self._forward(inputs)[1]
+        return [outs[i] for i in self.output_idx]
+
+    def evaluate_batch(self, inputs) -> np.ndarray:
+        """
+        Run a whole batch of inputs through the plan, one NumPy vector per node.
+
+        Nodes are evaluated level by level (nodes on one level never feed each other),
+        with each activation applied once to all nodes of a level that use it. Every node
+        still sums its edges in the same order as sweep(), so the results match the
+        scalar path.
+
+        Args:
+            inputs: Array of shape [B, n_in], one row per case, columns in input node order.
+
+        Returns:
+            np.ndarray: Array of shape [B, n_out], columns in output node order.
+        """
+        x = np.asarray(inputs, dtype=float)
+        if x.ndim != 2 or x.shape[1] != len(self.input_idx):
+            raise ValueError(f"Expected inputs of shape [B, {len(self.input_idx)}], got {x.shape}")
+
+        if self._batch_levels is None:
+            self._batch_levels = self._build_batch_levels()
+
+        outs = np.zeros((len(self.node_ids), x.shape[0]))
+
+        with np.errstate(over="ignore"):
+            pre = x.T + self._input_bias
+            for act, rows, nodes in self._input_groups:
+                outs[nodes] = act(pre[rows]) if act else pre[rows]
+
+            for size, src, weight, starts, rows, bias, groups in self._batch_levels:
+                # Row-wise reduceat adds up every node's edges one after another, in sweep() order
+                contrib = np.add.reduceat(outs[src] * weight, starts, axis=0) if len(src) else None
+                if rows is None:
+                    total = contrib
+                else:
+                    total = np.zeros((size, x.shape[0]))
+                    if contrib is not None:
+                        total[rows] = contrib
+                pre = total + bias
+                for act, rows, group_nodes in groups:
+                    outs[group_nodes] = act(pre[rows]) if act else pre[rows]
+
+        return outs[self.output_idx].T
+
+    def _activation_groups(self, nodes: list) -> list:
+        """(vector activation, rows in `nodes`, node indices) for every activation used by `nodes`."""
+        if self._vector_activations is None:
+            self._vector_activations = [vectorize_activation(act) for act in self.activations]
+        by_act = {}
+        for row, i in enumerate(nodes):
+            by_act.setdefault(self.act_id[i], []).append(row)
+        nodes = np.asarray(nodes, dtype=np.intp)
+        return [(self._vector_activations[a], np.asarray(rows, dtype=np.intp), nodes[rows]) for a, rows in by_act.items()]
+
+    def _build_batch_levels(self) -> list:
+        """Group the plan by level for evaluate_batch(): nodes on a level never feed each other."""
+        self._input_bias = np.array([[self.bias[i]] for i in self.input_idx]).reshape(-1, 1)
+        self._input_groups = self._activation_groups(self.input_idx)
+
+        edges = {}  # node index -> its incoming edges, in sweep() order
+        start = 0
+        for i, end in zip(self.order, self.edge_end):
+            edges[i] = range(start, end)
+            start = end
+
+        by_level = {}
+        for i in self.order:
+            by_level.setdefault(self.level[i], []).append(i)
+
+        levels = []
+        for level in sorted(by_level):
+            nodes = by_level[level]
+            src, weight, starts, rows = [], [], [], []
+            for row, i in enumerate(nodes):
+                if len(edges[i]):
+                    starts.append(len(src))
+                    rows.append(row)
+                    src.extend(self.src[e] for e in edges[i])
+                    weight.extend([self.weight[e]] for e in edges[i])
+            levels.append((
+                len(nodes),
+                np.asarray(src, dtype=np.intp),
+                np.asarray(weight, dtype=float).reshape(-1, 1),
+                np.asarray(starts, dtype=np.intp),
+                None if len(rows) == len(nodes) else np.asarray(rows, dtype=np.intp),  # None: every node has edges
+                np.array([[self.bias[i]] for i in nodes]),
+                self._activation_groups(nodes),
+            ))
+        return levels
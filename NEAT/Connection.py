@@ -1,12 +1,17 @@
 # Connection.py
-from .Node import Node, NodeType
+from .Node import Node, NodeType, INPUT, HIDDEN, OUTPUT
 
 class Connection:
+    __slots__ = ("Innov", "from_node", "to_node", "weight", "enabled")
+
     def __init__(self, Innov: int, weight: float, from_node: Node, to_node: Node, enabled: bool = True):
+        from_type = from_node.ntype
+        to_type = to_node.ntype
+
         # Disallowed connections
-        if from_node.ntype == NodeType.OUTPUT and to_node.ntype == NodeType.INPUT:
+        if from_type is OUTPUT and to_type is INPUT:
             raise ValueError("Cannot connect Output to Input")
-        if from_node.ntype == NodeType.HIDDEN and to_node.ntype == NodeType.INPUT:
+        if from_type is HIDDEN and to_type is INPUT:
             raise ValueError("Cannot connect Hidden to Input")
         
         # Allowed connections:
@@ -14,13 +19,13 @@ class Connection:
         # Hidden -> Hidden, Hidden -> Output
         # Output -> Hidden (rare case)
         allowed = (
-            (from_node.ntype == NodeType.INPUT and to_node.ntype in {NodeType.HIDDEN, NodeType.OUTPUT}) or
-            (from_node.ntype == NodeType.HIDDEN and to_node.ntype in {NodeType.HIDDEN, NodeType.OUTPUT}) or
-            (from_node.ntype == NodeType.OUTPUT and to_node.ntype == NodeType.HIDDEN)  # Rare case
+            (from_type is INPUT and to_type is not INPUT) or
+            (from_type is HIDDEN and to_type is not INPUT) or
+            (from_type is OUTPUT and to_type is HIDDEN)  # Rare case
         )
 
         if not allowed:
-            raise ValueError(f"Invalid connection from {from_node.ntype.value} to {to_node.ntype.value}")
+            raise ValueError(f"Invalid connection from {from_type.value} to {to_type.value}")
 
         self.Innov = Innov  # Innovation number for tracking evolution (for NEAT-like algorithms)
         self.from_node = from_node
@@ -28,6 +33,17 @@ class Connection:
         self.weight = weight
         self.enabled = enabled
 
+    @classmethod
+    def _trusted(cls, Innov: int, weight: float, from_node: Node, to_node: Node, enabled: bool):
+        """Build a connection that is already known to be valid (e.g. a copy), skipping the rule checks."""
+        conn = cls.__new__(cls)
+        conn.Innov = Innov
+        conn.from_node = from_node
+        conn.to_node = to_node
+        conn.weight = weight
+        conn.enabled = enabled
+        return conn
+
     def forward(self):
         """Transfers the weighted value if the connection is enabled."""
         if self.enabled:
@@ -43,5 +59,7 @@ class Connection:
         """Returns the weighted input value before it's transferred."""
         return self.from_node.get_output() * self.weight
 
-    def copy(self):
-        return Connection(self.Innov, self.weight, self.from_node, self.to_node, self.enabled)
\ No newline at end of file
+    def copy(self, from_node: Node = None, to_node: Node = None):
+        """Copy the connection, optionally pointing it at (copies of) its nodes."""
+        return Connection._trusted(self.Innov, self.weight, from_node if from_node is not None else self.from_node,
+                                   to_node if to_node is not None else self.to_node, self.enabled)
\ No newline at end of file
@@ -1,150 +1,81 @@
 # Crossover.py
 from .Network import Network
-from .Node import Node, NodeType
-from .Connection import Connection
-from .Activations import ActivationFunctions
 
 import random
+import numpy as np
 
 class Crossover:
-    def __init__(self):
-        pass
-
-    def Crossover(self, parent_1:Network, parent_2:Network):
-        if parent_1.fitness > parent_2.fitness:
-            return self._crossover_instance_1(parent_1, parent_2)
-        elif parent_2.fitness > parent_1.fitness:
-            return self._crossover_instance_2(parent_1, parent_2)
-        else:
-            # If both parents have the same fitness, randomly choose one
-            return random.choice([self._crossover_instance_1(parent_1, parent_2), self._crossover_instance_2(parent_1, parent_2)])
-
-    def _crossover_instance_1(self, parent_1: Network, parent_2: Network):
-        """
-        This method performs crossover between two parent networks.
-        It now uses `_find_disjoint_excess_genes()` to identify genes.
+    def __init__(self, seed: int = None):
+        # NumPy generator for the per-gene draws. Seeded from `random` by default, so seeding
+        # `random` before creating the Crossover makes runs reproducible.
+        self.rng = np.random.default_rng(seed if seed is not None else random.getrandbits(64))
 
-        Args:
-            parent_1 (Network): The fitter parent.
-            parent_2 (Network): The less fit parent.
+    def Crossover(self, parent_1: Network, parent_2: Network):
+        """
+        Cross two parent networks. The fitter parent passes on its structure, if both have
+        the same fitness one of them is picked at random.
 
         Returns:
             Network: A new child network from the crossover process.
         """
+        return self.crossover_batch([(parent_1, parent_2)])[0]
 
-        # Step 1: Copy parent_1's nodes into child
-        child_nodes = [node.copy() for node in parent_1.nodes]
-        child_conns = []
-
-        # Step 2: Find disjoint & excess genes
-        disjoint, excess = self._find_disjoint_excess_genes(parent_1, parent_2)
-
-        # Step 3: Iterate through connections and perform crossover
-        i, j = 0, 0  # Pointers for parent_1 and parent_2 connection lists
-
-        while i < len(parent_1.conns) or j < len(parent_2.conns):
-            if i < len(parent_1.conns):
-                conn_1 = parent_1.conns[i]
-            else:
-                conn_1 = None
-
-            if j < len(parent_2.conns):
-                conn_2 = parent_2.conns[j]
-            else:
-                conn_2 = None
-
-            # Get current innovation number
-            innov_1 = conn_1.Innov if conn_1 else float('inf')
-            innov_2 = conn_2.Innov if conn_2 else float('inf')
-
-            if innov_1 < innov_2:
-                # conn_1 is disjoint or excess → inherit from fitter parent
-                if innov_1 in disjoint or innov_1 in excess:
-                    child_conns.append(conn_1.copy())
-                i += 1
-            elif innov_2 < innov_1:
-                # conn_2 is disjoint or excess → skip since it's from less fit parent
-                j += 1
-            else:
-                # Both parents have the gene → randomly pick one
-                chosen_conn = random.choice([conn_1, conn_2]).copy()
-                i += 1
-                j += 1
-
-                # Handle disabled connections (75% chance of staying disabled)
-                if not conn_1.enabled or (conn_2 and not conn_2.enabled):
-                    if random.random() < 0.75:
-                        chosen_conn.enabled = False
-
-                child_conns.append(chosen_conn)
-
-        # Step 4: Create and return the new child network
-        child = Network(nodes=child_nodes, conns=child_conns)
-        return child
-
-    def _crossover_instance_2(self, parent_1: Network, parent_2: Network):
+    def crossover_batch(self, pairs: list) -> list:
         """
-        This method performs crossover between two parent networks.
-        This version assumes parent_2 is more fit than parent_1.
+        Produce one child per (parent_1, parent_2) pair, drawing all random numbers in one call.
+
+        Both parents' genes are aligned on their innovation-sorted arrays in a single merge:
+            - Matching genes are inherited from either parent at random
+            - Disjoint and excess genes are inherited from the fitter parent only
+            - A matching gene that is disabled in either parent stays disabled 75% of the time
+
+        Child genes are shared with the parents (genes are never changed in place), only
+        connections that get disabled here are copied.
 
         Args:
-            parent_1 (Network): The less fit parent.
-            parent_2 (Network): The fitter parent.
+            pairs (list): List of (Network, Network) parent pairs.
 
         Returns:
-            Network: A new child network from the crossover process.
+            list: The child networks, in the same order as `pairs`.
         """
+        coins = self.rng.random(len(pairs))
+
+        ordered = []
+        aligned = []
+        for (parent_1, parent_2), coin in zip(pairs, coins):
+            if parent_2.fitness > parent_1.fitness or (parent_2.fitness == parent_1.fitness and coin < 0.5):
+                parent_1, parent_2 = parent_2, parent_1
+            ordered.append((parent_1, parent_2))
+
+            # Matching genes: positions in the fitter and the other parent's sorted arrays
+            _, fit_idx, other_idx = np.intersect1d(parent_1.gene_arrays()[0], parent_2.gene_arrays()[0], return_indices=True)
+            aligned.append((fit_idx, other_idx))
 
-        # Step 1: Copy parent_2's nodes into child
-        child_nodes = [node.copy() for node in parent_2.nodes]
-        child_conns = []
-
-        # Step 2: Find disjoint & excess genes
-        disjoint, excess = self._find_disjoint_excess_genes(parent_2, parent_1)
-
-        # Step 3: Iterate through connections and perform crossover
-        i, j = 0, 0  # Pointers for parent_2 and parent_1 connection lists
-
-        while i < len(parent_2.conns) or j < len(parent_1.conns):
-            if i < len(parent_2.conns):
-                conn_2 = parent_2.conns[i]
-            else:
-                conn_2 = None
-
-            if j < len(parent_1.conns):
-                conn_1 = parent_1.conns[j]
-            else:
-                conn_1 = None
-
-            # Get current innovation number
-            innov_2 = conn_2.Innov if conn_2 else float('inf')
-            innov_1 = conn_1.Innov if conn_1 else float('inf')
-
-            if innov_2 < innov_1:
-                # conn_2 is disjoint or excess → inherit from fitter parent
-                if innov_2 in disjoint or innov_2 in excess:
-                    child_conns.append(conn_2.copy())
-                i += 1
-            elif innov_1 < innov_2:
-                # conn_1 is disjoint or excess → skip since it's from less fit parent
-                j += 1
-            else:
-                # Both parents have the gene → randomly pick one
-                chosen_conn = random.choice([conn_1, conn_2]).copy()
-                i += 1
-                j += 1
-
-                # Handle disabled connections (75% chance of staying disabled)
-                if not conn_2.enabled or (conn_1 and not conn_1.enabled):
-                    if random.random() < 0.75:
-                        chosen_conn.enabled = False
-
-                child_conns.append(chosen_conn)
-
-        # Step 4: Create and return the new child network
-        child = Network(nodes=child_nodes, conns=child_conns)
-        return child
+        draws = self.rng.random((sum(len(fit_idx) for fit_idx, _ in aligned), 2))
 
+        children = []
+        offset = 0
+        for (fitter, other), (fit_idx, other_idx) in zip(ordered, aligned):
+            _, fit_enabled, _, fit_conns = fitter.gene_arrays()
+            _, other_enabled, _, other_conns = other.gene_arrays()
+            pick, keep_disabled = draws[offset:offset + len(fit_idx)].T
+            offset += len(fit_idx)
+
+            # Start from all of the fitter parent's genes, then swap in the other parent's matching genes
+            child_conns = fit_conns.copy()
+            from_other = pick < 0.5
+            child_conns[fit_idx[from_other]] = other_conns[other_idx[from_other]]
+
+            disable = (~fit_enabled[fit_idx] | ~other_enabled[other_idx]) & (keep_disabled < 0.75)
+            for k in fit_idx[disable]:
+                if child_conns[k].enabled:
+                    conn = child_conns[k].copy()
+                    conn.enabled = False
+                    child_conns[k] = conn
+
+            children.append(Network._trusted(list(fitter.nodes), child_conns.tolist()))
+
+        return children
 
     def _find_disjoint_excess_genes(self, parent_1: Network, parent_2: Network):
         """
@@ -159,31 +90,14 @@ class Crossover:
             tuple: A tuple containing two lists: disjoint and excess genes.
         """
 
-        disjoint = []
-        excess = []
+        innov_1 = parent_1.gene_arrays()[0]
+        innov_2 = parent_2.gene_arrays()[0]
 
-        # Get the innovation numbers of both parents
-        innov_1 = sorted(conn.Innov for conn in parent_1.conns)
-        innov_2 = sorted(conn.Innov for conn in parent_2.conns)
-
-        # print(f"Parent 1 Innovations: {innov_1}")
-        # print(f"Parent 2 Innovations: {innov_2}")
-
-        max_innov_1 = max(innov_1, default=0)
-        max_innov_2 = max(innov_2, default=0)
+        max_innov_1 = innov_1[-1] if len(innov_1) else 0
+        max_innov_2 = innov_2[-1] if len(innov_2) else 0
         max_common = min(max_innov_1, max_innov_2)
 
-        # Identify disjoint and excess genes
-        innov_set_1 = set(innov_1)
-        innov_set_2 = set(innov_2)
-
-        for innov in innov_set_1.symmetric_difference(innov_set_2):  
-            if innov > max_common:
-                excess.append(innov)
-            else:
-                disjoint.append(innov)
-        
-        # print(f"Disjoint Genes: {disjoint}")
-        # print(f"Excess Genes: {excess}")
+        # Genes present in only one parent are excess past the other parent's last gene, disjoint otherwise
+        unmatched = np.setxor1d(innov_1, innov_2)
 
-        return (disjoint, excess)
+        return (unmatched[unmatched <= max_common].tolist(), unmatched[unmatched > max_common].tolist())
@@ -0,0 +1,350 @@
+# DistributedEvaluator.py
+from .Network import Network
+from .FitnessCache import FitnessCache
+
+from collections import deque
+from multiprocessing.managers import BaseManager
+import itertools
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+
+class _TaskBoard:
+    """
+    The work queue, served by the coordinator through a multiprocessing manager.
+
+    Workers take tasks (chunks of encoded networks) and submit their fitnesses. Every
+    call counts as a sign of life; the tasks of a worker that hasn't been heard from for
+    `worker_timeout` seconds go back to the front of the queue for another worker.
+    """
+
+    def __init__(self, fitness_function, worker_timeout: float):
+        self._fitness_function = fitness_function
+        self._worker_timeout = worker_timeout
+        self._changed = threading.Condition()
+        self._pending = deque()  # (task id, encoded networks)
+        self._leased = {}  # task id -> (worker id, encoded networks)
+        self._results = {}  # task id -> fitnesses
+        self._errors = {}  # task id -> (worker id, traceback of the fitness function's exception)
+        self._outstanding = set()  # Task ids without a result yet
+        self._last_seen = {}  # worker id -> time of its last call
+        self._closed = False
+        self.requeued = 0
+
+    # Called by workers, through the manager
+
+    def settings(self) -> tuple:
+        """(fitness function, worker timeout), the fitness function is pickled by reference."""
+        return self._fitness_function, self._worker_timeout
+
+    def take(self, worker_id: str, max_tasks: int):
+        """Lease up to max_tasks tasks, None once the coordinator is closed."""
+        with self._changed:
+            self._last_seen[worker_id] = time.monotonic()
+            if self._closed:
+                return None
+            tasks = []
+            while self._pending and len(tasks) < max_tasks:
+                task_id, payload = self._pending.popleft()
+                if task_id in self._outstanding:  # Skip re-queued tasks the lost worker finished after all
+                    self._leased[task_id] = (worker_id, payload)
+                    tasks.append((task_id, payload))
+            return tasks
+
+    def submit(self, worker_id: str, task_id: int, fitnesses: list):
+        with self._changed:
+            self._last_seen[worker_id] = time.monotonic()
+            # A re-queued task can come back twice, the first result wins
+            if task_id in self._outstanding:
+                self._outstanding.discard(task_id)
+                self._leased.pop(task_id, None)
+                self._results[task_id] = fitnesses
+                self._changed.notify_all()
+
+    def fail(self, worker_id: str, task_id: int, error: str):
+        """Report that the fitness function raised on a task, `error` is the formatted traceback."""
+        with self._changed:
+            self._last_seen[worker_id] = time.monotonic()
+            if task_id in self._outstanding:
+                self._outstanding.discard(task_id)
+                self._leased.pop(task_id, None)
+                self._errors[task_id] = (worker_id, error)
+                self._changed.notify_all()
+
+    def heartbeat(self, worker_id: str):
+        with self._changed:
+            self._last_seen[worker_id] = time.monotonic()
+
+    # Called by the coordinator, through its own proxy
+
+    def add(self, tasks: list):
+        with self._changed:
+            self._pending.extend(tasks)
+            self._outstanding.update(task_id for task_id, _ in tasks)
+
+    def collect(self, task_ids: list, timeout: float = None) -> list:
+        """
+        Wait for the results of task_ids, re-queueing the tasks of lost workers meanwhile.
+
+        Raises RuntimeError when the fitness function raised on a worker or when every worker
+        has been lost, and TimeoutError after `timeout` seconds. The tasks are dropped then.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while any(task_id not in self._results for task_id in task_ids):
+                failed = next((task_id for task_id in task_ids if task_id in self._errors), None)
+                if failed is not None:
+                    worker_id, error = self._errors[failed]
+                    self._discard(task_ids)
+                    raise RuntimeError(f"The fitness function raised an exception on worker {worker_id}:\n{error}")
+                unfinished = sum(task_id not in self._results for task_id in task_ids)
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._discard(task_ids)
+                    raise TimeoutError(f"{unfinished} tasks are still unfinished")
+                if self._requeue_lost() and not self._last_seen:
+                    self._discard(task_ids)
+                    raise RuntimeError(f"All workers were lost with {unfinished} tasks unfinished")
+                self._changed.wait(timeout=min(1.0, self._worker_timeout / 4))
+            return [self._results.pop(task_id) for task_id in task_ids]
+
+    def _requeue_lost(self) -> set:
+        """Re-queue the tasks of workers not heard from within the timeout and forget them. Returns their ids."""
+        now = time.monotonic()
+        lost = {worker_id for worker_id, seen in self._last_seen.items() if now - seen > self._worker_timeout}
+        requeued = [task_id for task_id, (worker_id, _) in self._leased.items() if worker_id in lost]
+        for task_id in reversed(requeued):
+            self._pending.appendleft((task_id, self._leased.pop(task_id)[1]))
+        self.requeued += len(requeued)
+        for worker_id in lost:
+            del self._last_seen[worker_id]
+        return lost
+
+    def _discard(self, task_ids: list):
+        """Forget everything about task_ids, late results for them are ignored."""
+        task_ids = set(task_ids)
+        self._outstanding -= task_ids
+        self._pending = deque(task for task in self._pending if task[0] not in task_ids)
+        for task_id in task_ids:
+            self._leased.pop(task_id, None)
+            self._results.pop(task_id, None)
+            self._errors.pop(task_id, None)
+
+    def requeue_count(self) -> int:
+        """Tasks handed to another worker after their worker was lost, over the board's lifetime."""
+        with self._changed:
+            return self.requeued
+
+    def workers(self) -> int:
+        """Number of workers heard from within the timeout."""
+        with self._changed:
+            now = time.monotonic()
+            return sum(now - seen <= self._worker_timeout for seen in self._last_seen.values())
+
+    def close(self):
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+
+# The part of the task board workers can call
+_WORKER_METHODS = ("settings", "take", "submit", "fail", "heartbeat")
+_COORDINATOR_METHODS = _WORKER_METHODS + ("add", "collect", "requeue_count", "workers", "close")
+
+class _WorkerManager(BaseManager):
+    pass
+
+_WorkerManager.register("board", exposed=_WORKER_METHODS)
+
+_board = None  # The task board, only set in the manager process
+
+def _create_board(fitness_function, worker_timeout: float):
+    global _board
+    _board = _TaskBoard(fitness_function, worker_timeout)
+
+def _get_board() -> _TaskBoard:
+    return _board
+
+class _WorkerView:
+    """What a worker's "board" proxy points at: the manager keeps one set of exposed methods per object."""
+
+    def __init__(self, board: _TaskBoard):
+        for name in _WORKER_METHODS:
+            setattr(self, name, getattr(board, name))
+
+def _get_worker_view() -> _WorkerView:
+    return _WorkerView(_board)
+
+class _CoordinatorManager(BaseManager):
+    pass
+
+# Workers connect as "board" and only see their methods, the coordinator uses "coordinator_board"
+_CoordinatorManager.register("board", callable=_get_worker_view, exposed=_WORKER_METHODS)
+_CoordinatorManager.register("coordinator_board", callable=_get_board, exposed=_COORDINATOR_METHODS)
+
+def run_worker(address: tuple, authkey: bytes, batch_size: int = 1, poll_interval: float = 0.05):
+    """
+    Evaluate genomes for a DistributedEvaluator until it closes.
+
+    The fitness function is sent by the coordinator by reference, so the module that
+    defines it has to be importable on the worker too.
+
+    Args:
+        address (tuple): (host, port) of the coordinator.
+        authkey (bytes): The coordinator's authkey.
+        batch_size (int): Tasks taken per request.
+        poll_interval (float): Seconds to wait when the queue is empty.
+    """
+    manager = _WorkerManager(address=address, authkey=authkey)
+    manager.connect()
+    board = manager.board()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    fitness_function, worker_timeout = board.settings()
+
+    # Keep the lease on long tasks alive from a second thread
+    stop = threading.Event()
+    def heartbeat():
+        while not stop.wait(worker_timeout / 3):
+            try:
+                board.heartbeat(worker_id)
+            except (EOFError, OSError):
+                return
+    threading.Thread(target=heartbeat, daemon=True).start()
+
+    try:
+        while True:
+            try:
+                tasks = board.take(worker_id, batch_size)
+            except (EOFError, OSError):
+                return  # Coordinator is gone
+            if tasks is None:
+                return
+            if not tasks:
+                time.sleep(poll_interval)
+                continue
+            for task_id, encoded_networks in tasks:
+                try:
+                    fitnesses = [float(fitness_function(Network.decode(data))) for data in encoded_networks]
+                except Exception:
+                    # Send the error to the coordinator instead of dying, another worker would only fail the same way
+                    report, args = board.fail, (worker_id, task_id, traceback.format_exc())
+                else:
+                    report, args = board.submit, (worker_id, task_id, fitnesses)
+                try:
+                    report(*args)
+                except (EOFError, OSError):
+                    return  # Coordinator is gone
+    finally:
+        stop.set()
+
+class DistributedEvaluator:
+    """
+    Coordinator for evaluating genomes on worker processes on other machines.
+
+    The work queue lives in a multiprocessing manager process started by the coordinator
+    and is served over TCP. Workers connect to it, pull chunks of Network.encode() tuples,
+    score them with the fitness function and send back the fitnesses. Tasks of a worker
+    that stops responding for `worker_timeout` seconds are handed to another worker.
+    Start workers with
+
+        python evaluation_worker.py <host>:<port> --authkey <key>
+
+    or, on the same machine, with spawn_local_workers(). Like the process pool of
+    ParallelEvaluator, the fitness function is called as fitness_function(network) and
+    has to be a module-level function. An exception it raises on a worker is re-raised
+    by evaluate() as a RuntimeError with the worker's traceback; evaluate() also raises
+    once every worker has been lost. Only use it on a trusted network: the manager
+    protocol is pickle based.
+    """
+
+    def __init__(self, fitness_function, address: tuple = ("127.0.0.1", 0), authkey: bytes = None,
+                 chunksize: int = 8, worker_timeout: float = 30.0, timeout: float = None, cache: FitnessCache = None):
+        """
+        Args:
+            fitness_function: Called as fitness_function(network) on the workers, returns a float.
+            address (tuple): (host, port) to listen on. Port 0 picks a free port, see `address` after creation.
+                             Listen on ("0.0.0.0", port) to accept workers from other machines.
+            authkey (bytes): Shared secret of coordinator and workers, random by default.
+            chunksize (int): Genomes per task.
+            worker_timeout (float): Seconds of silence after which a worker's tasks are re-queued.
+            timeout (float): Optional, evaluate() raises TimeoutError when a generation takes longer.
+            cache (FitnessCache): Optional, only genomes with a structure it hasn't seen are sent out.
+        """
+        self.fitness_function = fitness_function
+        self.authkey = authkey if authkey is not None else os.urandom(16)
+        self.chunksize = chunksize
+        self.timeout = timeout
+        self.cache = cache
+        self._task_ids = itertools.count()
+        self._local_workers = []
+
+        # The board runs in its own process, so shutting the manager down leaves this one untouched
+        self._manager = _CoordinatorManager(address=address, authkey=self.authkey)
+        self._manager.start(_create_board, (fitness_function, worker_timeout))
+        self.address = self._manager.address
+        self.board = self._manager.coordinator_board()
+
+    @property
+    def requeued(self) -> int:
+        """Tasks handed to another worker after their worker was lost."""
+        return self.board.requeue_count()
+
+    def spawn_local_workers(self, count: int, batch_size: int = 1, mp_context=None) -> list:
+        """Start `count` worker processes on this machine, they are stopped by close()."""
+        context = mp_context or multiprocessing.get_context()
+        host = "127.0.0.1" if self.address[0] in ("", "0.0.0.0") else self.address[0]
+        processes = [
+            context.Process(target=run_worker, args=((host, self.address[1]), self.authkey, batch_size), daemon=True)
+            for _ in range(count)
+        ]
+        for process in processes:
+            process.start()
+        self._local_workers.extend(processes)
+        return processes
+
+    def evaluate(self, genomes: list) -> list:
+        """
+        Score every genome on the workers and write the result to genome.network.fitness.
+
+        Returns:
+            list: The fitnesses, in the same order as `genomes`.
+        """
+        if not genomes:
+            return []
+        if self.cache is not None:
+            return self.cache.evaluate(genomes, self._evaluate)
+        return self._evaluate(genomes)
+
+    def _evaluate(self, genomes: list) -> list:
+        encoded = [genome.network.encode() for genome in genomes]
+        tasks = [(next(self._task_ids), encoded[i:i + self.chunksize]) for i in range(0, len(encoded), self.chunksize)]
+        self.board.add(tasks)
+
+        fitnesses = []
+        for chunk_result in self.board.collect([task_id for task_id, _ in tasks], self.timeout):
+            fitnesses.extend(chunk_result)
+
+        for genome, fitness in zip(genomes, fitnesses):
+            genome.network.fitness = fitness
+        return fitnesses
+
+    def close(self):
+        """Tell the workers to stop, stop the local ones and shut down the manager process."""
+        if self._manager is None:
+            return
+        self.board.close()
+        for process in self._local_workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._local_workers = []
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
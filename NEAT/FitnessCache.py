@@ -0,0 +1,77 @@
+# FitnessCache.py
+from collections import OrderedDict
+
+class FitnessCache:
+    """
+    Remembers the fitness of networks by Network.structure_hash(), so elites and children
+    that came out of crossover and mutation unchanged are not evaluated again.
+
+    Holds at most `max_size` entries and evicts the least recently used one first. Only
+    use it with deterministic fitness functions: a stochastic fitness function should be
+    re-evaluated every time (Population(deterministic_fitness=False) turns caching off).
+    """
+
+    def __init__(self, max_size: int = 100_000):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # structure hash -> fitness, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: bytes):
+        """Return the cached fitness for `key`, None if it isn't cached."""
+        fitness = self._entries.get(key)
+        if fitness is not None:
+            self._entries.move_to_end(key)
+        return fitness
+
+    def put(self, key: bytes, fitness: float):
+        self._entries[key] = fitness
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def evaluate(self, genomes: list, evaluate) -> list:
+        """
+        Score `genomes` through the cache.
+
+        Cached fitnesses are written to genome.network.fitness directly. The other genomes
+        are passed to `evaluate` once per distinct structure, which has to write their
+        genome.network.fitness (like PopulationEvaluator.evaluate, ParallelEvaluator.evaluate
+        or any other evaluator's evaluate method). Partial fitnesses (genome.partial_fitness)
+        are only estimates, so they are not cached.
+
+        Returns:
+            list: The fitnesses, in the same order as `genomes`.
+        """
+        pending = {}  # structure hash -> genomes with that structure, the first one gets evaluated
+        for genome in genomes:
+            key = genome.network.structure_hash()
+            fitness = self.get(key)
+            if fitness is not None:
+                genome.network.fitness = fitness
+                genome.partial_fitness = False
+                self.hits += 1
+            else:
+                pending.setdefault(key, []).append(genome)
+
+        if pending:
+            self.misses += len(pending)
+            evaluate([same[0] for same in pending.values()])
+            for key, same in pending.items():
+                fitness = same[0].network.fitness
+                partial = same[0].partial_fitness
+                if not partial:
+                    self.put(key, fitness)
+                self.hits += len(same) - 1  # Duplicates within the batch
+                for genome in same[1:]:
+                    genome.network.fitness = fitness
+                    genome.partial_fitness = partial
+
+        return [genome.network.fitness for genome in genomes]
@@ -3,17 +3,30 @@ from .Node import Node, NodeType
 from .Connection import Connection
 from .Phenotype import Phenotype
 from .Mutate import Mutate
+from .InnovationTracker import InnovationTracker
 
-import uuid
+import random
 
 class Genome:
-    def __init__(self, network: Network):
-        self.id = str(uuid.uuid4())
+    _next_id = 1  # Genome ids are small increasing integers, unique within the process
+
+    def __init__(self, network: Network, tracker: InnovationTracker = None, rng: random.Random = None):
+        self.id = Genome._next_id
+        Genome._next_id += 1
         self.network = network
         self.parent_ids = []
         self.generation = 0
-        self.mutator = Mutate(self.network)
-        self.phenotype = Phenotype(self.network)
+        self.species_id = None  # Set by Speciation.speciate()
+        self.partial_fitness = False  # True while the fitness is an estimate from an evaluation that stopped early
+        self.mutator = Mutate(self.network, tracker, rng)
+        self._phenotype = None
+
+    @property
+    def phenotype(self) -> Phenotype:
+        # Created on first access, so genomes that are only evaluated never touch the plotting code
+        if self._phenotype is None:
+            self._phenotype = Phenotype(self.network)
+        return self._phenotype
 
     def random_mutation(self):
         # Apply random mutation to the network
@@ -23,6 +36,15 @@ class Genome:
         # Apply mutation to the network
         self.mutator.mutate(mutation_rate)
     
+    def compile(self):
+        # Execution plan for the network, cached until a mutation changes the network
+        return self.network.compile()
+
     def copy(self):
-        # Create a deep copy of the NEAT instance
-        return Genome(self.network.copy())
\ No newline at end of file
+        # Copy-on-write copy of the same individual: genes are shared with this genome until
+        # one of the two is mutated, and the lineage metadata is kept
+        clone = Genome(self.network.copy(), self.mutator.tracker, self.mutator.rng)
+        clone.id = self.id
+        clone.parent_ids = list(self.parent_ids)
+        clone.generation = self.generation
+        return clone
\ No newline at end of file
@@ -0,0 +1,291 @@
+# GenomeIO.py
+from .Network import Network
+from .Node import Node, NodeType
+from .Connection import Connection
+from .Genome import Genome
+from .Activations import get_activation, activation_names
+
+from array import array
+import json
+import os
+import re
+import numpy as np
+
+FORMAT_VERSION = 2  # 2: integer genome ids (version 1 stored uuid strings)
+
+# Node type codes follow Network.encode() (list(NodeType) order: Input, Hidden, Output). Activations
+# are saved by their registry id (see Activations.py), 0 for none
+NODE_DTYPE = np.dtype([("id", "<i8"), ("type", "u1"), ("activation", "u1"), ("bias", "<f8")])
+CONN_DTYPE = np.dtype([("innov", "<i8"), ("from", "<i8"), ("to", "<i8"), ("weight", "<f8"), ("enabled", "u1")])
+GENOME_DTYPE = np.dtype([
+    ("id", "<i8"), ("generation", "<i8"), ("fitness", "<f8"),
+    ("node_start", "<i8"), ("node_count", "<i8"), ("conn_start", "<i8"), ("conn_count", "<i8"),
+])
+GENOME_DTYPE_V1 = np.dtype([
+    ("id", "S36"), ("generation", "<i8"), ("fitness", "<f8"),
+    ("node_start", "<i8"), ("node_count", "<i8"), ("conn_start", "<i8"), ("conn_count", "<i8"),
+])
+
+# Population file: a fixed 64 byte header followed by the genome, node and connection
+# tables, each starting on a 64 byte boundary so they can be memory-mapped as they are
+POPULATION_MAGIC = b"NEATPOP"  # Stored in the 8 byte magic field, NUL padded
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"), ("version", "<u4"), ("reserved", "<u4"),
+    ("genome_count", "<u8"), ("node_count", "<u8"), ("conn_count", "<u8"),
+    ("genomes_offset", "<u8"), ("nodes_offset", "<u8"), ("conns_offset", "<u8"),
+])
+_ALIGN = 64
+
+def _activation_id(act) -> int:
+    if act is None:
+        return 0
+    registered = get_activation(act) if isinstance(act, str) else None
+    if registered is None:
+        raise ValueError(f"Activation {act!r} can't be saved, only registered activations have a stable id")
+    if registered.id > 255:
+        raise ValueError(f"Activation {act!r} has id {registered.id}, files store ids up to 255")
+    return registered.id
+
+def network_records(network: Network) -> tuple:
+    """
+    Convert a network to (nodes, conns) structured arrays (NODE_DTYPE, CONN_DTYPE).
+    """
+    node_ids, node_types, biases, node_acts, activations, innovs, from_ids, to_ids, weights, enabled = network.encode()
+    act_ids = np.array([_activation_id(act) for act in activations], dtype=np.uint8)
+
+    nodes = np.empty(len(node_ids), dtype=NODE_DTYPE)
+    nodes["id"] = np.frombuffer(node_ids, dtype=np.int64)
+    nodes["type"] = np.frombuffer(node_types, dtype=np.uint8)
+    nodes["activation"] = act_ids[np.frombuffer(node_acts, dtype=np.uint8)]
+    nodes["bias"] = np.frombuffer(biases, dtype=np.float64)
+
+    conns = np.empty(len(innovs), dtype=CONN_DTYPE)
+    conns["innov"] = np.frombuffer(innovs, dtype=np.int64)
+    conns["from"] = np.frombuffer(from_ids, dtype=np.int64)
+    conns["to"] = np.frombuffer(to_ids, dtype=np.int64)
+    conns["weight"] = np.frombuffer(weights, dtype=np.float64)
+    conns["enabled"] = np.frombuffer(enabled, dtype=np.uint8)
+    return nodes, conns
+
+def network_from_records(nodes: np.ndarray, conns: np.ndarray) -> Network:
+    """Rebuild a Network from the structured arrays made by network_records()."""
+    names = activation_names()
+    if len(nodes) and nodes["activation"].max() >= len(names):
+        raise ValueError(f"Unknown activation id {nodes['activation'].max()}, register the custom activations first")
+    return Network.decode((
+        nodes["id"].tolist(), nodes["type"].tolist(), nodes["bias"].tolist(), nodes["activation"].tolist(),
+        names,
+        conns["innov"].tolist(), conns["from"].tolist(), conns["to"].tolist(), conns["weight"].tolist(),
+        conns["enabled"].tolist(),
+    ))
+
+def _genome_record(genome: Genome) -> tuple:
+    return (genome.id, genome.generation, genome.network.fitness)
+
+def _genome_from_record(record, network: Network) -> Genome:
+    genome = Genome(network)
+    genome.id = record["id"].decode("ascii") if isinstance(record["id"], bytes) else int(record["id"])
+    genome.generation = int(record["generation"])
+    network.fitness = float(record["fitness"])
+    return genome
+
+def _atomic_write(path: str, write):
+    # Write next to the target and swap it in, so a crash never leaves a half-written file behind
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def save_genome(genome: Genome, path: str):
+    """
+    Save a single genome as an .npz file (genome, nodes and conns structured arrays).
+    """
+    nodes, conns = network_records(genome.network)
+    record = np.array([_genome_record(genome) + (0, len(nodes), 0, len(conns))], dtype=GENOME_DTYPE)
+    _atomic_write(path, lambda f: np.savez(f, version=np.array(FORMAT_VERSION), genome=record, nodes=nodes, conns=conns))
+
+def load_genome(path: str) -> Genome:
+    """Load a genome saved with save_genome()."""
+    with np.load(path) as data:
+        version = int(data["version"])
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{path} uses genome format version {version}, this version reads up to {FORMAT_VERSION}")
+        return _genome_from_record(data["genome"][0], network_from_records(data["nodes"], data["conns"]))
+
+def _padding(offset: int) -> int:
+    return -offset % _ALIGN
+
+def save_population(genomes: list, path: str, fitness: list = None):
+    """
+    Save a whole population into one file that PopulationFile can memory-map.
+
+    Args:
+        genomes (list): The genomes to save.
+        path (str): Output file.
+        fitness (list): Optional fitness per genome to store instead of genome.network.fitness.
+    """
+    records = np.empty(len(genomes), dtype=GENOME_DTYPE)
+    node_counts = np.empty(len(genomes), dtype=np.int64)
+    conn_counts = np.empty(len(genomes), dtype=np.int64)
+
+    # Gather every genome's encode() arrays into flat buffers, then fill the tables in one go
+    node_ids, node_types, biases, node_acts = array('q'), bytearray(), array('d'), bytearray()
+    innovs, from_ids, to_ids, weights, enabled = array('q'), array('q'), array('q'), array('d'), bytearray()
+    for i, genome in enumerate(genomes):
+        n_ids, n_types, n_biases, n_acts, activations, c_innovs, c_from, c_to, c_weights, c_enabled = genome.network.encode()
+        act_ids = bytes(_activation_id(act) for act in activations)
+        node_counts[i] = len(n_ids)
+        conn_counts[i] = len(c_innovs)
+
+        node_ids.extend(n_ids)
+        node_types.extend(n_types)
+        biases.extend(n_biases)
+        node_acts.extend(n_acts.translate(act_ids.ljust(256, b"\0")))
+        innovs.extend(c_innovs)
+        from_ids.extend(c_from)
+        to_ids.extend(c_to)
+        weights.extend(c_weights)
+        enabled.extend(c_enabled)
+
+    records["id"] = [genome.id for genome in genomes]
+    records["generation"] = [genome.generation for genome in genomes]
+    records["fitness"] = fitness if fitness is not None else [genome.network.fitness for genome in genomes]
+    records["node_count"] = node_counts
+    records["node_start"] = np.cumsum(node_counts) - node_counts
+    records["conn_count"] = conn_counts
+    records["conn_start"] = np.cumsum(conn_counts) - conn_counts
+
+    nodes = np.empty(len(node_ids), dtype=NODE_DTYPE)
+    nodes["id"] = np.frombuffer(node_ids, dtype=np.int64)
+    nodes["type"] = np.frombuffer(node_types, dtype=np.uint8)
+    nodes["activation"] = np.frombuffer(node_acts, dtype=np.uint8)
+    nodes["bias"] = np.frombuffer(biases, dtype=np.float64)
+
+    conns = np.empty(len(innovs), dtype=CONN_DTYPE)
+    conns["innov"] = np.frombuffer(innovs, dtype=np.int64)
+    conns["from"] = np.frombuffer(from_ids, dtype=np.int64)
+    conns["to"] = np.frombuffer(to_ids, dtype=np.int64)
+    conns["weight"] = np.frombuffer(weights, dtype=np.float64)
+    conns["enabled"] = np.frombuffer(enabled, dtype=np.uint8)
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = POPULATION_MAGIC
+    header["version"] = FORMAT_VERSION
+    header["genome_count"] = len(records)
+    header["node_count"] = len(nodes)
+    header["conn_count"] = len(conns)
+
+    offset = HEADER_DTYPE.itemsize
+    offsets = []
+    for table in (records, nodes, conns):
+        offset += _padding(offset)
+        offsets.append(offset)
+        offset += table.nbytes
+    header["genomes_offset"], header["nodes_offset"], header["conns_offset"] = offsets
+
+    def write(f):
+        f.write(header.tobytes())
+        for table, start in zip((records, nodes, conns), offsets):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(table.tobytes())
+
+    _atomic_write(path, write)
+
+class PopulationFile:
+    """
+    Read access to a file written by save_population().
+
+    The tables are memory-mapped, so opening the file and reading one genome only touches
+    the pages that genome lives in. `fitness` is a read-only view over all genomes.
+
+        with PopulationFile("population.neatpop") as population:
+            best = population.genome(int(population.fitness.argmax()))
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) != 1 or header["magic"][0] != POPULATION_MAGIC:
+            raise ValueError(f"{path} is not a population file")
+        self.version = int(header["version"][0])
+        if self.version > FORMAT_VERSION:
+            raise ValueError(f"{path} uses population format version {self.version}, this version reads up to {FORMAT_VERSION}")
+
+        self.records = self._map(header, "genomes_offset", "genome_count", GENOME_DTYPE if self.version >= 2 else GENOME_DTYPE_V1)
+        self.nodes = self._map(header, "nodes_offset", "node_count", NODE_DTYPE)
+        self.conns = self._map(header, "conns_offset", "conn_count", CONN_DTYPE)
+
+    def _map(self, header, offset_field: str, count_field: str, dtype: np.dtype) -> np.ndarray:
+        count = int(header[count_field][0])
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode="r", offset=int(header[offset_field][0]), shape=(count,))
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def fitness(self) -> np.ndarray:
+        return self.records["fitness"]
+
+    def network(self, i: int) -> Network:
+        """Decode only the network of genome i."""
+        record = self.records[i]
+        nodes = self.nodes[record["node_start"]:record["node_start"] + record["node_count"]]
+        conns = self.conns[record["conn_start"]:record["conn_start"] + record["conn_count"]]
+        return network_from_records(nodes, conns)
+
+    def genome(self, i: int) -> Genome:
+        """Decode genome i."""
+        return _genome_from_record(self.records[i], self.network(i))
+
+    def genomes(self):
+        """Iterate over all genomes, decoding them one at a time."""
+        for i in range(len(self)):
+            yield self.genome(i)
+
+    def close(self):
+        # Dropping the maps closes the underlying file
+        self.records = self.nodes = self.conns = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# Old best_genome.json files store each node as the str() of a dict, with the activation
+# written as "<function ActivationFunctions.TanH at 0x...>"
+_LEGACY_NODE = re.compile(
+    r"'id': (?P<id>-?\d+), 'type': '(?P<type>\w+)', 'value': (?P<value>[^,]+), "
+    r"'activation': (?:None|<function ActivationFunctions\.(?P<activation>\w+) at [^>]*>), 'bias': (?P<bias>[^}]+)"
+)
+
+def load_legacy_json(path: str) -> Genome:
+    """Load a genome from the old best_genome.json format written by earlier versions of the XOR example."""
+    with open(path) as f:
+        data = json.load(f)
+
+    nodes = []
+    for entries in data["nodes"].values():
+        for entry in entries:
+            match = _LEGACY_NODE.search(entry)
+            if match is None:
+                raise ValueError(f"Unrecognized node entry in {path}: {entry}")
+            activation = get_activation(match["activation"]).scalar if match["activation"] else None
+            bias = match["bias"].strip()
+            nodes.append(Node(int(match["id"]), NodeType(match["type"]), float(match["value"]), activation,
+                              None if bias == "None" else float(bias)))
+
+    by_id = {node.id: node for node in nodes}
+    conns = [
+        Connection(int(conn["innovation"]), float(conn["weight"]), by_id[conn["from"]], by_id[conn["to"]], bool(conn["enabled"]))
+        for conn in data["connections"]
+    ]
+    conns.sort(key=lambda c: c.Innov)
+
+    genome = Genome(Network(nodes, conns))
+    genome.network.fitness = float(data.get("fitness", 0.0))
+    return genome
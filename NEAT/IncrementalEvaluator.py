@@ -0,0 +1,114 @@
+# IncrementalEvaluator.py
+from .PopulationEvaluator import PopulationEvaluator
+
+import numpy as np
+
+class IncrementalEvaluator:
+    """
+    Evaluates fitness chunk by chunk and stops early for genomes that can no longer reach
+    the cutoff.
+
+    The fitness of a genome has to be a sum of chunk scores (test cases, batches of test
+    cases, episodes, ...), each at most `max_chunk_score`. All still running genomes are
+    scored on one chunk at a time. After each chunk, a genome whose best possible total
+    (its score so far plus `max_chunk_score` for every chunk left) is below the cutoff
+    is stopped. Its fitness is then the mean chunk score so far extrapolated to all
+    chunks (capped at its best possible total, so it stays below the cutoff), and
+    genome.partial_fitness is set.
+
+    Population passes the fitness of its weakest elite of the previous generation as the
+    cutoff (see Population.cutoff), so a stopped genome could not have become an elite.
+    Partial fitnesses are estimates, FitnessCache doesn't store them.
+
+    Put the chunks in random order (or the most telling ones first): the earlier a bad
+    genome shows it, the more work is saved.
+    """
+
+    incremental = True  # Population passes cutoff= to evaluate()
+
+    def __init__(self, score_chunk, chunks: int, max_chunk_score=0.0, indexed: bool = False):
+        """
+        Args:
+            score_chunk: Called as score_chunk(genomes, chunk), returns the score of every genome
+                         on chunk number `chunk`, shape [len(genomes)].
+            chunks (int): Number of chunks.
+            max_chunk_score: Upper bound of a chunk score, a float or one per chunk.
+            indexed (bool): Call score_chunk(genomes, chunk, rows) instead, with the whole list of
+                            genomes every time and the indices of the ones still running, and
+                            return the scores of those rows. Lets score_chunk keep work done for
+                            the whole generation, like from_cases() keeps its packed networks.
+        """
+        self.score_chunk = score_chunk
+        self.indexed = indexed
+        self.chunks = chunks
+        max_scores = np.broadcast_to(np.asarray(max_chunk_score, dtype=float), (chunks,))
+        # Best possible score of all chunks after chunk k, for k = 0 .. chunks - 1
+        self._remaining_max = np.concatenate((np.cumsum(max_scores[::-1])[::-1][1:], [0.0]))
+
+        self.chunks_scored = 0  # Genome-chunks actually scored, over all evaluate() calls
+        self.chunks_total = 0  # Genome-chunks a full evaluation would have scored
+
+    @classmethod
+    def from_cases(cls, inputs, case_scores, chunk_size: int = 1, max_case_score: float = 0.0):
+        """
+        Incremental version of PopulationEvaluator for fitness functions that sum a score per test case.
+
+        Args:
+            inputs: All test cases, shape [C, n_in].
+            case_scores: Called as case_scores(outputs, cases) with outputs of shape [P, c, n_out]
+                         for the cases at index `cases`, returns the score of each, shape [P, c].
+            chunk_size (int): Cases per chunk.
+            max_case_score (float): Upper bound of a case score, e.g. 0 for a negative error.
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        bounds = list(range(0, len(inputs), chunk_size)) + [len(inputs)]
+        slices = [np.arange(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+        evaluator = PopulationEvaluator(inputs, None)
+
+        def score_chunk(genomes, chunk, rows):
+            # The generation is packed once, later chunks only compute the rows still running
+            cases = slices[chunk]
+            outputs = evaluator.activate(genomes, inputs[cases], rows=rows)
+            return np.asarray(case_scores(outputs, cases), dtype=float).sum(axis=1)
+
+        return cls(score_chunk, len(slices), [max_case_score * len(cases) for cases in slices], indexed=True)
+
+    def evaluate(self, genomes: list, cutoff: float = None) -> np.ndarray:
+        """
+        Score every genome and write the result to genome.network.fitness.
+
+        Args:
+            genomes: The genomes to evaluate.
+            cutoff (float): Stop genomes that can't reach this fitness anymore. None scores every chunk.
+
+        Returns:
+            np.ndarray: The fitness vector, shape [P].
+        """
+        P = len(genomes)
+        totals = np.zeros(P)
+        scored = np.zeros(P, dtype=np.int64)
+        running = np.arange(P)
+
+        for chunk in range(self.chunks):
+            if not len(running):
+                break
+            if self.indexed:
+                totals[running] += self.score_chunk(genomes, chunk, running)
+            else:
+                totals[running] += self.score_chunk([genomes[i] for i in running], chunk)
+            scored[running] += 1
+            if cutoff is not None:
+                running = running[totals[running] + self._remaining_max[chunk] >= cutoff]
+
+        partial = scored < self.chunks
+        fitnesses = totals.copy()
+        # Capped by the best possible total, so a stopped genome always stays below the cutoff
+        best_possible = totals[partial] + self._remaining_max[scored[partial] - 1]
+        fitnesses[partial] = np.minimum(totals[partial] / scored[partial] * self.chunks, best_possible)
+
+        self.chunks_scored += int(scored.sum())
+        self.chunks_total += P * self.chunks
+        for genome, fitness, is_partial in zip(genomes, fitnesses, partial):
+            genome.network.fitness = float(fitness)
+            genome.partial_fitness = bool(is_partial)
+        return fitnesses
@@ -0,0 +1,336 @@
+# InferenceServer.py
+from .GenomeIO import load_genome, load_legacy_json
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+
+import numpy as np
+
+class _Model:
+    """A loaded genome and its generated NumPy forward pass."""
+
+    def __init__(self, name: str, path: str, version: int):
+        self.name = name
+        self.path = path
+        self.version = version
+        self.mtime = os.path.getmtime(path)
+        self.genome = load_legacy_json(path) if path.endswith(".json") else load_genome(path)
+        plan = self.genome.network.compile()
+        self.n_inputs = len(plan.input_idx)
+        self.n_outputs = len(plan.output_idx)
+        self.forward = self.genome.network.codegen(vectorized=True)
+
+    def info(self) -> dict:
+        return {"path": self.path, "version": self.version, "inputs": self.n_inputs, "outputs": self.n_outputs,
+                "genome_id": self.genome.id, "fitness": self.genome.network.fitness}
+
+class _Request:
+    __slots__ = ("rows", "done", "outputs", "version", "error")
+
+    def __init__(self, rows: np.ndarray):
+        self.rows = rows
+        self.done = threading.Event()
+        self.outputs = None
+        self.version = None
+        self.error = None
+
+class MicroBatcher:
+    """
+    Runs the requests for one model in batches.
+
+    A batch starts with the first waiting request and takes every request that arrives
+    within `max_delay` seconds, up to `max_batch_size` rows, then goes through the
+    model in one vectorized call. The model is looked up per batch, so a reloaded
+    model is used from the next batch on and no request is dropped.
+    """
+
+    def __init__(self, get_model, max_batch_size: int = 256, max_delay: float = 0.002):
+        self.get_model = get_model
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, rows: np.ndarray) -> tuple:
+        """Queue rows of shape [k, n_in] and wait for them. Returns (outputs [k, n_out], model version)."""
+        request = _Request(rows)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.outputs, request.version
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            size = len(request.rows)
+            deadline = time.perf_counter() + self.max_delay
+            while size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._queue.put(None)  # Finish this batch first, then stop
+                    break
+                batch.append(request)
+                size += len(request.rows)
+            self._process(batch)
+
+    def _process(self, batch: list):
+        model = self.get_model()
+        valid = []
+        for request in batch:
+            if request.rows.ndim != 2 or request.rows.shape[1] != model.n_inputs:
+                request.error = ValueError(f"Expected inputs of shape [k, {model.n_inputs}], got {list(request.rows.shape)}")
+                request.done.set()
+            else:
+                valid.append(request)
+        if not valid:
+            return
+
+        try:
+            outputs = model.forward(np.concatenate([request.rows for request in valid]))
+        except Exception as error:
+            for request in valid:
+                request.error = error
+                request.done.set()
+            return
+
+        self.batches += 1
+        self.rows += len(outputs)
+        start = 0
+        for request in valid:
+            end = start + len(request.rows)
+            request.outputs = outputs[start:end]
+            request.version = model.version
+            request.done.set()
+            start = end
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, clients can reuse their connection
+
+    def _reply(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _model_name(self, prefix: str):
+        name = self.path[len(prefix):].strip("/")
+        if not name and len(self.server.inference.models) == 1:
+            name = next(iter(self.server.inference.models))
+        return name
+
+    def do_GET(self):
+        inference = self.server.inference
+        if self.path == "/health":
+            self._reply(200, {"status": "ok"})
+        elif self.path == "/models":
+            self._reply(200, {name: model.info() for name, model in inference.models.items()})
+        else:
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        inference = self.server.inference
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._reply(400, {"error": f"Invalid Content-Length {self.headers.get('Content-Length')!r}"})
+            return
+        body = self.rfile.read(length) if length else b""
+
+        if self.path.startswith("/predict"):
+            name = self._model_name("/predict")
+            if name not in inference.models:
+                self._reply(404, {"error": f"Unknown model {name!r}"})
+                return
+            try:
+                inputs = np.asarray(json.loads(body)["inputs"], dtype=float)
+                single = inputs.ndim == 1
+                outputs, version = inference.predict(name, inputs, with_version=True)
+            except (ValueError, KeyError, TypeError) as error:
+                self._reply(400, {"error": str(error)})
+                return
+            except Exception as error:
+                self._reply(500, {"error": f"{type(error).__name__}: {error}"})
+                return
+            self._reply(200, {"outputs": (outputs[0] if single else outputs).tolist(), "version": version})
+
+        elif self.path.startswith("/reload"):
+            name = self._model_name("/reload")
+            if name not in inference.models:
+                self._reply(404, {"error": f"Unknown model {name!r}"})
+                return
+            try:
+                path = json.loads(body).get("path") if body else None
+                self._reply(200, inference.reload(name, path).info())
+            except Exception as error:
+                self._reply(500, {"error": str(error)})
+        else:
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+
+    def address_string(self):
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.inference.verbose:
+            super().log_message(format, *args)
+
+class _TCPHandler(_Handler):
+    disable_nagle_algorithm = True  # Headers and body are written separately, don't wait for a delayed ACK in between
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)  # Left over from a previous run
+        super().server_bind()
+
+class InferenceServer:
+    """
+    Serves predictions of saved genomes over HTTP, on a TCP port or a Unix socket.
+
+    Every genome is compiled to its generated NumPy forward pass (Network.codegen) and
+    gets a MicroBatcher, so concurrent requests are answered with one batched call.
+    When a genome file changes on disk (save_genome() replaces it atomically), the new
+    genome is loaded and swapped in between two batches; requests that are already
+    queued are answered by whichever model runs their batch.
+
+    Endpoints:
+        POST /predict/<name>  {"inputs": [x, ...] or [[x, ...], ...]} -> {"outputs": ..., "version": n}
+        POST /reload/<name>   Optional {"path": ...}, reload now (from another file)
+        GET  /models          Loaded genomes, their input/output counts and versions
+        GET  /health
+
+    /predict and /reload may leave out the name when only one genome is served.
+    """
+
+    def __init__(self, genomes: dict, host: str = "127.0.0.1", port: int = 8000, unix_socket: str = None,
+                 max_batch_size: int = 256, max_delay_ms: float = 2.0, reload_interval: float = 1.0,
+                 verbose: bool = False):
+        """
+        Args:
+            genomes (dict): Model name -> genome file (.npz from save_genome, or a legacy .json).
+            host (str), port (int): TCP address to listen on, port 0 picks a free one.
+            unix_socket (str): Listen on this Unix socket instead of TCP.
+            max_batch_size (int): Most rows per batch.
+            max_delay_ms (float): How long a batch waits for more requests after the first one.
+            reload_interval (float): Seconds between checks for changed genome files, None to turn it off.
+            verbose (bool): Log every request.
+        """
+        self.verbose = verbose
+        self.models = {name: _Model(name, path, 1) for name, path in genomes.items()}
+        self.batchers = {
+            name: MicroBatcher(lambda name=name: self.models[name], max_batch_size, max_delay_ms / 1000)
+            for name in self.models
+        }
+        self._reload_lock = threading.Lock()
+
+        if unix_socket is not None:
+            self.httpd = _UnixHTTPServer(unix_socket, _Handler)
+        else:
+            self.httpd = ThreadingHTTPServer((host, port), _TCPHandler)
+            self.httpd.daemon_threads = True
+        self.httpd.inference = self
+        self.address = self.httpd.server_address
+
+        self._stop = threading.Event()
+        self._watcher = None
+        if reload_interval:
+            self._watcher = threading.Thread(target=self._watch, args=(reload_interval,), daemon=True)
+            self._watcher.start()
+        self._thread = None
+
+    def predict(self, name: str, inputs, with_version: bool = False):
+        """
+        Run inputs through a model, batched with concurrent calls. Raises ValueError for an unknown model name.
+
+        Args:
+            name (str): Model name.
+            inputs: One row [n_in] or rows [k, n_in].
+
+        Returns:
+            np.ndarray: [n_out] or [k, n_out] to match `inputs`, plus the model version with with_version=True.
+        """
+        batcher = self.batchers.get(name)
+        if batcher is None:
+            raise ValueError(f"Unknown model {name!r}")
+        rows = np.asarray(inputs, dtype=float)
+        single = rows.ndim == 1
+        outputs, version = batcher.submit(rows[None, :] if single else rows)
+        outputs = outputs[0] if single else outputs
+        return (outputs, version) if with_version else outputs
+
+    def reload(self, name: str, path: str = None) -> _Model:
+        """Load the model again (or from `path`) and swap it in. The old model stays if loading fails."""
+        with self._reload_lock:
+            old = self.models[name]
+            model = _Model(name, path or old.path, old.version + 1)
+            self.models[name] = model
+            return model
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            for name, model in list(self.models.items()):
+                try:
+                    changed = os.path.getmtime(model.path) != model.mtime
+                except OSError:
+                    continue  # Being replaced, try again next time
+                if changed:
+                    try:
+                        self.reload(name)
+                    except Exception as error:
+                        try:
+                            model.mtime = os.path.getmtime(model.path)  # Don't retry until the file changes again
+                        except OSError:
+                            pass  # Being replaced, the next check picks up the new file
+                        print(f"Reloading {name} from {model.path} failed, keeping version {model.version}: {error}")
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def start(self):
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self.httpd.shutdown()
+        self.httpd.server_close()
+        for batcher in self.batchers.values():
+            batcher.close()
+        if isinstance(self.httpd, _UnixHTTPServer) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,16 +1,159 @@
 # --- InnovationTracker.py ---
 
+_KEY_BITS = 32  # Node ids are packed into one int key: (from_id << 32) | to_id
+
+def _key(from_id: int, to_id: int) -> int:
+    return (from_id << _KEY_BITS) | to_id
+
 class InnovationTracker:
-    def __init__(self):
-        self.innovations = {}  # (from_node_id, to_node_id) -> innovation number
-        self.counter = 1
-
-    def get_innovation(self, from_id, to_id):
-        key = (from_id, to_id)
-        if key not in self.innovations:
-            self.innovations[key] = self.counter
+    """
+    Hands out innovation numbers and node ids for the whole population, so the same
+    structural mutation gets the same numbers in every genome that makes it.
+
+        - get_innovation(from_id, to_id): innovation number of a connection
+        - get_split(innov): id of the node inserted when the connection `innov` is split
+        - new_node_id(): a node id that was never handed out before
+
+    Worker processes use a batch reservation protocol instead of sharing the tables:
+
+        block = tracker.reserve(innovations=1000, node_ids=500)   # main process
+        ... mutate genomes with Mutate(network, block) ...        # worker
+        events = block.events()                                   # sent back by the worker
+        innov_map, node_map = tracker.merge(events)               # main process
+        network = network.renumber(innov_map, node_map)
+
+    A reserved block is a copy of the tracker whose counters run inside a range nobody
+    else uses, so workers never hand out the same number for different structures.
+    merge() replays a block's new entries in order: the first block to report a
+    structure keeps its numbers, later ones get a map to those numbers.
+
+    Entries that were not used for `max_age` generations are dropped by next_generation(),
+    which keeps the tables (and the reserved copies shipped to workers) small.
+    """
+
+    def __init__(self, counter: int = 1, next_node_id: int = 1, max_age: int = None):
+        self.innovations = {}  # _key(from_id, to_id) -> innovation number
+        self.splits = {}  # innovation of the split connection -> id of the node inserted into it
+        self.counter = counter
+        self.next_node_id = next_node_id
+        self.max_age = max_age
+
+        self.generation = 0
+        self._last_used = {}  # _key -> generation the innovation was last handed out
+        self._split_last_used = {}  # split innovation -> generation the node id was last handed out
+
+        # Only set on reserved blocks, see reserve()
+        self.innovation_limit = None
+        self.node_id_limit = None
+        self._events = []
+
+    def get_innovation(self, from_id: int, to_id: int) -> int:
+        key = _key(from_id, to_id)
+        innov = self.innovations.get(key)
+        if innov is None:
+            if self.innovation_limit is not None and self.counter >= self.innovation_limit:
+                raise RuntimeError("Reserved innovation numbers are used up, reserve a larger block")
+            innov = self.innovations[key] = self.counter
             self.counter += 1
-        return self.innovations[key]
+            if self.innovation_limit is not None:
+                self._events.append((0, key, innov))
+        self._last_used[key] = self.generation
+        return innov
+
+    def new_node_id(self) -> int:
+        if self.node_id_limit is not None and self.next_node_id >= self.node_id_limit:
+            raise RuntimeError("Reserved node ids are used up, reserve a larger block")
+        node_id = self.next_node_id
+        self.next_node_id += 1
+        return node_id
+
+    def get_split(self, innov: int) -> int:
+        node_id = self.splits.get(innov)
+        if node_id is None:
+            node_id = self.splits[innov] = self.new_node_id()
+            if self.node_id_limit is not None:
+                self._events.append((1, innov, node_id))
+        self._split_last_used[innov] = self.generation
+        return node_id
+
+    def register_network(self, network):
+        """Record the genes of an existing network (e.g. the starting template) and move the counters past them."""
+        for conn in network.conns:
+            key = _key(conn.from_node.id, conn.to_node.id)
+            self.innovations.setdefault(key, conn.Innov)
+            self._last_used[key] = self.generation
+            self.counter = max(self.counter, conn.Innov + 1)
+        for node in network.nodes:
+            self.next_node_id = max(self.next_node_id, node.id + 1)
+
+    def next_generation(self):
+        """Start a new generation, dropping entries older than max_age generations."""
+        self.generation += 1
+        if self.max_age is None:
+            return
+
+        oldest = self.generation - self.max_age
+        stale = [key for key, used in self._last_used.items() if used < oldest]
+        for key in stale:
+            del self.innovations[key]
+            del self._last_used[key]
+        stale = [innov for innov, used in self._split_last_used.items() if used < oldest]
+        for innov in stale:
+            del self.splits[innov]
+            del self._split_last_used[innov]
+
+    def reserve(self, innovations: int, node_ids: int) -> "InnovationTracker":
+        """
+        Reserve a block of innovation numbers and node ids for a worker.
+
+        Returns:
+            InnovationTracker: A picklable copy of this tracker limited to the reserved ranges.
+        """
+        block = InnovationTracker(self.counter, self.next_node_id)
+        block.innovations = dict(self.innovations)
+        block.splits = dict(self.splits)
+        block.generation = self.generation
+        block.innovation_limit = self.counter + innovations
+        block.node_id_limit = self.next_node_id + node_ids
+
+        self.counter += innovations
+        self.next_node_id += node_ids
+        return block
+
+    def events(self) -> list:
+        """New entries of a reserved block, in the order they were created (see merge())."""
+        return list(self._events)
+
+    def merge(self, events: list) -> tuple:
+        """
+        Add the entries a reserved block created to this tracker.
+
+        Returns:
+            tuple: (innov_map, node_map) dicts from the block's numbers to this tracker's
+                   numbers, for the entries another block reported first. Pass them to
+                   Network.renumber() for the networks mutated with that block.
+        """
+        innov_map = {}
+        node_map = {}
+        mask = (1 << _KEY_BITS) - 1
+
+        for kind, key, value in events:
+            if kind == 0:
+                # The endpoints may be new nodes that already got mapped
+                from_id, to_id = key >> _KEY_BITS, key & mask
+                key = _key(node_map.get(from_id, from_id), node_map.get(to_id, to_id))
+                innov = self.innovations.setdefault(key, value)
+                if innov != value:
+                    innov_map[value] = innov
+                self._last_used[key] = self.generation
+            else:
+                innov = innov_map.get(key, key)
+                node_id = self.splits.setdefault(innov, value)
+                if node_id != value:
+                    node_map[value] = node_id
+                self._split_last_used[innov] = self.generation
+
+        return innov_map, node_map
 
 # Create a global instance to import elsewhere
-tracker = InnovationTracker()
\ No newline at end of file
+tracker = InnovationTracker()
@@ -0,0 +1,148 @@
+# Lineage.py
+import os
+import numpy as np
+
+# Append-only lineage file: a 16 byte header followed by fixed size records, one per
+# genome, in creation order. Genome ids only go up, so the file is sorted by id and a
+# genome's record can be found with a binary search over the memory-mapped records.
+LINEAGE_MAGIC = b"NEATLIN"  # Stored in the 8 byte magic field, NUL padded
+LINEAGE_VERSION = 1
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("version", "<u4"), ("record_size", "<u4")])
+RECORD_DTYPE = np.dtype([("id", "<i8"), ("parent_1", "<i8"), ("parent_2", "<i8"), ("generation", "<i4")])
+NO_PARENT = -1
+
+class LineageLog:
+    """
+    Streams the parents of every genome to a binary file instead of keeping them in memory.
+
+    Records are buffered and appended every `flush_every` records (and on flush()/close()),
+    so memory use stays flat over the run. Use LineageReader, or query_lineage.py, to query it:
+
+        python query_lineage.py Outputs/lineage.bin 1234
+    """
+
+    def __init__(self, path: str, flush_every: int = 4096, append: bool = False):
+        """
+        Args:
+            path (str): Lineage file.
+            flush_every (int): Number of buffered records that triggers a write.
+            append (bool): Continue an existing file (e.g. when resuming a run) instead of starting a new one.
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self._buffer = []
+
+        if not append or not os.path.exists(path) or os.path.getsize(path) == 0:
+            header = np.zeros(1, dtype=HEADER_DTYPE)
+            header["magic"] = LINEAGE_MAGIC
+            header["version"] = LINEAGE_VERSION
+            header["record_size"] = RECORD_DTYPE.itemsize
+            with open(path, "wb") as f:
+                f.write(header.tobytes())
+        else:
+            _check_header(path)
+        self._file = open(path, "ab")
+
+    def record(self, genome_id: int, parent_1: int = None, parent_2: int = None, generation: int = 0):
+        """Add the record of a new genome. Genome ids have to be increasing."""
+        self._buffer.append((genome_id,
+                             NO_PARENT if parent_1 is None else parent_1,
+                             NO_PARENT if parent_2 is None else parent_2,
+                             generation))
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Append the buffered records to the file."""
+        if self._buffer:
+            self._file.write(np.array(self._buffer, dtype=RECORD_DTYPE).tobytes())
+            self._buffer = []
+        self._file.flush()
+
+    def truncate(self, next_id: int):
+        """
+        Drop every record with an id >= next_id, e.g. the genomes a crashed run created
+        after the checkpoint it is resumed from.
+        """
+        self.flush()
+        size = os.path.getsize(self.path)
+        count = (size - HEADER_DTYPE.itemsize) // RECORD_DTYPE.itemsize
+        if count:
+            ids = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_DTYPE.itemsize, shape=(count,))["id"]
+            count = int(np.searchsorted(ids, next_id))
+            del ids
+        self._file.truncate(HEADER_DTYPE.itemsize + count * RECORD_DTYPE.itemsize)
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def _check_header(path: str):
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) != 1 or header["magic"][0] != LINEAGE_MAGIC:
+        raise ValueError(f"{path} is not a lineage file")
+    if header["version"][0] > LINEAGE_VERSION or header["record_size"][0] != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} uses lineage format version {header['version'][0]}, this version reads up to {LINEAGE_VERSION}")
+
+class LineageReader:
+    """
+    Read access to a lineage file. The records are memory-mapped, a lookup is a binary
+    search that only touches a few pages of the file.
+    """
+
+    def __init__(self, path: str):
+        _check_header(path)
+        count = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // RECORD_DTYPE.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_DTYPE.itemsize, shape=(count,))
+        else:
+            self.records = np.empty(0, dtype=RECORD_DTYPE)
+        self._ids = self.records["id"]
+
+    def __len__(self):
+        return len(self.records)
+
+    def get(self, genome_id: int):
+        """Return the record (id, parent_1, parent_2, generation) of a genome, None if it isn't in the log."""
+        i = int(np.searchsorted(self._ids, genome_id))
+        if i < len(self._ids) and self._ids[i] == genome_id:
+            return tuple(int(value) for value in self.records[i])
+        return None
+
+    def ancestry(self, genome_id: int, max_depth: int = None) -> list:
+        """
+        Collect the ancestors of a genome, breadth first.
+
+        Returns:
+            list: (id, parent_1, parent_2, generation, depth) for the genome and each ancestor,
+                  every genome listed once. Parent ids are None for genomes without parents.
+        """
+        result = []
+        seen = {genome_id}
+        frontier = [genome_id]
+        depth = 0
+        while frontier and (max_depth is None or depth <= max_depth):
+            next_frontier = []
+            for current in frontier:
+                record = self.get(current)
+                if record is None:
+                    continue
+                _, parent_1, parent_2, generation = record
+                parents = [p for p in (parent_1, parent_2) if p != NO_PARENT]
+                result.append((current,
+                               parent_1 if parent_1 != NO_PARENT else None,
+                               parent_2 if parent_2 != NO_PARENT else None,
+                               generation, depth))
+                for parent in parents:
+                    if parent not in seen:
+                        seen.add(parent)
+                        next_frontier.append(parent)
+            frontier = next_frontier
+            depth += 1
+        return result
@@ -1,20 +1,25 @@
 # Mutate.py
 from .Network import Network
 from .Activations import ActivationFunctions
-from .InnovationTracker import tracker
+from .InnovationTracker import InnovationTracker, tracker as default_tracker
 from .Connection import Connection
-from .Node import Node, NodeType
+from .Node import Node, NodeType, INPUT, HIDDEN, OUTPUT
 
 import random
 
 class Mutate:
-    def __init__(self, network: Network):
+    def __init__(self, network: Network, tracker: InnovationTracker = None, rng: random.Random = None):
         if not isinstance(network, Network):
             raise TypeError("network is not of type Network")
         self.network = network
+        # Shared by the whole population so equal mutations get equal innovation numbers and node ids
+        self.tracker = tracker if tracker is not None else default_tracker
+        # Random generator for all mutation draws, the global `random` module when None
+        self.rng = rng
     
     def random_mutation(self):
-        mutation_type = random.choice([
+        rng = self.rng or random
+        mutation_type = rng.choice([
             self.mutate_add_connection,
             self.mutate_add_node,
             self.mutate_weights
@@ -22,29 +27,31 @@ class Mutate:
         mutation_type()
     
     def mutate(self, mutation_rate: float = 0.1):
-        if random.random() < mutation_rate:
-            if random.randint(0,2) == 0:
+        rng = self.rng or random
+        if rng.random() < mutation_rate:
+            if rng.randint(0,2) == 0:
                 self.mutate_add_connection()
-            elif random.randint(0,2) == 1:
+            elif rng.randint(0,2) == 1:
                 self.mutate_add_node()
             else:
                 self.mutate_weights()
     
     def mutate_add_connection(self):
+        rng = self.rng or random
         nodes = self.network.nodes
-        conns = self.network.conns
 
         max_attempts = 10  # Avoid infinite loops when finding valid connections
 
         for _ in range(max_attempts):
-            from_node = random.choice(nodes)
-            to_node = random.choice(nodes)
+            from_node = rng.choice(nodes)
+            to_node = rng.choice(nodes)
 
             # Ensure a valid connection based on rules:
+            from_type, to_type = from_node.ntype, to_node.ntype
             valid_connection = (
-                (from_node.ntype == NodeType.INPUT and to_node.ntype in {NodeType.HIDDEN, NodeType.OUTPUT}) or
-                (from_node.ntype == NodeType.HIDDEN and to_node.ntype in {NodeType.HIDDEN, NodeType.OUTPUT}) or
-                (from_node.ntype == NodeType.OUTPUT and to_node.ntype == NodeType.HIDDEN)  # Rare case
+                (from_type is INPUT and to_type is not INPUT) or
+                (from_type is HIDDEN and to_type is not INPUT) or
+                (from_type is OUTPUT and to_type is HIDDEN)  # Rare case
             )
 
             # Prevent self-connections
@@ -52,64 +59,67 @@ class Mutate:
                 continue
 
             # Check if the connection already exists
-            if any(conn.from_node == from_node and conn.to_node == to_node for conn in conns):
+            if self.network.has_connection(from_node.id, to_node.id):
                 continue
 
             if valid_connection:
                 # Use the innovation tracker to get a consistent innovation number
-                innov = tracker.get_innovation(from_node.id, to_node.id)
+                innov = self.tracker.get_innovation(from_node.id, to_node.id)
                 new_conn = Connection(
                     Innov=innov,
-                    weight=round(random.uniform(-1.0, 1.0), 2),
+                    weight=round(rng.uniform(-1.0, 1.0), 2),
                     from_node=from_node,
                     to_node=to_node,
                     enabled=True
                 )
-                self.network.conns.append(new_conn)
+                self.network.add_connection(new_conn)
                 return  # Exit after adding one connection
 
         # print("Failed to find a valid connection to add.")
 
     def mutate_add_node(self):
+        rng = self.rng or random
         conns = self.network.conns
-        nodes = self.network.nodes
 
         if not conns:
             # print("No connections to mutate.")
             return
 
         # Pick a random connection to split
-        conn = random.choice(conns)
+        conn = self.network.update_connection(rng.randrange(len(conns)), enabled=False) # Deactivate the connection
         from_node = conn.from_node
         to_node = conn.to_node
 
-        conn.enabled = False # Deactivate the connection
-
-        # Create a new hidden node
-        new_node_id = len(nodes) + 1
-        new_node = Node(new_node_id, NodeType.HIDDEN, random.uniform(-1.0, 1.0), ActivationFunctions.random_activation())  # ReLU activation
+        # Create a new hidden node, with the same id in every genome that splits this connection
+        new_node_id = self.tracker.get_split(conn.Innov)
+        while new_node_id in self.network.node_by_id:
+            # This genome already split the connection once before, the second split gets its own node
+            new_node_id = self.tracker.new_node_id()
+        new_node = Node(new_node_id, NodeType.HIDDEN, rng.uniform(-1.0, 1.0), ActivationFunctions.random_activation(rng), rng.uniform(-1.0, 1.0))
         
         # Add the new node to the network
-        self.network.nodes.append(new_node)
+        self.network.add_node(new_node)
 
         # Create two new connections:
         # - from `from_node` to the new node
         # - from the new node to `to_node`
-        weight_1 = round(random.uniform(-1.0, 1.0), 2)
+        weight_1 = round(rng.uniform(-1.0, 1.0), 2)
         weight_2 = conn.weight
-        innov_1 = len(self.network.conns) + 1
-        innov_2 = innov_1 + 1
+        innov_1 = self.tracker.get_innovation(from_node.id, new_node_id)
+        innov_2 = self.tracker.get_innovation(new_node_id, to_node.id)
         
         new_conn_1 = Connection(innov_1, weight_1, from_node, new_node)
         new_conn_2 = Connection(innov_2, weight_2, new_node, to_node)
 
-        self.network.conns.append(new_conn_1)
-        self.network.conns.append(new_conn_2)
+        self.network.add_connection(new_conn_1)
+        self.network.add_connection(new_conn_2)
 
         # print(f"Added node {new_node.id} and split connection {from_node.id} → {to_node.id}")
 
     def mutate_weights(self):
-        for conn in self.network.conns:
+        rng = self.rng or random
+        # Changed connections are replaced rather than edited, they may be shared with other genomes
+        for i, conn in enumerate(self.network.conns):
             if conn.enabled:
-                if random.random() < 0.1:
-                    conn.weight = round(random.uniform(-2.0, 2.0), 2)
\ No newline at end of file
+                if rng.random() < 0.1:
+                    self.network.update_connection(i, weight=round(rng.uniform(-2.0, 2.0), 2))
\ No newline at end of file
@@ -1,6 +1,35 @@
 # Network.py
-from .Node import Node, NodeType
+from .Node import Node, NodeType, INPUT
 from .Connection import Connection
+from .CompiledNetwork import CompiledNetwork
+from .RecurrentNetwork import RecurrentNetwork
+from .CodeGen import generate_function
+from .Activations import get_activation
+
+from array import array
+import bisect
+import hashlib
+import itertools
+
+import numpy as np
+
+_NODE_TYPES = list(NodeType)  # Node type <-> byte code used by encode()/decode()
+_revisions = itertools.count(1)  # Source of Network.revision numbers, unique within the process
+
+def _activation_name(act) -> str:
+    # Registered activations by name, anything else by identity (lambdas all share one name)
+    if act is None:
+        return ""
+    registered = get_activation(act)
+    if registered is not None:
+        return registered.name
+    return f"custom:{id(act)}"
+
+def _registered_activation(name: str):
+    registered = get_activation(name)
+    if registered is None:
+        raise ValueError(f"Unknown activation {name!r}, register it with register_activation() first")
+    return registered.scalar
 
 class Network:
     def __init__(self, nodes: list[Node], conns: list[Connection]):
@@ -11,11 +40,127 @@ class Network:
             if not isinstance(c, Connection):
                 raise TypeError("conns are not of type Connection")
         
+        self._setup(nodes, conns)
+
+    @classmethod
+    def _trusted(cls, nodes: list[Node], conns: list[Connection]):
+        """Build a network from genes that are already known to be valid (copies, crossover children, decoded genomes)."""
+        network = cls.__new__(cls)
+        network._setup(nodes, conns)
+        return network
+
+    def _setup(self, nodes: list[Node], conns: list[Connection]):
         self.nodes = nodes
         self.conns = conns
         self.fitness = 0.0 # Fitness score for the network
         self.processed_nodes = set()  # Keep track of processed nodes during input propagation
-    
+        self._compiled = None  # Cached execution plan, see compile()
+        self._genes = None  # Cached innovation-sorted gene arrays, see gene_arrays()
+        self._hash = None  # Cached structure_hash()
+        self._shared = False  # True while the gene lists and indexes are shared with a copy
+        self.revision = next(_revisions)  # Changes with every gene change, copies share it until then
+        self._build_index()
+
+    def _build_index(self):
+        """
+        Build the lookup tables used instead of scanning the node and connection lists:
+            node_by_id:    node id -> Node
+            nodes_by_type: NodeType -> list of nodes, in network order
+            incoming:      node id -> connections ending at that node
+            outgoing:      node id -> connections starting at that node
+            edges:         set of (from_id, to_id) pairs, enabled or not
+
+        They are kept up to date by add_node(), add_connection(), update_connection() and
+        set_enabled(), so use those instead of changing nodes/conns directly (or call
+        _build_index() again afterwards).
+        """
+        self.node_by_id = {}
+        self.nodes_by_type = {ntype: [] for ntype in NodeType}
+        self.incoming = {}
+        self.outgoing = {}
+        self.edges = set()
+
+        for node in self.nodes:
+            self._index_node(node)
+        for conn in self.conns:
+            self._index_connection(conn)
+
+    def _index_node(self, node: Node):
+        self.node_by_id[node.id] = node
+        self.nodes_by_type[node.ntype].append(node)
+        self.incoming.setdefault(node.id, [])
+        self.outgoing.setdefault(node.id, [])
+
+    def _index_connection(self, conn: Connection):
+        from_id, to_id = conn.from_node.id, conn.to_node.id
+        self.outgoing.setdefault(from_id, []).append(conn)
+        self.incoming.setdefault(to_id, []).append(conn)
+        self.edges.add((from_id, to_id))
+
+    def _own(self):
+        """
+        Copy-on-write: give this network private gene lists and indexes before changing them.
+
+        The Node and Connection objects themselves stay shared. Genes are never changed in
+        place, a changed gene is replaced by a modified copy (see update_connection()).
+        """
+        if not self._shared:
+            return
+        self.nodes = list(self.nodes)
+        self.conns = list(self.conns)
+        self.node_by_id = dict(self.node_by_id)
+        self.nodes_by_type = {ntype: list(nodes) for ntype, nodes in self.nodes_by_type.items()}
+        self.incoming = {node_id: list(conns) for node_id, conns in self.incoming.items()}
+        self.outgoing = {node_id: list(conns) for node_id, conns in self.outgoing.items()}
+        self.edges = set(self.edges)
+        self._shared = False
+
+    def add_node(self, node: Node):
+        """Append a node and update the indexes."""
+        self._own()
+        self.nodes.append(node)
+        self._index_node(node)
+        self.invalidate()
+
+    def add_connection(self, conn: Connection):
+        """Insert a connection, keeping conns sorted by innovation number, and update the indexes."""
+        self._own()
+        bisect.insort_right(self.conns, conn, key=lambda c: c.Innov)
+        self._index_connection(conn)
+        self.invalidate()
+
+    def update_connection(self, i: int, weight: float = None, enabled: bool = None) -> Connection:
+        """
+        Change the weight and/or enabled flag of self.conns[i].
+
+        The connection may be shared with copies of this network, so it is replaced by a
+        modified copy instead of being changed in place.
+
+        Returns:
+            Connection: The new connection.
+        """
+        self._own()
+        old = self.conns[i]
+        new = old.copy()
+        if weight is not None:
+            new.weight = weight
+        if enabled is not None:
+            new.enabled = enabled
+
+        self.conns[i] = new
+        for conns in (self.outgoing[old.from_node.id], self.incoming[old.to_node.id]):
+            conns[conns.index(old)] = new
+        self.invalidate()
+        return new
+
+    def set_enabled(self, conn: Connection, enabled: bool) -> Connection:
+        """Enable or disable a connection of this network, see update_connection()."""
+        return self.update_connection(self.conns.index(conn), enabled=enabled)
+
+    def has_connection(self, from_id: int, to_id: int) -> bool:
+        """Return True if a connection (enabled or not) from from_id to to_id exists."""
+        return (from_id, to_id) in self.edges
+
     def reset(self):
         """Reset the network by clearing the processed nodes set."""
         self.processed_nodes.clear()
@@ -23,28 +168,119 @@ class Network:
         for node in self.nodes:
             node.value = 0
 
+    def compile(self) -> CompiledNetwork:
+        """
+        Return the cached execution plan for this network, building it if needed.
+
+        The plan is a snapshot of the enabled topology, weights, biases and activations.
+        Anything that changes those has to call invalidate() afterwards.
+        """
+        if self._compiled is None:
+            self._compiled = CompiledNetwork(self)
+        return self._compiled
+
+    def recurrent(self) -> RecurrentNetwork:
+        """
+        Create a stateful, time-stepped runner for this network (see RecurrentNetwork).
+
+        Each call returns a new runner with its own state, built from the current genes.
+        """
+        return RecurrentNetwork(self)
+
+    def codegen(self, vectorized: bool = False):
+        """
+        Return this network's forward pass as generated Python code (see CodeGen.py).
+
+        The function is cached with the execution plan, so it is generated once and
+        dropped by invalidate(). It returns the same values as compile().activate().
+
+        Args:
+            vectorized (bool): Return the NumPy variant instead, which takes [B, n_in]
+                               and returns [B, n_out] like evaluate_batch().
+
+        Returns:
+            function: forward(inputs), inputs in input node order.
+        """
+        plan = self.compile()
+        function = plan.generated.get(vectorized)
+        if function is None:
+            function = plan.generated[vectorized] = generate_function(plan, vectorized)
+        return function
+
+    def invalidate(self):
+        """Drop the cached execution plan and gene arrays after the network has been changed."""
+        self._compiled = None
+        self._genes = None
+        self._hash = None
+        self.revision = next(_revisions)
+
+    def gene_arrays(self) -> tuple:
+        """
+        Return the connection genes as arrays sorted by innovation number, cached until invalidate().
+
+        Returns:
+            tuple: (innovations int64 array, enabled bool array, weights float array, object array of Connections)
+        """
+        if self._genes is None:
+            conns = np.empty(len(self.conns), dtype=object)
+            conns[:] = self.conns
+            innovs = np.fromiter((conn.Innov for conn in self.conns), dtype=np.int64, count=len(self.conns))
+            order = np.argsort(innovs, kind="stable")  # Already sorted unless conns was built out of order
+            conns = conns[order]
+            enabled = np.fromiter((conn.enabled for conn in conns), dtype=bool, count=len(conns))
+            weights = np.fromiter((conn.weight for conn in conns), dtype=float, count=len(conns))
+            self._genes = (innovs[order], enabled, weights, conns)
+        return self._genes
+
+    def structure_hash(self) -> bytes:
+        """
+        Hash of everything that decides what the network computes: the enabled connections
+        (endpoints and weights), and every node's id, type, bias and activation.
+
+        Innovation numbers, disabled connections and node/connection order are left out,
+        so two networks with the same phenotype get the same hash. Custom activations are
+        hashed by identity, so the hash is only meaningful within one process. Cached until invalidate().
+        """
+        if self._hash is None:
+            nodes = sorted(self.nodes, key=lambda n: n.id)
+            conns = sorted((c for c in self.conns if c.enabled), key=lambda c: (c.from_node.id, c.to_node.id))
+
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(array('q', [node.id for node in nodes]).tobytes())
+            digest.update(bytes(_NODE_TYPES.index(node.ntype) for node in nodes))
+            digest.update(array('d', [node.bias for node in nodes]).tobytes())
+            digest.update("|".join(_activation_name(node.activation) for node in nodes).encode())
+            digest.update(array('q', [c.from_node.id for c in conns]).tobytes())
+            digest.update(array('q', [c.to_node.id for c in conns]).tobytes())
+            digest.update(array('d', [c.weight for c in conns]).tobytes())
+            self._hash = digest.digest()
+        return self._hash
+
     def run(self):
-        """Run the network, processing connections layer by layer using pass_input."""
-        # Reset non-input nodes before propagation
-        for node in self.nodes:
-            if node.ntype != NodeType.INPUT:
-                node.value = 0  # Reset to prevent residual values
+        """
+        Run the network using the compiled execution plan.
 
-        # Feed the input nodes using pass_input
-        input_nodes = self.get_input_nodes()
-        self.processed_nodes.clear()  # Reset the processed nodes set for each run
-        
-        for in_node in input_nodes:
-            self.pass_input(in_node)
+        Input nodes are read from their current value. Every other node ends up holding
+        the weighted sum of its inputs, so node.get_output() applies bias and activation once.
+        """
+        plan = self.compile()
+        nodes = self.nodes
+        sums = plan.sweep([nodes[i].value for i in plan.input_idx])
 
-        # After propagating input, activate hidden and output nodes
-        for node in self.nodes:
-            if node.ntype != NodeType.INPUT:
-                # Only update non-input nodes that have incoming connections
-                if any(conn.to_node == node for conn in self.conns if conn.enabled):
-                    node.value = node.get_output()  # Process activation if it has inputs
-                else:
-                    node.value = 0  # No input? Output stays 0
+        for i in plan.order:
+            nodes[i].value = sums[i]
+
+    def evaluate_batch(self, inputs):
+        """
+        Evaluate many input rows at once without touching node values.
+
+        Args:
+            inputs: Array of shape [B, n_in], columns in input node order.
+
+        Returns:
+            np.ndarray: Array of shape [B, n_out], the same values run() + get_output() give per row.
+        """
+        return self.compile().evaluate_batch(inputs)
 
     def pass_input(self, in_node: Node):
         """Feed forward 1 node at a time, processing connections from an individual input node."""
@@ -54,33 +290,32 @@ class Network:
 
         self.processed_nodes.add(in_node)  # Mark this node as processed
 
-        conns = self.conns
         in_value = in_node.get_output()
 
-        for conn in conns:
-            if conn.from_node == in_node and conn.enabled:
+        for conn in self.outgoing.get(in_node.id, ()):
+            if conn.enabled:
                 to_node = conn.to_node
                 to_node.value += in_value * conn.weight  # Propagate input value
 
                 # Only propagate further if the node is not an input node
-                if to_node.ntype != NodeType.INPUT:
+                if to_node.ntype is not INPUT:
                     self.pass_input(to_node)  # Propagate further if necessary
     
     def get_output(self):
         """Return the output value of the output nodes."""
-        return [node.get_output() for node in self.nodes if node.ntype == NodeType.OUTPUT]
+        return [node.get_output() for node in self.nodes_by_type[NodeType.OUTPUT]]
     
     def get_input_nodes(self):
-        """Return the input nodes."""
-        return [node for node in self.nodes if node.ntype == NodeType.INPUT]
+        """Return the input nodes (a new list, the index can be shared with copies)."""
+        return list(self.nodes_by_type[NodeType.INPUT])
     
     def get_hidden_nodes(self):
         """Return the hidden nodes."""
-        return [node for node in self.nodes if node.ntype == NodeType.HIDDEN]
+        return list(self.nodes_by_type[NodeType.HIDDEN])
     
     def get_output_nodes(self):
         """Return the output nodes."""
-        return [node for node in self.nodes if node.ntype == NodeType.OUTPUT]
+        return list(self.nodes_by_type[NodeType.OUTPUT])
     
     def summary(self):
         return  "Nodes:\n" \
@@ -91,7 +326,113 @@ class Network:
                 f"{[conn.__repr__() for conn in self.conns]}"
 
     def copy(self):
-        """Create a deep copy of the network."""
+        """
+        Create a copy-on-write copy of the network.
+
+        The copy shares the gene lists, indexes and execution plan with this network until
+        one of them is changed through add_node(), add_connection() or update_connection(),
+        which gives that network its own lists first. Node and Connection objects stay
+        shared, so node values are scratch space and genes must not be changed in place.
+        """
+        copied = Network.__new__(Network)
+        copied.__dict__.update(self.__dict__)
+        copied.fitness = 0.0
+        copied.processed_nodes = set()
+        copied._shared = self._shared = True
+        return copied
+
+    def deep_copy(self):
+        """Create a fully independent copy, with the copied connections pointing at the copied nodes."""
         copied_nodes = [node.copy() for node in self.nodes]
-        copied_conns = [conn.copy() for conn in self.conns]
-        return Network(copied_nodes, copied_conns)
\ No newline at end of file
+        by_id = {node.id: node for node in copied_nodes}
+        copied_conns = [
+            conn.copy(by_id.get(conn.from_node.id, conn.from_node), by_id.get(conn.to_node.id, conn.to_node))
+            for conn in self.conns
+        ]
+        copied = Network._trusted(copied_nodes, copied_conns)
+        copied._compiled = self._compiled  # Same genes, so the plan can be shared
+        return copied
+
+    def renumber(self, innov_map: dict, node_map: dict) -> "Network":
+        """
+        Apply the innovation number and node id maps returned by InnovationTracker.merge().
+
+        Returns:
+            Network: This network if no gene is affected, otherwise a new network with
+                     renumbered copies of the affected genes (fitness is kept).
+        """
+        if not any(node.id in node_map for node in self.nodes) and not any(conn.Innov in innov_map for conn in self.conns):
+            return self
+
+        nodes = []
+        by_id = {}
+        for node in self.nodes:
+            if node.id in node_map:
+                old_id = node.id
+                node = node.copy()
+                node.id = node_map[old_id]
+                by_id[old_id] = node
+            nodes.append(node)
+
+        conns = []
+        for conn in self.conns:
+            from_node = by_id.get(conn.from_node.id)
+            to_node = by_id.get(conn.to_node.id)
+            if from_node is not None or to_node is not None or conn.Innov in innov_map:
+                conn = conn.copy(from_node, to_node)
+                conn.Innov = innov_map.get(conn.Innov, conn.Innov)
+            conns.append(conn)
+        conns.sort(key=lambda c: c.Innov)
+
+        renumbered = Network._trusted(nodes, conns)
+        renumbered.fitness = self.fitness
+        return renumbered
+
+    def encode(self) -> tuple:
+        """
+        Encode the genes of the network as a compact tuple of flat arrays.
+
+        Connections refer to nodes by id instead of by object, so the encoding pickles
+        as a handful of byte buffers rather than a graph of Node/Connection objects.
+        Registered activations are stored by name, unregistered ones by reference.
+        """
+        activations = [None]
+        node_acts = bytearray()
+        for node in self.nodes:
+            act = node.activation
+            registered = get_activation(act) if act is not None else None
+            key = registered.name if registered is not None else act
+            if key not in activations:
+                activations.append(key)
+            node_acts.append(activations.index(key))
+
+        return (
+            array('q', [node.id for node in self.nodes]),
+            bytes(_NODE_TYPES.index(node.ntype) for node in self.nodes),
+            array('d', [node.bias for node in self.nodes]),
+            bytes(node_acts),
+            tuple(activations),
+            array('q', [conn.Innov for conn in self.conns]),
+            array('q', [conn.from_node.id for conn in self.conns]),
+            array('q', [conn.to_node.id for conn in self.conns]),
+            array('d', [conn.weight for conn in self.conns]),
+            bytes(conn.enabled for conn in self.conns),
+        )
+
+    @staticmethod
+    def decode(data: tuple) -> "Network":
+        """Rebuild a Network from the output of encode()."""
+        node_ids, node_types, biases, node_acts, activations, innovs, from_ids, to_ids, weights, enabled = data
+
+        functions = [_registered_activation(act) if isinstance(act, str) else act for act in activations]
+        nodes = [
+            Node(node_id, _NODE_TYPES[ntype], 0.0, functions[act], bias)
+            for node_id, ntype, bias, act in zip(node_ids, node_types, biases, node_acts)
+        ]
+        by_id = {node.id: node for node in nodes}
+        conns = [
+            Connection(innov, weight, by_id[from_id], by_id[to_id], bool(on))
+            for innov, from_id, to_id, weight, on in zip(innovs, from_ids, to_ids, weights, enabled)
+            if from_id in by_id and to_id in by_id  # Like compile(), drop connections to nodes the network doesn't have
+        ]
+        return Network(nodes, conns)
\ No newline at end of file
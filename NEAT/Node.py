@@ -8,7 +8,18 @@ class NodeType(Enum):
     HIDDEN = "Hidden"
     OUTPUT = "Output"
 
+    # Members are singletons, so the identity hash is enough and much cheaper than Enum's name hash
+    __hash__ = object.__hash__
+
+# Looking a member up on the Enum class goes through EnumType, so hot loops compare
+# against these module-level aliases with `is` instead
+INPUT = NodeType.INPUT
+HIDDEN = NodeType.HIDDEN
+OUTPUT = NodeType.OUTPUT
+
 class Node:
+    __slots__ = ("id", "ntype", "value", "activation", "bias")
+
     def __init__(self, id: int, ntype: NodeType, value: float, activation: Optional[Callable[[float], float]] = None, bias=None):
         self.id = id
         self.ntype = ntype
@@ -18,18 +29,29 @@ class Node:
 
         # Bias should be included for both hidden and output nodes
         if self.bias == None:
-            if ntype in {NodeType.HIDDEN, NodeType.OUTPUT}:
+            if ntype is not INPUT:
                 self.bias = random.uniform(-1.0, 1.0)
             else:
                 self.bias = 0.0  # Input nodes have no bias
 
+    @classmethod
+    def _trusted(cls, id: int, ntype: NodeType, value: float, activation, bias: float):
+        """Build a node from fields that are already known to be valid, skipping __init__."""
+        node = cls.__new__(cls)
+        node.id = id
+        node.ntype = ntype
+        node.value = value
+        node.activation = activation
+        node.bias = bias
+        return node
+
     def get_output(self) -> float:
         """Compute the node's output with bias and activation."""
         output = self.value + self.bias
         return self.activation(output) if self.activation else output
 
     def copy(self):
-        return Node(self.id, self.ntype, self.value, self.activation)
+        return Node._trusted(self.id, self.ntype, self.value, self.activation, self.bias)
     
     def __repr__(self):
         return str({"id": self.id, "type": self.ntype.value, "value": self.value, "activation": self.activation, "bias": self.bias})
@@ -0,0 +1,98 @@
+# ParallelEvaluator.py
+from .Network import Network
+from .FitnessCache import FitnessCache
+
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+
+# Set once per worker process by _init_worker, so tasks only carry genomes
+_worker_fitness_function = None
+
+def _init_worker(fitness_function):
+    global _worker_fitness_function
+    _worker_fitness_function = fitness_function
+
+def _evaluate_chunk(encoded_networks: list) -> list:
+    """Decode and score a chunk of networks inside a worker process."""
+    return [float(_worker_fitness_function(Network.decode(data))) for data in encoded_networks]
+
+
+class ParallelEvaluator:
+    """
+    Spreads fitness evaluation over a pool of worker processes.
+
+    Genomes are shipped to the workers as Network.encode() tuples instead of pickled
+    object graphs, in chunks of `chunksize` genomes per task. The fitness function is
+    sent to each worker once, when the pool starts, so it has to be picklable (a
+    module-level function, not a lambda).
+
+    The pool is created on first use and kept alive between generations. Use the
+    evaluator as a context manager, or call close(), to shut it down.
+    """
+
+    def __init__(self, fitness_function, num_workers: int = None, chunksize: int = None, mp_context=None,
+                 cache: FitnessCache = None):
+        """
+        Args:
+            fitness_function: Called as fitness_function(network) in the workers, returns a float.
+            num_workers: Number of worker processes, defaults to os.cpu_count().
+            chunksize: Genomes per task. Defaults to spreading the population over ~4 tasks per worker.
+            mp_context: Optional multiprocessing context (e.g. multiprocessing.get_context("spawn")).
+            cache: Optional FitnessCache, only genomes with a structure it hasn't seen are sent
+                   to the workers. Leave it out for stochastic fitness functions.
+        """
+        self.fitness_function = fitness_function
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.mp_context = mp_context
+        self.cache = cache
+        self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=self.mp_context,
+                initializer=_init_worker,
+                initargs=(self.fitness_function,),
+            )
+        return self._pool
+
+    def evaluate(self, genomes: list) -> list:
+        """
+        Score every genome in parallel and write the result to genome.network.fitness.
+
+        Returns:
+            list: The fitnesses, in the same order as `genomes`.
+        """
+        if not genomes:
+            return []
+        if self.cache is not None:
+            return self.cache.evaluate(genomes, self._evaluate)
+        return self._evaluate(genomes)
+
+    def _evaluate(self, genomes: list) -> list:
+        chunksize = self.chunksize or max(1, math.ceil(len(genomes) / (self.num_workers * 4)))
+        encoded = [genome.network.encode() for genome in genomes]
+        chunks = [encoded[i:i + chunksize] for i in range(0, len(encoded), chunksize)]
+
+        fitnesses = []
+        for chunk_result in self._get_pool().map(_evaluate_chunk, chunks):
+            fitnesses.extend(chunk_result)
+
+        for genome, fitness in zip(genomes, fitnesses):
+            genome.network.fitness = fitness
+        return fitnesses
+
+    def close(self):
+        """Shut down the worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
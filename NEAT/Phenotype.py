@@ -3,19 +3,37 @@ from .Node import Node, NodeType
 from .Connection import Connection
 from .Network import Network
 
-# Import display libraries
-import matplotlib.pyplot as plt
-import networkx as nx
-import numpy as np
+# The display libraries (matplotlib, networkx) are heavy, so they are only imported
+# the first time something is drawn. Evaluation never needs them.
+_backend = None
+
+def _load_backend():
+    """Import the plotting libraries on first use and return (plt, nx, np)."""
+    global _backend
+    if _backend is None:
+        import matplotlib.pyplot as plt
+        import networkx as nx
+        import numpy as np
+        _backend = (plt, nx, np)
+    return _backend
 
 
 class Phenotype:
     def __init__(self, network:Network):
-        # Initialize with nodes and connections
-        self.nodes = network.nodes if network.nodes else []
-        self.connections = network.conns if network.conns else []
+        # Keep the network itself, its gene lists can be replaced when a shared copy is mutated
+        self.network = network
+
+    @property
+    def nodes(self):
+        return self.network.nodes
+
+    @property
+    def connections(self):
+        return self.network.conns
 
     def visualize(self):
+        plt, nx, np = _load_backend()
+
         # Create a directed graph
         graph = nx.DiGraph()
 
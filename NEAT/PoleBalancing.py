@@ -0,0 +1,196 @@
+# PoleBalancing.py
+import numpy as np
+
+def _spread(states: np.ndarray, n: int) -> np.ndarray:
+    """Repeat `starts` start states over n environments, environment i gets state i % starts."""
+    return np.tile(states, (-(-n // len(states)), 1))[:n]
+
+class SinglePoleBalancing:
+    """
+    N cart-pole systems simulated together (Barto, Sutton & Anderson 1983), as a reference
+    benchmark for Rollout.
+
+    The state of every cart is one row of `state`: [x, x_dot, theta, theta_dot]. The
+    network gets the state scaled to roughly [-1, 1] and answers with one output, the
+    force on the cart: the output is clipped to [-1, 1] and multiplied by FORCE_MAG.
+    An episode ends when the cart leaves the track or the pole falls past 12 degrees.
+    The reward is 1 for every time step the pole stays up.
+    """
+
+    GRAVITY = 9.8
+    MASS_CART = 1.0
+    MASS_POLE = 0.1
+    HALF_LENGTH = 0.5  # Half the pole length
+    FORCE_MAG = 10.0
+    TAU = 0.02  # Seconds per time step
+    TRACK_LIMIT = 2.4
+    ANGLE_LIMIT = 12 * np.pi / 180
+
+    observation_size = 4
+    action_size = 1
+
+    def __init__(self, n: int, seed=None, starts: int = None, noise: float = 0.05):
+        """
+        Args:
+            n (int): Number of environments.
+            seed: Seed of the start states.
+            starts (int): Number of different start states, environment i starts in state i % starts.
+                          By default every environment gets its own.
+            noise (float): Every state variable starts uniform in [-noise, noise].
+        """
+        self.n = n
+        self.starts = starts or n
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+        self.state = np.zeros((n, 4))
+
+    def reset(self) -> np.ndarray:
+        """Start a new episode in every environment and return the observations, [N, observation_size]."""
+        self.state = _spread(self.rng.uniform(-self.noise, self.noise, size=(self.starts, 4)), self.n)
+        return self.observe()
+
+    def observe(self, index=slice(None)) -> np.ndarray:
+        x, x_dot, theta, theta_dot = self.state[index].T
+        return np.stack([x / self.TRACK_LIMIT, x_dot / 2.0, theta / self.ANGLE_LIMIT, theta_dot / 2.0], axis=1)
+
+    def step(self, actions, index=slice(None)):
+        """
+        Advance the environments at `index` (default: all of them) by one time step.
+
+        Args:
+            actions: Network outputs for those environments, shape [len(index), action_size].
+            index: Indices of the environments to step, the others are left alone.
+
+        Returns:
+            tuple: (observations, rewards, done) for the stepped environments.
+        """
+        force = np.clip(np.asarray(actions, dtype=float)[:, 0], -1.0, 1.0) * self.FORCE_MAG
+        x, x_dot, theta, theta_dot = self.state[index].T
+
+        total_mass = self.MASS_CART + self.MASS_POLE
+        pole_mass_length = self.MASS_POLE * self.HALF_LENGTH
+        cos, sin = np.cos(theta), np.sin(theta)
+
+        temp = (force + pole_mass_length * theta_dot ** 2 * sin) / total_mass
+        theta_acc = (self.GRAVITY * sin - cos * temp) / \
+            (self.HALF_LENGTH * (4.0 / 3.0 - self.MASS_POLE * cos ** 2 / total_mass))
+        x_acc = temp - pole_mass_length * theta_acc * cos / total_mass
+
+        # Euler integration, in the same order as the original cart-pole code
+        x = x + self.TAU * x_dot
+        x_dot = x_dot + self.TAU * x_acc
+        theta = theta + self.TAU * theta_dot
+        theta_dot = theta_dot + self.TAU * theta_acc
+        self.state[index] = np.stack([x, x_dot, theta, theta_dot], axis=1)
+
+        done = (np.abs(x) > self.TRACK_LIMIT) | (np.abs(theta) > self.ANGLE_LIMIT)
+        rewards = np.ones(len(done))
+        return self.observe(index), rewards, done
+
+class DoublePoleBalancing:
+    """
+    N carts with two poles of different length, simulated together (the double pole
+    balancing benchmark of the NEAT paper, with velocities given to the network).
+
+    The state of every cart is one row of `state`:
+    [x, x_dot, theta_1, theta_1_dot, theta_2, theta_2_dot]. The network gets the state
+    scaled to roughly [-1, 1] and answers with one output, the force on the cart, clipped
+    to [-1, 1] and multiplied by FORCE_MAG. The equations of motion (Wieland 1991) are
+    integrated with two 4th order Runge-Kutta steps of 0.01 s per time step. An episode
+    ends when the cart leaves the track or a pole falls past 36 degrees. The reward is
+    1 for every time step both poles stay up.
+    """
+
+    GRAVITY = -9.8
+    MASS_CART = 1.0
+    MASS_POLES = np.array([0.1, 0.01])
+    HALF_LENGTHS = np.array([0.5, 0.05])
+    FRICTION = 0.000002  # Friction of the pole hinges
+    FORCE_MAG = 10.0
+    TAU = 0.01  # Seconds per integration step
+    TRACK_LIMIT = 2.4
+    ANGLE_LIMIT = 36 * np.pi / 180
+    START_ANGLE = 4.0156 * np.pi / 180  # The long pole starts tilted by about 4 degrees
+
+    observation_size = 6
+    action_size = 1
+
+    def __init__(self, n: int, seed=None, starts: int = None, noise: float = 0.0):
+        """
+        Args:
+            n (int): Number of environments.
+            seed: Seed of the start states.
+            starts (int): Number of different start states, environment i starts in state i % starts.
+                          By default every environment gets its own.
+            noise (float): Uniform noise in [-noise, noise] added to every start state variable.
+                           The standard benchmark starts all carts the same way (noise=0).
+        """
+        self.n = n
+        self.starts = starts or n
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+        self.state = np.zeros((n, 6))
+
+    def reset(self) -> np.ndarray:
+        """Start a new episode in every environment and return the observations, [N, observation_size]."""
+        self.state = np.zeros((self.n, 6))
+        self.state[:, 2] = self.START_ANGLE
+        if self.noise:
+            self.state += _spread(self.rng.uniform(-self.noise, self.noise, size=(self.starts, 6)), self.n)
+        return self.observe()
+
+    def observe(self, index=slice(None)) -> np.ndarray:
+        scale = np.array([self.TRACK_LIMIT, 2.0, self.ANGLE_LIMIT, 2.0, self.ANGLE_LIMIT, 2.0])
+        return self.state[index] / scale
+
+    def _derivative(self, force, state):
+        x_dot = state[:, 1]
+        theta = state[:, 2::2]  # [n, 2]
+        theta_dot = state[:, 3::2]
+        force = force[:, None]
+
+        cos, sin = np.cos(theta), np.sin(theta)
+        g_sin = self.GRAVITY * sin
+        ml = self.HALF_LENGTHS * self.MASS_POLES
+        temp = self.FRICTION * theta_dot / ml
+
+        # Effective force and mass of each pole on the cart
+        fi = ml * theta_dot ** 2 * sin + 0.75 * self.MASS_POLES * cos * (temp + g_sin)
+        mi = self.MASS_POLES * (1 - 0.75 * cos ** 2)
+
+        x_acc = (force[:, 0] + fi.sum(axis=1)) / (mi.sum(axis=1) + self.MASS_CART)
+        theta_acc = -0.75 * (x_acc[:, None] * cos + g_sin + temp) / self.HALF_LENGTHS
+
+        derivative = np.empty_like(state)
+        derivative[:, 0] = x_dot
+        derivative[:, 1] = x_acc
+        derivative[:, 2::2] = theta_dot
+        derivative[:, 3::2] = theta_acc
+        return derivative
+
+    def _rk4(self, force, state):
+        k1 = self._derivative(force, state)
+        k2 = self._derivative(force, state + 0.5 * self.TAU * k1)
+        k3 = self._derivative(force, state + 0.5 * self.TAU * k2)
+        k4 = self._derivative(force, state + self.TAU * k3)
+        return state + self.TAU / 6.0 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+    def step(self, actions, index=slice(None)):
+        """
+        Advance the environments at `index` (default: all of them) by one time step.
+
+        Args:
+            actions: Network outputs for those environments, shape [len(index), action_size].
+            index: Indices of the environments to step, the others are left alone.
+
+        Returns:
+            tuple: (observations, rewards, done) for the stepped environments.
+        """
+        force = np.clip(np.asarray(actions, dtype=float)[:, 0], -1.0, 1.0) * self.FORCE_MAG
+        state = self._rk4(force, self._rk4(force, self.state[index]))
+        self.state[index] = state
+
+        done = (np.abs(state[:, 0]) > self.TRACK_LIMIT) | \
+               (np.abs(state[:, 2]) > self.ANGLE_LIMIT) | (np.abs(state[:, 4]) > self.ANGLE_LIMIT)
+        rewards = np.ones(len(done))
+        return self.observe(index), rewards, done
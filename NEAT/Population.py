@@ -0,0 +1,240 @@
+# Population.py
+from .Network import Network
+from .Genome import Genome
+from .Crossover import Crossover
+from .Species import Speciation
+from .InnovationTracker import InnovationTracker
+from .Lineage import LineageLog
+from .FitnessCache import FitnessCache
+from .Profiler import GenerationProfiler
+
+from contextlib import nullcontext
+import random
+import numpy as np
+
+_NO_PHASE = nullcontext()
+
+class Population:
+    """
+    Owns a population of genomes and the generation loop: evaluation, selection,
+    crossover and mutation.
+
+    Selection tables are built once per generation, so each parent draw is a binary
+    search (fitness-proportionate) or a handful of random indices (tournament), and
+    all parents of a generation are drawn in one vectorized call. Children are then
+    produced with a single Crossover.crossover_batch() call.
+    """
+
+    def __init__(self, template: Network, fitness_function=None, size: int = 10, elite_count: int = 2,
+                 mutation_rate: float = 0.7, evaluator=None, speciation: Speciation = None,
+                 selection: str = "proportionate", tournament_size: int = 3, seed: int = None,
+                 tracker: InnovationTracker = None, lineage: LineageLog = None,
+                 deterministic_fitness: bool = True, fitness_cache: FitnessCache = None,
+                 profiler: GenerationProfiler = None):
+        """
+        Args:
+            template (Network): Starting network, every initial genome gets a copy of it.
+            fitness_function: Called as fitness_function(network) when no evaluator is given.
+            size (int): Number of genomes per generation.
+            elite_count (int): Number of top genomes carried over unchanged.
+            mutation_rate (float): Passed to Genome.mutate() for every child.
+            evaluator: Optional object with an evaluate(genomes) method that writes
+                       genome.network.fitness (PopulationEvaluator, ParallelEvaluator, ...).
+            speciation (Speciation): Optional, enables speciation and explicit fitness sharing.
+            selection (str): "proportionate" or "tournament".
+            tournament_size (int): Genomes per tournament when selection is "tournament".
+            seed (int): Seed for selection, crossover, mutation and the choice of species
+                        representatives. Seeded from the global `random` module by default.
+            tracker (InnovationTracker): Innovation numbers and node ids for the population,
+                                         a new tracker seeded from `template` by default.
+            lineage (LineageLog): Optional, every new genome's parents are streamed to it.
+            deterministic_fitness (bool): Set to False for stochastic fitness functions, which
+                                          turns off fitness caching.
+            fitness_cache (FitnessCache): Cache used while deterministic_fitness is True, a new
+                                          FitnessCache() by default.
+            profiler (GenerationProfiler): Optional, records the time of every phase of each generation.
+        """
+        if fitness_function is None and evaluator is None:
+            raise ValueError("Either a fitness_function or an evaluator is required")
+        if selection not in ("proportionate", "tournament"):
+            raise ValueError(f"Unknown selection method: {selection}")
+
+        self.fitness_function = fitness_function
+        self.size = size
+        self.elite_count = elite_count
+        self.mutation_rate = mutation_rate
+        self.evaluator = evaluator
+        self.speciation = speciation
+        self.selection = selection
+        self.tournament_size = tournament_size
+        self.fitness_cache = None
+        if deterministic_fitness:
+            self.fitness_cache = fitness_cache if fitness_cache is not None else FitnessCache()
+
+        self.rng = np.random.default_rng(seed if seed is not None else random.getrandbits(64))
+        self.crossover = Crossover(seed=int(self.rng.integers(1 << 63)))
+        # Mutation and Speciation use the `random` API, they draw from this generator instead of the global one
+        self.py_rng = random.Random(int(self.rng.integers(1 << 63)))
+
+        self.tracker = tracker if tracker is not None else InnovationTracker()
+        self.tracker.register_network(template)
+
+        self.generation = 0
+        self.genomes = [Genome(template.copy(), self.tracker, self.py_rng) for _ in range(size)]
+        self.best_genome = None
+        self.best_fitnesses = []
+        self.avg_fitnesses = []
+
+        self.lineage = lineage
+        if lineage is not None:
+            for genome in self.genomes:
+                lineage.record(genome.id, generation=0)
+
+        self.profiler = profiler
+
+        # Fitness of the weakest elite of the previous generation. Incremental evaluators
+        # (IncrementalEvaluator) stop genomes that can't reach it, they can't become elites.
+        self.cutoff = None
+
+    def _phase(self, name: str):
+        """Time a phase of the generation with the profiler, a no-op without one."""
+        return self.profiler.phase(name) if self.profiler is not None else _NO_PHASE
+
+    def evaluate(self) -> np.ndarray:
+        """Score every genome of the current generation and return the fitness vector."""
+        if self.fitness_cache is not None:
+            self.fitness_cache.evaluate(self.genomes, self._evaluate)
+        else:
+            self._evaluate(self.genomes)
+        return np.array([genome.network.fitness for genome in self.genomes], dtype=float)
+
+    def _evaluate(self, genomes: list):
+        if self.evaluator is not None and getattr(self.evaluator, "incremental", False):
+            self.evaluator.evaluate(genomes, cutoff=self.cutoff)
+        elif self.evaluator is not None:
+            self.evaluator.evaluate(genomes)
+        else:
+            for genome in genomes:
+                genome.network.fitness = self.fitness_function(genome.network)
+
+    def _selection_weights(self, fitness: np.ndarray) -> np.ndarray:
+        # Shift to non-negative (small constant avoids all-zero weights), like the original select_parents
+        if fitness.min() < 0:
+            fitness = fitness - fitness.min() + 1e-6
+        if fitness.sum() <= 0:
+            fitness = np.ones_like(fitness)
+        return fitness
+
+    def _draw(self, fitness: np.ndarray, n: int) -> np.ndarray:
+        """Draw n parent indices into `fitness`, using tables built once for the whole call."""
+        if self.selection == "tournament":
+            entrants = self.rng.integers(0, len(fitness), size=(n, self.tournament_size))
+            return entrants[np.arange(n), np.argmax(fitness[entrants], axis=1)]
+
+        # Fitness-proportionate: prefix sums once, then a binary search per draw
+        cumulative = np.cumsum(self._selection_weights(fitness))
+        picks = np.searchsorted(cumulative, self.rng.random(n) * cumulative[-1], side="right")
+        return np.minimum(picks, len(fitness) - 1)
+
+    def select_pairs(self, members: list, fitness: np.ndarray, n: int) -> list:
+        """
+        Select n (parent1, parent2) pairs from `members`.
+
+        If both parents of a pair are the same genome, the second one is drawn again once.
+        """
+        first = self._draw(fitness, n)
+        second = self._draw(fitness, n)
+        same = first == second
+        if same.any():
+            second[same] = self._draw(fitness, int(same.sum()))
+        return [(members[a], members[b]) for a, b in zip(first, second)]
+
+    def _plan_pairs(self, fitness: np.ndarray, n: int) -> list:
+        """Parent pairs for n children, split between species when speciation is on."""
+        if self.speciation is None:
+            with self._phase("selection"):
+                return self.select_pairs(self.genomes, fitness, n)
+
+        with self._phase("speciation"):
+            self.speciation.speciate(self.genomes, self.py_rng)
+            shared = self.speciation.share_fitness()
+            counts = self.speciation.allocate_offspring(n)
+
+        pairs = []
+        with self._phase("selection"):
+            for species in self.speciation.species:
+                if counts.get(species.id):
+                    member_fitness = np.array([shared[genome.id] for genome in species.members])
+                    pairs.extend(self.select_pairs(species.members, member_fitness, counts[species.id]))
+        return pairs
+
+    def reproduce(self) -> list:
+        """Build the next generation from the evaluated current one."""
+        fitness = np.array([genome.network.fitness for genome in self.genomes], dtype=float)
+        ranked = np.argsort(-fitness, kind="stable")
+
+        # Elites are carried over unchanged (copy-on-write, so this is cheap)
+        next_generation = [self.genomes[i].copy() for i in ranked[:self.elite_count]]
+        if next_generation:
+            self.cutoff = float(fitness[ranked[len(next_generation) - 1]])
+
+        pairs = self._plan_pairs(fitness, self.size - len(next_generation))
+        with self._phase("crossover"):
+            children = []
+            for (parent1, parent2), child_net in zip(pairs, self.crossover.crossover_batch([(p1.network, p2.network) for p1, p2 in pairs])):
+                child = Genome(child_net, self.tracker, self.py_rng)
+                child.generation = max(parent1.generation, parent2.generation) + 1
+                child.parent_ids = [parent1.id, parent2.id]
+                children.append(child)
+
+        if self.lineage is not None:
+            with self._phase("io"):
+                for child in children:
+                    self.lineage.record(child.id, *child.parent_ids, child.generation)
+
+        with self._phase("mutation"):
+            for child in children:
+                child.mutate(self.mutation_rate)
+        next_generation.extend(children)
+
+        self.tracker.next_generation()
+        return next_generation
+
+    def step(self) -> np.ndarray:
+        """Evaluate the current generation, record its statistics and replace it with the next one."""
+        if self.profiler is not None:
+            self.profiler.begin_generation(self)
+        with self._phase("evaluation"):
+            fitness = self.evaluate()
+
+        best = int(np.argmax(fitness))
+        if self.best_genome is None or fitness[best] > self.best_genome.network.fitness:
+            self.best_genome = self.genomes[best]
+        self.best_fitnesses.append(float(fitness[best]))
+        self.avg_fitnesses.append(float(fitness.mean()))
+
+        self.genomes = self.reproduce()
+        self.generation += 1
+        if self.profiler is not None:
+            self.profiler.end_generation(self, fitness)
+        return fitness
+
+    def run(self, generations: int, target_fitness: float = None, callback=None) -> Genome:
+        """
+        Run the generation loop.
+
+        Args:
+            generations (int): Maximum number of generations.
+            target_fitness (float): Stop once the best genome reaches this fitness.
+            callback: Optional, called as callback(population, fitness) after every generation.
+
+        Returns:
+            Genome: The best genome seen so far.
+        """
+        for _ in range(generations):
+            fitness = self.step()
+            if callback is not None:
+                callback(self, fitness)
+            if target_fitness is not None and self.best_genome.network.fitness >= target_fitness:
+                break
+        return self.best_genome
@@ -0,0 +1,215 @@
+# PopulationEvaluator.py
+from .CompiledNetwork import CompiledNetwork, vectorize_activation
+from .Activations import get_activation
+
+import numpy as np
+
+class _Block:
+    """The packed arrays of one compiled network, with node indices local to the network."""
+
+    def __init__(self, plan: CompiledNetwork, act_ids: list):
+        self.plan = plan  # Keeps the plan alive so its id() stays unique while cached
+        self.n_nodes = len(plan.node_ids)
+        self.bias = np.array(plan.bias, dtype=float)
+        self.act = np.array(act_ids, dtype=np.int64)
+        self.level = np.array(plan.level, dtype=np.int64)
+        self.src = np.array(plan.src, dtype=np.int64)
+        self.dst = np.array(plan.dst, dtype=np.int64)
+        self.weight = np.array(plan.weight, dtype=float)
+        self.inputs = np.array(plan.input_idx, dtype=np.int64)
+        self.outputs = np.array(plan.output_idx, dtype=np.int64)
+
+
+class PopulationEvaluator:
+    """
+    Evaluates every genome of a generation in one vectorized pass.
+
+    All compiled networks are packed into one block-sparse layout: node arrays are
+    concatenated with a per-genome offset and edges are regrouped by the level of
+    their target node. A forward pass then costs one gather/reduce per level and one
+    activation call per (level, activation) pair, no matter how many genomes there are.
+
+    Packed blocks are cached per execution plan, so genomes whose network hasn't
+    changed since the last generation reuse their slot instead of being re-packed.
+    """
+
+    def __init__(self, inputs, fitness_function):
+        """
+        Args:
+            inputs: Shared input batch of shape [B, n_in].
+            fitness_function: Takes the outputs of the whole population, shape [P, B, n_out],
+                              and returns one fitness per genome, shape [P].
+        """
+        self.inputs = np.asarray(inputs, dtype=float)
+        self.fitness_function = fitness_function
+
+        self._act_ids = {None: 0}  # activation callable -> activation id nodes are grouped by
+        self._vector_acts = {0: None}  # activation id -> NumPy activation
+        self._blocks = {}  # id(plan) -> _Block
+        self._packed_plans = None
+        self._packed = None
+        self._selected = None  # (rows, layout) of the last activate(rows=...) on the packed layout
+
+    def _activation_id(self, act) -> int:
+        # Registered activations keep their registry id, unregistered ones get a negative id of their own
+        act_id = self._act_ids.get(act)
+        if act_id is None:
+            registered = get_activation(act)
+            act_id = registered.id if registered is not None else min(self._vector_acts) - 1
+            self._act_ids[act] = act_id
+            self._vector_acts[act_id] = vectorize_activation(act)
+        return act_id
+
+    def _block(self, plan: CompiledNetwork) -> _Block:
+        block = self._blocks.get(id(plan))
+        if block is None:
+            act_ids = [self._activation_id(plan.activations[a]) for a in plan.act_id]
+            block = _Block(plan, act_ids)
+            self._blocks[id(plan)] = block
+        return block
+
+    def pack(self, genomes: list):
+        """Build (or reuse) the packed layout for this list of genomes."""
+        plans = [genome.network.compile() for genome in genomes]
+        if self._packed_plans is not None and len(plans) == len(self._packed_plans) \
+                and all(a is b for a, b in zip(plans, self._packed_plans)):
+            return self._packed
+
+        blocks = [self._block(plan) for plan in plans]
+
+        # Forget blocks of genomes that are no longer in the population
+        live = {id(plan) for plan in plans}
+        self._blocks = {key: block for key, block in self._blocks.items() if key in live}
+
+        n_in = {len(block.inputs) for block in blocks}
+        n_out = {len(block.outputs) for block in blocks}
+        if len(n_in) > 1 or len(n_out) > 1:
+            raise ValueError("All genomes must have the same number of input and output nodes")
+
+        sizes = np.array([block.n_nodes for block in blocks], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        edge_counts = np.array([len(block.src) for block in blocks], dtype=np.int64)
+        edge_offsets = np.repeat(offsets, edge_counts)
+
+        bias = np.concatenate([block.bias for block in blocks])
+        act = np.concatenate([block.act for block in blocks])
+        level = np.concatenate([block.level for block in blocks])
+        src = np.concatenate([block.src for block in blocks]) + edge_offsets
+        dst = np.concatenate([block.dst for block in blocks]) + edge_offsets
+        weight = np.concatenate([block.weight for block in blocks])
+        inputs = np.stack([block.inputs for block in blocks]) + offsets[:, None]
+        outputs = np.stack([block.outputs for block in blocks]) + offsets[:, None]
+
+        # Edges sorted by (target level, target), stable so each node keeps its plan's summation order
+        edge_order = np.lexsort((dst, level[dst]))
+        src, dst, weight = src[edge_order], dst[edge_order], weight[edge_order]
+        edge_level = level[dst]
+
+        # Nodes grouped by (level, activation)
+        node_order = np.lexsort((act, level))
+        node_level = level[node_order]
+        max_level = int(node_level[-1])
+
+        levels = []
+        for lvl in range(max_level + 1):
+            lo, hi = np.searchsorted(edge_level, [lvl, lvl + 1])
+            e_dst = dst[lo:hi]
+            targets, starts = np.unique(e_dst, return_index=True) if hi > lo else (e_dst, e_dst)
+
+            groups = []
+            n_lo, n_hi = np.searchsorted(node_level, [lvl, lvl + 1])
+            in_level = node_order[n_lo:n_hi]
+            acts, group_starts = np.unique(act[in_level], return_index=True)
+            for a, idx in zip(acts, np.split(in_level, group_starts[1:])):
+                groups.append((self._vector_acts[a], idx, bias[idx][:, None]))
+
+            levels.append((src[lo:hi], weight[lo:hi, None], targets, starts, groups))
+
+        self._packed = (int(sizes.sum()), inputs, outputs, levels, sizes)
+        self._packed_plans = plans
+        self._selected = None
+        return self._packed
+
+    def _select(self, packed, rows: np.ndarray):
+        """The packed layout restricted to the genomes at index `rows`, without re-packing."""
+        if self._selected is not None and np.array_equal(self._selected[0], rows):
+            return self._selected[1]
+
+        n_nodes, inputs, outputs, levels, sizes = packed
+        keep = np.zeros(len(sizes), dtype=bool)
+        keep[rows] = True
+        node_keep = np.repeat(keep, sizes)
+
+        selected = []
+        for src, weight, targets, starts, groups in levels:
+            # Edges are grouped by target, so keeping whole targets keeps the groups contiguous
+            counts = np.diff(np.append(starts, len(src)))
+            kept = node_keep[targets]
+            edge_keep = np.repeat(kept, counts)
+            kept_counts = counts[kept]
+            kept_starts = np.cumsum(kept_counts) - kept_counts
+            kept_groups = []
+            for act, idx, bias in groups:
+                mask = node_keep[idx]
+                if mask.any():
+                    kept_groups.append((act, idx[mask], bias[mask]))
+            selected.append((src[edge_keep], weight[edge_keep], targets[kept], kept_starts, kept_groups))
+
+        layout = (n_nodes, inputs[rows], outputs[rows], selected, sizes)
+        self._selected = (rows, layout)
+        return layout
+
+    def activate(self, genomes: list, inputs=None, rows=None) -> np.ndarray:
+        """
+        Compute the outputs of every genome.
+
+        Args:
+            genomes: The genomes to evaluate.
+            inputs: Either a shared batch of shape [B, n_in], or one batch per genome of
+                    shape [P, B, n_in]. Defaults to the evaluator's shared inputs.
+            rows: Optional indices into `genomes`, only these genomes are computed. The packed
+                  layout of the whole list is reused, so a shrinking subset of the same list
+                  costs no re-packing.
+
+        Returns:
+            np.ndarray: Outputs of shape [P, B, n_out], P being len(rows) when rows are given.
+        """
+        x = self.inputs if inputs is None else np.asarray(inputs, dtype=float)
+        batch = x.shape[-2]
+        if not genomes or (rows is not None and not len(rows)):
+            return np.zeros((0, batch, 0))
+
+        packed = self.pack(genomes)
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+            if len(rows) != len(genomes) or (rows != np.arange(len(genomes))).any():
+                packed = self._select(packed, rows)
+        n_nodes, in_idx, out_idx, levels, _ = packed
+
+        sums = np.zeros((n_nodes, batch))
+        outs = np.zeros((n_nodes, batch))
+
+        # [P, n_in] node indices <- [P, B, n_in] or [B, n_in] values
+        sums[in_idx] = np.broadcast_to(np.swapaxes(x, -1, -2), in_idx.shape + (batch,))
+
+        with np.errstate(over="ignore"):
+            for src, weight, targets, starts, groups in levels:
+                if len(targets):
+                    sums[targets] = np.add.reduceat(outs[src] * weight, starts, axis=0)
+                for act, idx, bias in groups:
+                    total = sums[idx] + bias
+                    outs[idx] = act(total) if act else total
+
+        return np.swapaxes(outs[out_idx], 1, 2)
+
+    def evaluate(self, genomes: list) -> np.ndarray:
+        """
+        Score every genome on the shared inputs and write the result to genome.network.fitness.
+
+        Returns:
+            np.ndarray: The fitness vector, shape [P].
+        """
+        fitnesses = np.asarray(self.fitness_function(self.activate(genomes)), dtype=float)
+        for genome, fitness in zip(genomes, fitnesses):
+            genome.network.fitness = float(fitness)
+        return fitnesses
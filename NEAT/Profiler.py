@@ -0,0 +1,188 @@
+# Profiler.py
+import json
+import os
+import time
+
+import numpy as np
+
+# Phases Population times itself. Anything else between two generations (the run() callback,
+# printing, ...) ends up in "other".
+PHASES = ("evaluation", "speciation", "selection", "crossover", "mutation", "io")
+
+class _Phase:
+    __slots__ = ("phases", "name", "start")
+
+    def __init__(self, phases: dict, name: str):
+        self.phases = phases
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.phases[self.name] = self.phases.get(self.name, 0.0) + time.perf_counter() - self.start
+
+def _distribution(values: np.ndarray) -> dict:
+    if not len(values):
+        return {"min": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "max": 0}
+    p50, p90 = np.percentile(values, [50, 90])
+    return {"min": int(values.min()), "mean": float(values.mean()), "p50": float(p50), "p90": float(p90), "max": int(values.max())}
+
+class GenerationProfiler:
+    """
+    Records where the time of every generation goes, for Population(profiler=...).
+
+    Per generation it keeps the wall time of each phase (PHASES, plus "other" for the
+    time spent outside the generation loop, e.g. in the run() callback), the node and
+    connection count distributions of the evaluated genomes, fitness cache hits and
+    misses, evaluations per second and the best and mean fitness.
+
+    A generation's record is complete once the next generation starts (or close() is
+    called), so checkpoints written from the run() callback count towards the right
+    generation. Each record is appended to a JSONL file and the latest one is written
+    to a Prometheus text file, which node_exporter's textfile collector (or any other
+    scraper) can pick up:
+
+        profiler = GenerationProfiler("Outputs/profile.jsonl", "Outputs/neat.prom")
+        population = Population(template, evaluator=evaluator, profiler=profiler)
+        with profiler:
+            population.run(100)
+
+    Without a profiler Population skips all of this.
+    """
+
+    def __init__(self, jsonl_path: str = None, prometheus_path: str = None):
+        """
+        Args:
+            jsonl_path (str): Optional, one JSON record per generation is appended to it.
+            prometheus_path (str): Optional, rewritten with the latest generation's metrics.
+        """
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self._jsonl = open(jsonl_path, "a") if jsonl_path else None
+
+        self.last = None  # Latest complete record
+        self.totals = {}  # Phase -> seconds over the whole run
+        self._record = None
+        self._phases = {}
+        self._start = None
+        self._cache_counts = (0, 0)
+
+    def phase(self, name: str) -> _Phase:
+        """Context manager that adds the time spent inside it to phase `name` of the current generation."""
+        return _Phase(self._phases, name)
+
+    def begin_generation(self, population):
+        """Called by Population.step() before evaluating: completes the previous record and starts a new one."""
+        now = time.perf_counter()
+        self._finish(now)
+
+        node_counts = np.fromiter((len(genome.network.nodes) for genome in population.genomes), dtype=np.int64)
+        conn_counts = np.fromiter((sum(conn.enabled for conn in genome.network.conns) for genome in population.genomes),
+                                  dtype=np.int64)
+        cache = population.fitness_cache
+        self._cache_counts = (cache.hits, cache.misses) if cache is not None else (0, 0)
+
+        self._start = now
+        self._phases = {}
+        self._record = {
+            "generation": population.generation,
+            "time": time.time(),
+            "population": len(population.genomes),
+            "nodes": _distribution(node_counts),
+            "connections": _distribution(conn_counts),
+        }
+
+    def end_generation(self, population, fitness: np.ndarray):
+        """Called by Population.step() after reproducing, with the fitness of the evaluated generation."""
+        record = self._record
+        cache = population.fitness_cache
+        if cache is not None:
+            hits = cache.hits - self._cache_counts[0]
+            evaluations = cache.misses - self._cache_counts[1]
+            record["cache"] = {"hits": hits, "misses": evaluations, "size": len(cache),
+                               "hit_rate": hits / (hits + evaluations) if hits + evaluations else 0.0}
+        else:
+            evaluations = len(fitness)
+        record["evaluations"] = evaluations
+        record["best_fitness"] = float(np.max(fitness)) if len(fitness) else None
+        record["mean_fitness"] = float(np.mean(fitness)) if len(fitness) else None
+        if population.speciation is not None:
+            record["species"] = len(population.speciation.species)
+
+    def _finish(self, now: float):
+        record = self._record
+        if record is None:
+            return
+        self._record = None
+
+        wall = now - self._start
+        phases = {name: self._phases.get(name, 0.0) for name in PHASES}
+        phases.update(self._phases)
+        phases["other"] = max(0.0, wall - sum(phases.values()))
+        record["wall_seconds"] = wall
+        record["phases"] = phases
+        evaluation_time = phases["evaluation"]
+        record["evaluations_per_second"] = record.get("evaluations", 0) / evaluation_time if evaluation_time > 0 else 0.0
+
+        for name, seconds in phases.items():
+            self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.last = record
+
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps(record) + "\n")
+            self._jsonl.flush()
+        if self.prometheus_path:
+            self._write_prometheus(record)
+
+    def _write_prometheus(self, record: dict):
+        lines = []
+
+        def metric(name: str, kind: str, help: str, samples: list):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = "{" + ",".join(f'{key}="{val}"' for key, val in labels.items()) + "}" if labels else ""
+                lines.append(f"{name}{label_text} {float(value)!r}")
+
+        metric("neat_generation", "gauge", "Last completed generation.", [({}, record["generation"])])
+        metric("neat_generation_seconds", "gauge", "Wall time of the last generation.", [({}, record["wall_seconds"])])
+        metric("neat_phase_seconds", "gauge", "Wall time per phase in the last generation.",
+               [({"phase": name}, seconds) for name, seconds in record["phases"].items()])
+        metric("neat_phase_seconds_total", "counter", "Wall time per phase over the whole run.",
+               [({"phase": name}, seconds) for name, seconds in self.totals.items()])
+        metric("neat_genome_nodes", "gauge", "Node count distribution of the last generation.",
+               [({"stat": stat}, value) for stat, value in record["nodes"].items()])
+        metric("neat_genome_connections", "gauge", "Enabled connection count distribution of the last generation.",
+               [({"stat": stat}, value) for stat, value in record["connections"].items()])
+        metric("neat_evaluations", "gauge", "Fitness evaluations in the last generation.", [({}, record.get("evaluations", 0))])
+        metric("neat_evaluations_per_second", "gauge", "Fitness evaluations per second of evaluation time.",
+               [({}, record["evaluations_per_second"])])
+        if "cache" in record:
+            metric("neat_cache_hit_ratio", "gauge", "Fitness cache hit rate in the last generation.",
+                   [({}, record["cache"]["hit_rate"])])
+        if record.get("best_fitness") is not None:
+            metric("neat_fitness", "gauge", "Fitness of the last generation.",
+                   [({"stat": "best"}, record["best_fitness"]), ({"stat": "mean"}, record["mean_fitness"])])
+        if "species" in record:
+            metric("neat_species", "gauge", "Number of species.", [({}, record["species"])])
+
+        # Write next to the target and swap it in, so a scraper never reads a half-written file
+        tmp_path = f"{self.prometheus_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.prometheus_path)
+
+    def close(self):
+        """Complete the last generation's record and close the JSONL file."""
+        self._finish(time.perf_counter())
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,208 @@
+# RecurrentNetwork.py
+from .CompiledNetwork import vectorize_activation
+
+import numpy as np
+
+class RecurrentNetwork:
+    """
+    Stateful, time-stepped execution of a Network, for networks with cycles.
+
+    Every node keeps its activation between step() calls. A step updates all nodes at
+    once from the previous step's activations:
+
+        out_t[i] = act_i(bias_i + sum_j w_ji * out_{t-1}[j])
+
+    Input nodes take this step's inputs instead (act_i(input + bias_i), like in a
+    feed-forward pass). All enabled connections are treated the same way, forward and
+    recurrent alike, so the result never depends on the order nodes are visited in.
+    A signal needs one step per connection on its path to reach an output, e.g. a
+    network with one hidden layer answers on the second step.
+
+    The state is a [B, n] array, so B independent sequences (episodes) can be stepped
+    together. reset() clears all of them, reset(mask) only the ones that start over.
+    """
+
+    def __init__(self, network):
+        plan = network.compile()
+        n = len(plan.node_ids)
+
+        self.node_ids = list(plan.node_ids)
+        self.input_idx = np.array(plan.input_idx, dtype=np.intp)
+        self.output_idx = np.array(plan.output_idx, dtype=np.intp)
+        self.bias = np.array(plan.bias, dtype=float)
+
+        # Every enabled edge as one dense matrix, so a step is a single state @ weights product
+        self.weights = np.zeros((n, n))
+        for s, d, w in list(zip(plan.src, plan.dst, plan.weight)) + plan.recurrent:
+            self.weights[s, d] += w
+
+        # Nodes grouped by activation, so each activation is applied to all of its nodes at once
+        act_id = np.array(plan.act_id, dtype=np.intp)
+        self._groups = [
+            (vectorize_activation(plan.activations[a]), np.flatnonzero(act_id == a))
+            for a in np.unique(act_id)
+        ]
+
+        self.state = None  # [B, n] node activations, created by the first step after a reset
+
+    def reset(self, mask=None):
+        """
+        Clear the node activations.
+
+        Args:
+            mask: Optional bool array of shape [B], only the sequences where it is True are cleared.
+        """
+        if mask is None or self.state is None:
+            self.state = None
+        else:
+            self.state[np.asarray(mask, dtype=bool)] = 0.0
+
+    def step(self, inputs) -> np.ndarray:
+        """
+        Advance every sequence by one time step.
+
+        Args:
+            inputs: Array of shape [n_in] for a single sequence, or [B, n_in] for B sequences.
+
+        Returns:
+            np.ndarray: Output node activations, [n_out] or [B, n_out] to match `inputs`.
+        """
+        x = np.asarray(inputs, dtype=float)
+        single = x.ndim == 1
+        if single:
+            x = x[None, :]
+        if x.ndim != 2 or x.shape[1] != len(self.input_idx):
+            raise ValueError(f"Expected inputs of shape [B, {len(self.input_idx)}], got {x.shape}")
+
+        if self.state is None:
+            self.state = np.zeros((x.shape[0], len(self.node_ids)))
+        elif self.state.shape[0] != x.shape[0]:
+            raise ValueError(f"Batch size changed from {self.state.shape[0]} to {x.shape[0]}, call reset() first")
+
+        with np.errstate(over="ignore"):
+            total = self.state @ self.weights + self.bias
+            total[:, self.input_idx] = x + self.bias[self.input_idx]
+
+            state = np.empty_like(total)
+            for act, idx in self._groups:
+                state[:, idx] = act(total[:, idx]) if act else total[:, idx]
+        self.state = state
+
+        outputs = state[:, self.output_idx]
+        return outputs[0] if single else outputs
+
+class _Part:
+    """The arrays of one network in a RecurrentPopulation, with node indices local to the network."""
+
+    def __init__(self, network):
+        plan = network.compile()
+        self.n_nodes = len(plan.node_ids)
+        self.bias = np.array(plan.bias, dtype=float)
+        # Forward and recurrent edges alike, every one of them reads the previous step's state
+        edges = list(zip(plan.src, plan.dst, plan.weight)) + list(plan.recurrent)
+        self.src = np.array([s for s, _, _ in edges], dtype=np.intp)
+        self.dst = np.array([d for _, d, _ in edges], dtype=np.intp)
+        self.weight = np.array([w for _, _, w in edges], dtype=float)
+        self.inputs = np.array(plan.input_idx, dtype=np.intp)
+        self.outputs = np.array(plan.output_idx, dtype=np.intp)
+        # Nodes grouped by activation callable
+        act_id = np.array(plan.act_id, dtype=np.intp)
+        self.groups = [(plan.activations[a], np.flatnonzero(act_id == a)) for a in np.unique(act_id)]
+
+class RecurrentPopulation:
+    """
+    RecurrentNetwork for a whole population: P networks, one sequence each, stepped together.
+
+    Networks are packed into one flat layout like in PopulationEvaluator: node arrays are
+    concatenated with a per-network offset and every enabled edge, forward and recurrent,
+    goes into one edge list sorted by target. A step is one gather, multiply and
+    np.add.reduceat over that list, plus one call per activation on just its own nodes.
+    """
+
+    def __init__(self, networks: list):
+        self._parts = [_Part(network) for network in networks]
+        n_in = {len(part.inputs) for part in self._parts}
+        n_out = {len(part.outputs) for part in self._parts}
+        if len(n_in) > 1 or len(n_out) > 1:
+            raise ValueError("All networks must have the same number of input and output nodes")
+        self._shape = (n_in.pop() if n_in else 0, n_out.pop() if n_out else 0)
+        self._pack(self._parts, None)
+
+    def _pack(self, parts: list, state):
+        """Concatenate the parts into the flat layout, `state` being their packed state or None for zeros."""
+        n_in, n_out = self._shape
+        self._sizes = np.array([part.n_nodes for part in parts], dtype=np.intp)
+        self._offsets = np.concatenate(([0], np.cumsum(self._sizes)[:-1])).astype(np.intp)
+
+        def concat(name, dtype, shift=False):
+            pieces = [getattr(part, name) + offset if shift else getattr(part, name)
+                      for part, offset in zip(parts, self._offsets)]
+            return np.concatenate(pieces) if pieces else np.zeros(0, dtype=dtype)
+
+        self.bias = concat("bias", float)
+        src, dst, weight = concat("src", np.intp, True), concat("dst", np.intp, True), concat("weight", float)
+
+        # Edges sorted by target (stable, so each node keeps its plan's summation order)
+        order = np.argsort(dst, kind="stable")
+        self._src, self._weight = src[order], weight[order]
+        self._targets, self._starts = np.unique(dst[order], return_index=True)
+
+        # Nodes of all networks grouped by activation, so each activation is applied once per step
+        groups = {}
+        for part, offset in zip(parts, self._offsets):
+            for act, idx in part.groups:
+                groups.setdefault(act, []).append(idx + offset)
+        self._groups = [(vectorize_activation(act), np.concatenate(idx)) for act, idx in groups.items()]
+
+        # [P, n_in] and [P, n_out] indices into the packed nodes
+        self.input_idx = np.zeros((len(parts), n_in), dtype=np.intp)
+        self.output_idx = np.zeros((len(parts), n_out), dtype=np.intp)
+        for p, (part, offset) in enumerate(zip(parts, self._offsets)):
+            self.input_idx[p] = part.inputs + offset
+            self.output_idx[p] = part.outputs + offset
+
+        self.state = np.zeros(len(self.bias)) if state is None else state  # [N] activations of all nodes
+
+    def __len__(self):
+        return len(self._sizes)
+
+    def reset(self, mask=None):
+        """Clear the state of every network, or only where `mask` ([P] bool) is True."""
+        if mask is None:
+            self.state[:] = 0.0
+        else:
+            self.state[np.repeat(np.asarray(mask, dtype=bool), self._sizes)] = 0.0
+
+    def keep(self, index):
+        """Drop every network except the ones at `index` (e.g. once their episodes are over)."""
+        index = np.arange(len(self))[index]
+        state = [self.state[self._offsets[i]:self._offsets[i] + self._sizes[i]] for i in index]
+        self._parts = [self._parts[i] for i in index]
+        self._pack(self._parts, np.concatenate(state) if state else np.zeros(0))
+
+    def step(self, inputs) -> np.ndarray:
+        """
+        Advance every network by one time step.
+
+        Args:
+            inputs: Array of shape [P, n_in], one row per network.
+
+        Returns:
+            np.ndarray: Output node activations, shape [P, n_out].
+        """
+        x = np.asarray(inputs, dtype=float)
+        if x.shape != self.input_idx.shape:
+            raise ValueError(f"Expected inputs of shape {self.input_idx.shape}, got {x.shape}")
+
+        with np.errstate(over="ignore"):
+            total = self.bias.copy()
+            if len(self._src):
+                total[self._targets] += np.add.reduceat(self.state[self._src] * self._weight, self._starts)
+            total[self.input_idx] = x + self.bias[self.input_idx]
+
+            state = np.empty_like(total)
+            for act, idx in self._groups:
+                state[idx] = act(total[idx]) if act else total[idx]
+        self.state = state
+
+        return state[self.output_idx]
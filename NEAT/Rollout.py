@@ -0,0 +1,124 @@
+# Rollout.py
+from .PopulationEvaluator import PopulationEvaluator
+from .RecurrentNetwork import RecurrentPopulation
+
+import numpy as np
+
+class Rollout:
+    """
+    Evaluates a population on an episodic task by stepping one environment per genome
+    (and episode) in lockstep.
+
+    Environments are vectorized: one object simulates N instances as NumPy arrays (see
+    PoleBalancing.py). It needs `observation_size`, `action_size`, a `reset()` that
+    returns [N, observation_size] observations, and a `step(actions, index)` that only
+    advances the environments at `index` and returns (observations, rewards, done) for
+    them. Every time step, all running episodes are sent through the networks in one
+    batched pass and through the environment in one vectorized step.
+
+    Episodes that are over drop out: their environments stop being stepped and, once
+    enough of them are done, the networks are re-packed without them, so late steps
+    don't pay for genomes that already failed.
+
+    Use it as the `evaluator` of a Population; the fitness of a genome is its mean
+    total reward over `episodes` episodes. Every genome plays the same `episodes` start
+    states, drawn once from `seed`, so the fitness only depends on the network and the
+    default (deterministic) FitnessCache of Population is safe to use.
+    """
+
+    def __init__(self, make_env, max_steps: int = 1000, episodes: int = 1, recurrent: bool = False,
+                 repack_below: float = 0.75, seed=None):
+        """
+        Args:
+            make_env: Called as make_env(n, seed, starts) and returns a vectorized environment of n
+                      instances, where instance i starts in the (i % starts)-th start state drawn from seed.
+            max_steps (int): Time steps after which a still running episode is stopped.
+            episodes (int): Episodes per genome, all played at the same time.
+            recurrent (bool): Run the networks with RecurrentPopulation (keeps node state between
+                              time steps, needed for networks with cycles) instead of feed-forward passes.
+            repack_below (float): Re-pack the networks once fewer than this fraction of the packed
+                                  episodes is still running.
+            seed: Seed of the start states. None draws a random one, still shared by all evaluate() calls.
+        """
+        self.make_env = make_env
+        self.max_steps = max_steps
+        self.episodes = episodes
+        self.recurrent = recurrent
+        self.repack_below = repack_below
+        self.env_seed = int(np.random.default_rng(seed).integers(2 ** 63))
+        self._evaluator = None
+
+    def _runner(self, genomes: list):
+        """Return step(observations) -> actions for these genomes, and a function that drops all but `index`."""
+        if self.recurrent:
+            networks = RecurrentPopulation([genome.network for genome in genomes])
+            return networks.step, networks.keep
+
+        if self._evaluator is None:
+            self._evaluator = PopulationEvaluator(np.zeros((1, 0)), None)
+        packed = list(genomes)
+
+        def step(observations):
+            return self._evaluator.activate(packed, observations[:, None, :])[:, 0, :]
+
+        def keep(index):
+            packed[:] = [packed[i] for i in index]
+
+        return step, keep
+
+    def rollout(self, genomes: list) -> np.ndarray:
+        """
+        Play `episodes` episodes per genome.
+
+        Returns:
+            np.ndarray: Total reward of every episode, shape [P, episodes].
+        """
+        P = len(genomes)
+        n = P * self.episodes
+        if n == 0:
+            return np.zeros((P, self.episodes))
+
+        env = self.make_env(n, self.env_seed, self.episodes)
+        observations = env.reset()
+        totals = np.zeros(n)
+
+        # Episode i is played by genome i // episodes
+        running = np.arange(n)
+        step, keep = self._runner([genome for genome in genomes for _ in range(self.episodes)])
+        packed = running  # Episodes the runner currently holds, in its order
+
+        for _ in range(self.max_steps):
+            rows = np.searchsorted(packed, running)
+            actions = step(observations if len(packed) == len(running) else self._pad(observations, rows, len(packed)))
+            observations, rewards, done = env.step(actions[rows], running)
+            totals[running] += rewards
+
+            running = running[~done]
+            if not len(running):
+                break
+            observations = observations[~done]
+
+            if len(running) < self.repack_below * len(packed):
+                keep(np.searchsorted(packed, running))
+                packed = running
+
+        return totals.reshape(P, self.episodes)
+
+    @staticmethod
+    def _pad(observations, rows, size):
+        """Spread the observations of the running episodes over the rows of the packed ones."""
+        padded = np.zeros((size, observations.shape[1]))
+        padded[rows] = observations
+        return padded
+
+    def evaluate(self, genomes: list) -> np.ndarray:
+        """
+        Score every genome and write the result to genome.network.fitness.
+
+        Returns:
+            np.ndarray: The fitness vector, shape [P].
+        """
+        fitnesses = self.rollout(genomes).mean(axis=1)
+        for genome, fitness in zip(genomes, fitnesses):
+            genome.network.fitness = float(fitness)
+        return fitnesses
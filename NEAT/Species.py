@@ -0,0 +1,214 @@
+# Species.py
+from .Genome import Genome
+
+import random
+import numpy as np
+
+class Species:
+    def __init__(self, id: int, representative: Genome):
+        self.id = id
+        self.representative = representative  # Genomes are compared against this one
+        self.members = []
+        self.adjusted_fitness = 0.0  # Sum of the members' shared fitness
+
+    def __repr__(self):
+        return f"Species(id={self.id}, members={len(self.members)}, adjusted_fitness={self.adjusted_fitness:.4f})"
+
+
+class Speciation:
+    """
+    Splits a population into species by compatibility distance (Stanley & Miikkulainen, section 3.3):
+
+        delta = c1 * E / N + c2 * D / N + c3 * W
+
+    where E and D are the numbers of excess and disjoint genes, W is the average weight
+    difference of matching genes and N is the number of genes in the larger genome
+    (1 when both genomes are smaller than `normalize_threshold`).
+
+    Genes are matched on the innovation numbers in Connection.Innov. Distances of all
+    genomes against all species representatives are computed in one vectorized pass,
+    in chunks of at most `max_elements` (representative, gene) pairs.
+    """
+
+    def __init__(self, compatibility_threshold: float = 3.0, c1: float = 1.0, c2: float = 1.0, c3: float = 0.4,
+                 normalize_threshold: int = 20, max_elements: int = 1 << 22):
+        self.compatibility_threshold = compatibility_threshold
+        self.c1 = c1
+        self.c2 = c2
+        self.c3 = c3
+        self.normalize_threshold = normalize_threshold
+        self.max_elements = max_elements
+
+        self.species = []
+        self._next_id = 1
+
+    def distances(self, genomes: list, representatives: list) -> np.ndarray:
+        """
+        Compatibility distance of every genome to every representative.
+
+        Returns:
+            np.ndarray: Array of shape [len(genomes), len(representatives)].
+        """
+        if not genomes or not representatives:
+            return np.zeros((len(genomes), len(representatives)))
+
+        # Representatives as dense [S, K] matrices over the innovations they use
+        rep_genes = [rep.network.gene_arrays() for rep in representatives]
+        columns = np.unique(np.concatenate([genes[0] for genes in rep_genes]))
+        if not len(columns):
+            columns = np.array([-1], dtype=np.int64)  # Placeholder column no gene matches
+        present = np.zeros((len(rep_genes), len(columns)), dtype=bool)
+        weights = np.zeros((len(rep_genes), len(columns)))
+        for s, (innovs, _, w, _) in enumerate(rep_genes):
+            cols = np.searchsorted(columns, innovs)
+            present[s, cols] = True
+            weights[s, cols] = w
+
+        rep_len = np.array([len(genes[0]) for genes in rep_genes])
+        rep_max = np.array([genes[0][-1] if len(genes[0]) else -1 for genes in rep_genes])
+        # rep_upto[s, k]: number of genes of representative s in the first k columns
+        rep_upto = np.concatenate((np.zeros((len(rep_genes), 1), dtype=np.int64), np.cumsum(present, axis=1)), axis=1)
+
+        result = np.empty((len(genomes), len(representatives)))
+        start = 0
+        while start < len(genomes):
+            # Grow the chunk until it reaches the element budget
+            end = start
+            n_genes = 0
+            while end < len(genomes) and (end == start or (n_genes + len(genomes[end].network.conns)) * len(rep_genes) <= self.max_elements):
+                n_genes += len(genomes[end].network.conns)
+                end += 1
+            result[start:end] = self._distance_chunk(genomes[start:end], columns, present, weights, rep_len, rep_max, rep_upto)
+            start = end
+
+        return result
+
+    def _distance_chunk(self, genomes, columns, present, weights, rep_len, rep_max, rep_upto) -> np.ndarray:
+        genes = [genome.network.gene_arrays() for genome in genomes]
+        lengths = np.array([len(g[0]) for g in genes])
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+
+        innovs = np.concatenate([g[0] for g in genes]) if ends[-1] else np.zeros(0, dtype=np.int64)
+        gene_w = np.concatenate([g[2] for g in genes]) if ends[-1] else np.zeros(0)
+
+        # Look up every gene of every genome in the representatives' columns: [S, T]
+        cols = np.minimum(np.searchsorted(columns, innovs), len(columns) - 1)
+        matched = present[:, cols] & (columns[cols] == innovs)
+        weight_diff = np.where(matched, np.abs(weights[:, cols] - gene_w), 0.0)
+        beyond_rep = innovs[None, :] > rep_max[:, None]
+
+        def per_genome(values):
+            # Sum [S, T] values over each genome's gene segment -> [S, P]
+            total = np.concatenate((np.zeros((values.shape[0], 1)), np.cumsum(values, axis=1)), axis=1)
+            return total[:, ends] - total[:, starts]
+
+        matching = per_genome(matched)
+        weight_total = per_genome(weight_diff)
+        excess_genome = per_genome(beyond_rep)
+
+        # Representative genes past the genome's last innovation
+        genome_max = np.array([g[0][-1] if len(g[0]) else -1 for g in genes])
+        excess_rep = rep_len[:, None] - rep_upto[:, np.searchsorted(columns, genome_max, side="right")]
+
+        excess = excess_genome + excess_rep
+        disjoint = lengths[None, :] + rep_len[:, None] - 2 * matching - excess
+
+        n = np.maximum(lengths[None, :], rep_len[:, None]).astype(float)
+        n[n < self.normalize_threshold] = 1.0
+        avg_weight = np.divide(weight_total, matching, out=np.zeros_like(weight_total), where=matching > 0)
+
+        return (self.c1 * excess / n + self.c2 * disjoint / n + self.c3 * avg_weight).T
+
+    def speciate(self, genomes: list, rng: random.Random = None) -> list:
+        """
+        Assign every genome to a species and pick new representatives.
+
+        Each genome joins the first existing species it is compatible with. Genomes that
+        fit none of them found new species, checked against each other in order. Species
+        that end up empty are dropped, and every surviving species gets a random member
+        as its representative for the next generation, drawn from `rng` (the global
+        `random` module by default).
+
+        Returns:
+            list: The species, each with its `members` filled in.
+        """
+        for species in self.species:
+            species.members = []
+
+        unassigned = np.ones(len(genomes), dtype=bool)
+        if self.species:
+            compatible = self.distances(genomes, [s.representative for s in self.species]) < self.compatibility_threshold
+            found = compatible.any(axis=1)
+            first = compatible.argmax(axis=1)
+            for i in np.flatnonzero(found):
+                self.species[first[i]].members.append(genomes[i])
+                genomes[i].species_id = self.species[first[i]].id
+            unassigned = ~found
+
+        # New species: the first leftover genome founds one and takes every compatible leftover with it
+        remaining = np.flatnonzero(unassigned)
+        while len(remaining):
+            founder = genomes[remaining[0]]
+            species = Species(self._next_id, founder)
+            self._next_id += 1
+            self.species.append(species)
+
+            close = self.distances([genomes[i] for i in remaining], [founder])[:, 0] < self.compatibility_threshold
+            close[0] = True
+            for i in remaining[close]:
+                species.members.append(genomes[i])
+                genomes[i].species_id = species.id
+            remaining = remaining[~close]
+
+        self.species = [s for s in self.species if s.members]
+        for species in self.species:
+            species.representative = (rng or random).choice(species.members)
+        return self.species
+
+    def share_fitness(self) -> dict:
+        """
+        Explicit fitness sharing: every genome's fitness is divided by the size of its species.
+
+        Fitnesses are shifted to be non-negative first (like select_parents does), so a
+        bigger species always means a smaller share.
+
+        Returns:
+            dict: genome id -> adjusted fitness. species.adjusted_fitness holds each species' total.
+        """
+        members = [genome for species in self.species for genome in species.members]
+        if not members:
+            return {}
+
+        fitness = np.array([genome.network.fitness for genome in members])
+        sizes = np.repeat([len(s.members) for s in self.species], [len(s.members) for s in self.species])
+        shift = -fitness.min() + 1e-6 if fitness.min() < 0 else 0.0
+        adjusted = (fitness + shift) / sizes
+
+        offset = 0
+        for species in self.species:
+            species.adjusted_fitness = float(adjusted[offset:offset + len(species.members)].sum())
+            offset += len(species.members)
+
+        return {genome.id: float(value) for genome, value in zip(members, adjusted)}
+
+    def allocate_offspring(self, total: int) -> dict:
+        """
+        Split `total` offspring between the species in proportion to their adjusted fitness
+        (call share_fitness() first). Rounding uses the largest remainders so the counts add up.
+
+        Returns:
+            dict: species id -> number of offspring.
+        """
+        if not self.species:
+            return {}
+
+        shares = np.array([s.adjusted_fitness for s in self.species])
+        if shares.sum() <= 0:
+            shares = np.ones(len(self.species))
+        exact = shares / shares.sum() * total
+        counts = np.floor(exact).astype(int)
+        for i in np.argsort(-(exact - counts))[:total - counts.sum()]:
+            counts[i] += 1
+
+        return {species.id: int(count) for species, count in zip(self.species, counts)}
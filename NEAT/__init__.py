@@ -2,8 +2,26 @@ from .Activations import ActivationFunctions
 from .Crossover import Crossover
 from .Connection import Connection
 from .Network import Network
+from .CompiledNetwork import CompiledNetwork
 from .Node import Node, NodeType
 from .InnovationTracker import InnovationTracker
 from .Mutate import Mutate
 from .Phenotype import Phenotype
-from .Genome import Genome
\ No newline at end of file
+from .Genome import Genome
+from .PopulationEvaluator import PopulationEvaluator
+from .Species import Species, Speciation
+from .Population import Population
+from .GenomeIO import PopulationFile, save_genome, load_genome, save_population, load_legacy_json
+from .Checkpoint import Checkpointer
+from .Lineage import LineageLog, LineageReader
+from .FitnessCache import FitnessCache
+from .RecurrentNetwork import RecurrentNetwork, RecurrentPopulation
+from .Rollout import Rollout
+from .PoleBalancing import SinglePoleBalancing, DoublePoleBalancing
+from .CodeGen import generate_source, generate_function
+from .Activations import Activation, register_activation, get_activation
+from .Profiler import GenerationProfiler
+from .IncrementalEvaluator import IncrementalEvaluator
+# Imported from their own modules instead of here (NEAT.DistributedEvaluator, NEAT.ParallelEvaluator,
+# NEAT.InferenceServer): they pull in multiprocessing, concurrent.futures and http.server, which every
+# `import NEAT` would pay for
\ No newline at end of file
@@ -0,0 +1,68 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import random
+
+from NEAT.Node import Node, NodeType
+from NEAT.Connection import Connection
+from NEAT.Network import Network
+from NEAT.CompiledNetwork import CompiledNetwork
+
+# Regression check for how the execution plan breaks cycles: only an edge that is part
+# of a cycle may become a recurrent edge, never a forward edge leaving the cycle.
+
+# Input 1 feeds a cycle between hidden nodes 3 and 4, which feeds output 2. The output is
+# listed before the hidden nodes, like in the XOR template.
+nodes = [
+    Node(1, NodeType.INPUT, 0.0, bias=0.0),
+    Node(2, NodeType.OUTPUT, 0.0, bias=0.0),
+    Node(3, NodeType.HIDDEN, 0.0, bias=0.0),
+    Node(4, NodeType.HIDDEN, 0.0, bias=0.0),
+]
+conns = [
+    Connection(1, 1.0, nodes[0], nodes[2]),  # 1 -> 3
+    Connection(2, 1.0, nodes[2], nodes[3]),  # 3 -> 4
+    Connection(3, 1.0, nodes[3], nodes[2]),  # 4 -> 3, closes the cycle
+    Connection(4, 1.0, nodes[2], nodes[1]),  # 3 -> 2, leaves the cycle
+]
+network = Network(nodes, conns)
+plan = network.compile()
+
+order = [plan.node_ids[i] for i in plan.order]
+recurrent = [(plan.node_ids[s], plan.node_ids[d]) for s, d, _ in plan.recurrent]
+print(f"Order: {order}, recurrent edges: {recurrent}")
+assert order == [3, 4, 2], order
+assert recurrent == [(4, 3)], recurrent
+
+assert plan.activate([1.0]) == [1.0], plan.activate([1.0])
+nodes[0].value = 1.0
+network.run()
+assert network.get_output() == [1.0], network.get_output()
+assert network.evaluate_batch([[1.0]]).tolist() == [[1.0]]
+
+# Random graphs: every edge the plan treats as recurrent has to lie on a cycle
+def reachable(adjacency: list, start: int) -> set:
+    seen, stack = {start}, [start]
+    while stack:
+        for d in adjacency[stack.pop()]:
+            if d not in seen:
+                seen.add(d)
+                stack.append(d)
+    return seen
+
+rng = random.Random(0)
+for _ in range(2000):
+    n = rng.randint(1, 12)
+    edges = [(rng.randrange(n), rng.randrange(n), 1.0) for _ in range(rng.randint(0, 25))]
+    adjacency = [[] for _ in range(n)]
+    for s, d, _ in edges:
+        adjacency[s].append(d)
+
+    position = CompiledNetwork._topological_positions(n, edges)
+    assert sorted(position) == list(range(n))
+    for s, d, _ in edges:
+        if position[s] >= position[d]:
+            assert s in reachable(adjacency, d), f"Edge {s} -> {d} is not on a cycle but was cut in {edges}"
+
+print("OK")
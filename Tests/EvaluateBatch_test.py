@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import random
+
+import numpy as np
+
+from NEAT.Node import Node, NodeType
+from NEAT.Connection import Connection
+from NEAT.Network import Network
+from NEAT.Activations import ActivationFunctions
+
+# Checks that Network.evaluate_batch() gives the same outputs as running every row on
+# its own with run() + get_output(), on random feed-forward networks, networks with
+# cycles and networks with disabled genes.
+
+ACTIVATIONS = [None, ActivationFunctions.Sigmoid, ActivationFunctions.ReLu, ActivationFunctions.TanH,
+               ActivationFunctions.Sine, ActivationFunctions.Gaussian]
+
+def random_network(rng: random.Random, cycles: bool, disabled: float) -> Network:
+    n_in, n_out, n_hidden = rng.randint(1, 4), rng.randint(1, 3), rng.randint(0, 12)
+    inputs = [Node(i + 1, NodeType.INPUT, 0.0) for i in range(n_in)]
+    outputs = [Node(n_in + i + 1, NodeType.OUTPUT, 0.0, rng.choice(ACTIVATIONS), rng.uniform(-1, 1)) for i in range(n_out)]
+    hidden = [Node(n_in + n_out + i + 1, NodeType.HIDDEN, 0.0, rng.choice(ACTIVATIONS), rng.uniform(-1, 1)) for i in range(n_hidden)]
+
+    # Feed-forward edges follow the hidden node order, backward ones only exist with cycles
+    conns = []
+    for s in inputs + hidden:
+        for d in hidden + outputs:
+            forward = s.ntype is NodeType.INPUT or d.ntype is NodeType.OUTPUT or s.id < d.id
+            if (forward or cycles) and rng.random() < 0.35:
+                conns.append(Connection(len(conns) + 1, rng.uniform(-2, 2), s, d, rng.random() >= disabled))
+    if cycles:
+        for s in outputs:
+            for d in hidden:
+                if rng.random() < 0.2:
+                    conns.append(Connection(len(conns) + 1, rng.uniform(-2, 2), s, d, rng.random() >= disabled))
+
+    # Outputs listed before hidden nodes, like the XOR template
+    return Network(inputs + outputs + hidden, conns)
+
+def run_rows(network: Network, rows: np.ndarray) -> np.ndarray:
+    outputs = []
+    for row in rows:
+        for node, value in zip(network.get_input_nodes(), row):
+            node.value = value
+        network.run()
+        outputs.append(network.get_output())
+    return np.array(outputs)
+
+rng = random.Random(0)
+np_rng = np.random.default_rng(0)
+for kind, cycles, disabled in [("feed-forward", False, 0.0), ("cyclic", True, 0.0), ("disabled genes", True, 0.3)]:
+    worst = 0.0
+    for _ in range(300):
+        network = random_network(rng, cycles, disabled)
+        rows = np_rng.normal(scale=2.0, size=(16, len(network.get_input_nodes())))
+        expected = run_rows(network, rows)
+        batched = network.evaluate_batch(rows)
+        assert batched.shape == expected.shape, (batched.shape, expected.shape)
+        assert np.allclose(batched, expected, rtol=1e-12, atol=1e-12), (kind, network.summary(), batched, expected)
+        worst = max(worst, float(np.abs(batched - expected).max()))
+    print(f"{kind:<16} 300 networks, largest difference {worst:.2e}")
+
+print("OK")
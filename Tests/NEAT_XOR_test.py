@@ -2,33 +2,31 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import random
 import plotly.graph_objects as go
 import matplotlib.pyplot as plt
-from NEAT.Genome import Genome
 from NEAT.Network import Network
 from NEAT.Node import Node, NodeType
 from NEAT.Connection import Connection
 from NEAT.Activations import ActivationFunctions
-from NEAT.Crossover import Crossover
+from NEAT.Population import Population
+from NEAT.PopulationEvaluator import PopulationEvaluator
+from NEAT.GenomeIO import save_genome, save_population
+from NEAT.Checkpoint import Checkpointer
+from NEAT.Lineage import LineageLog
+from NEAT.Profiler import GenerationProfiler
 
-import json
+import numpy as np
 
 base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 output_path = os.path.join(base_path, "Outputs")
 os.makedirs(output_path, exist_ok=True)
 
-def save_family_tree_to_file(family_tree, filename=os.path.join(output_path, "family_tree.json")):
-    with open(filename, "w") as file:
-        json.dump(family_tree, file, indent=4)
-
 # Constants
 POPULATION_SIZE = 10               # Size of the population
 GENERATIONS = 100                  # Number of generations to evolve
 MUTATION_RATE = 0.7                # Mutation rate for the NEAT algorithm
 ELITE_COUNT = 2                    # Number of elite genomes to carry over to the next generation
-
-family_tree = {} # Dictionary to store family tree information
+CHECKPOINT_EVERY = 10              # Write a checkpoint every this many generations
 
 # Define the nodes in the preferred order: input, output, hidden
 nodes = [
@@ -45,149 +43,64 @@ conns = [
     Connection(Innov=3, weight=0.8, from_node=nodes[3], to_node=nodes[2], enabled=True),  # Hidden to Output
 ]
 
-cross = Crossover()
-
-# Fitness function for the XOR problem
-def fitness_function(network: Network) -> float:
-    inputs = [(0, 0), (0, 1), (1, 0), (1, 1)]
-    expected_outputs = [0, 1, 1, 0]
-    fitness = 0.0
-
-    for node in network.nodes:
-        node.value = 0.0
-
-    for i, (input_1, input_2) in enumerate(inputs):
-        network.reset()  # Reset the network before each run
-        network.nodes[0].value = input_1
-        network.nodes[1].value = input_2
-        network.run()
-        output = network.get_output()[0]
-        fitness += (expected_outputs[i] - output) ** 2 # Squared error
-    return -fitness  # Negative fitness for minimization
-
-# Create initial population
-def create_population(pop_size: int) -> list:
-    population = []
-    for _ in range(pop_size):
-        new_network = Network(nodes, conns)
-        genome = Genome(new_network)
-        population.append(genome)
-        family_tree[genome.id] = {"parents": [None, None], "generation": 0}
-    return population
-
-def select_parents(population):
-    """
-    Selects two parents from the population using fitness-proportionate selection.
-    Returns a tuple of (parent1, parent2).
-    """
-    # Normalize fitness values (shift if necessary to handle negative fitness)
-    min_fitness = min(genome.network.fitness for genome in population)
-    shift = 0
-    if min_fitness < 0:
-        shift = -min_fitness + 1e-6  # Small constant to avoid zero fitness
-
-    total_fitness = sum(genome.network.fitness + shift for genome in population)
-    
-    def weighted_random_choice():
-        r = random.uniform(0, total_fitness)
-        cumulative = 0
-        for genome in population:
-            cumulative += genome.network.fitness + shift
-            if cumulative >= r:
-                return genome
-
-    parent1 = weighted_random_choice()
-    parent2 = weighted_random_choice()
-
-    # Optional: ensure they are not the same (if population is small)
-    if parent1 is parent2:
-        parent2 = weighted_random_choice()
-
-    return parent1, parent2
-
-def reproduce(genomes: list[Genome]) -> list[Genome]:
-    # 1. Sort population by fitness (higher is better)
-    sorted_population = sorted(genomes, key=lambda g: g.network.fitness, reverse=True)
-
-    # 2. Select elites (unchanged top performers)
-    elites = [genome.copy() for genome in sorted_population[:ELITE_COUNT]]
-
-    # 3. Initialize next generation with elite genomes
-    next_generation = elites.copy()
-
-    # 4. Fill the rest of the population
-    while len(next_generation) < POPULATION_SIZE:
-        parent1, parent2 = select_parents(genomes)
-
-        net1 = parent1.network.copy()
-        net2 = parent2.network.copy()
-
-        # Crossover returns a new child genome
-        child_net = cross.Crossover(net1, net2)
-        child = Genome(child_net)
-
-        child.generation = max(parent1.generation, parent2.generation) + 1
-        child.parent_ids = [parent1.id, parent2.id]
-
-        family_tree[child.id] = {"parents": [parent1.id, parent2.id], "generation": child.generation}
-
-        # Apply mutation to the child
-        child.mutate(MUTATION_RATE)
-
-        next_generation.append(child)
-
-    return next_generation
-
+# Fitness function for the XOR problem, vectorized over the whole population: outputs has shape
+# [population, cases, outputs] and the fitness is the negative squared error
+XOR_INPUTS = np.array([(0, 0), (0, 1), (1, 0), (1, 1)])
+XOR_OUTPUTS = np.array([0, 1, 1, 0])
+
+def population_fitness(outputs: np.ndarray) -> np.ndarray:
+    return -np.sum((XOR_OUTPUTS - outputs[:, :, 0]) ** 2, axis=1)
+
+evaluator = PopulationEvaluator(XOR_INPUTS, population_fitness)
+
+# Checkpoints of the whole run, run the script with --resume to continue from the newest one
+checkpointer = Checkpointer(os.path.join(output_path, "checkpoints"), every=CHECKPOINT_EVERY)
+
+# Parents of every genome, query with: python query_lineage.py Outputs/lineage.bin <genome id>
+lineage_path = os.path.join(output_path, "lineage.bin")
+
+# Per-phase timings of every generation, with --profile
+profiler = None
+if "--profile" in sys.argv:
+    profiler = GenerationProfiler(os.path.join(output_path, "profile.jsonl"), os.path.join(output_path, "metrics.prom"))
+
+if "--resume" in sys.argv and checkpointer.latest() is not None:
+    lineage = LineageLog(lineage_path, append=True)
+    population = checkpointer.restore(evaluator=evaluator, lineage=lineage, profiler=profiler)
+    print(f"Resuming from generation {population.generation}")
+else:
+    # The Population owns selection, crossover, mutation and the generation loop
+    population = Population(
+        Network(nodes, conns),
+        size=POPULATION_SIZE,
+        elite_count=ELITE_COUNT,
+        mutation_rate=MUTATION_RATE,
+        evaluator=evaluator,
+        lineage=LineageLog(lineage_path),
+        profiler=profiler,
+    )
+    population.genomes[0].phenotype.visualize()
+
+def on_generation(population: Population, gen_fitnesses: np.ndarray):
+    print(f"Generation {population.generation - 1}: Avg Fitness = {population.avg_fitnesses[-1]:.4f}, Best Fitness = {population.best_fitnesses[-1]:.4f}")
+    checkpointer(population, gen_fitnesses)
 
 # Main evolution loop
-genomes: list[Genome] = create_population(POPULATION_SIZE)
-best_fitnesses = []
-avg_fitnesses = []
-
-solved_genome = None
-
-genomes[0].phenotype.visualize()
-
-for gen in range(GENERATIONS):
-
-    gen_fitnesses = []
-
-    for genome in genomes:
-        fitness = fitness_function(genome.network)
-        genome.network.fitness = fitness  # Add this line
-        gen_fitnesses.append(fitness)
-        if solved_genome == None or genome.network.fitness > solved_genome.network.fitness:
-            solved_genome = genome
-
-    if solved_genome.network.fitness == -1.0:
-        print("Solution found!")
-        break
-
-    avg_fitness = sum(gen_fitnesses) / len(gen_fitnesses)
-    best_fitness = max(gen_fitnesses)
-
-    avg_fitnesses.append(avg_fitness)
-    best_fitnesses.append(best_fitness)
-
-    best_genome = genomes[gen_fitnesses.index(best_fitness)]
-    print(f"Generation {gen}: Avg Fitness = {avg_fitness:.4f}, Best Fitness = {best_fitness:.4f}")
-
-    genomes = reproduce(genomes)
-    
-
-    # Reset the fitnesses of the genomes
-    for genome in genomes:
-        genome.network.fitness = 0.0
-    
-    # Shuffle the genomes
-    random.shuffle(genomes)
+with checkpointer:
+    best_genome = population.run(GENERATIONS - population.generation, callback=on_generation)
+population.lineage.close()
+if profiler is not None:
+    profiler.close()
+avg_fitnesses = population.avg_fitnesses
+best_fitnesses = population.best_fitnesses
+best_fitness = best_genome.network.fitness
 
 
 # Save the fitness data to a text file
 output_fitness = os.path.join(output_path, "fitness_summary.txt")
 with open(output_fitness, "w") as f:
     f.write("gen | avg | best\n")
-    for gen in range(GENERATIONS):
+    for gen in range(len(best_fitnesses)):
         f.write(f"{gen} | {avg_fitnesses[gen]:.4f} | {best_fitnesses[gen]:.4f}\n")
 
 print(f"Fitness summary saved to {output_path}")
@@ -197,46 +110,17 @@ best_genome_path = os.path.join(output_path, "best_genome.txt")
 with open(best_genome_path, "w") as f:
     f.write(str(best_genome.network.summary()))
 
-# Save the best genome to a json file for later use
-
-# Build node lists by type
-input_nodes = [node for node in best_genome.network.get_input_nodes()]
-hidden_nodes = [node for node in best_genome.network.get_hidden_nodes()]
-output_nodes = [node for node in best_genome.network.get_output_nodes()]
-
-# Build connection list
-connections = [
-    {
-        "innovation": conn.Innov,
-        "from": conn.from_node.id,
-        "to": conn.to_node.id,
-        "weight": conn.weight,
-        "enabled": conn.enabled
-    }
-    for conn in best_genome.network.conns
-]
-
-# Construct the full genome dictionary
-genome_data = {
-    "nodes": {
-        "input": [input_node.__repr__() for input_node in input_nodes],
-        "output": [output_node.__repr__() for output_node in output_nodes],
-        "hidden": [hidden_node.__repr__() for hidden_node in hidden_nodes]
-    },
-    "connections": connections,
-    "fitness": best_genome.network.fitness
-}
+# Save the best genome in the binary genome format for later use (see load_genome.py)
+save_genome(best_genome, os.path.join(output_path, "best_genome.npz"))
 
-# Save as JSON
-json_path = os.path.join(output_path, "best_genome.json")
-with open(json_path, "w") as f:
-    json.dump(genome_data, f, indent=4)
+# Save the final population, PopulationFile can read single genomes back without loading all of it
+save_population(population.genomes, os.path.join(output_path, "population.neatpop"))
 
 
 # Create a matplotlib plot for saving as PNG
 plt.figure(figsize=(10, 6))
-plt.plot(range(GENERATIONS), avg_fitnesses, label='Avg Fitness', linestyle='--')
-plt.plot(range(GENERATIONS), best_fitnesses, label='Best Fitness', linestyle='-')
+plt.plot(range(len(avg_fitnesses)), avg_fitnesses, label='Avg Fitness', linestyle='--')
+plt.plot(range(len(best_fitnesses)), best_fitnesses, label='Best Fitness', linestyle='-')
 plt.title('Fitness Comparison Between Iterations')
 plt.xlabel('Generation')
 plt.ylabel('Fitness')
@@ -256,7 +140,7 @@ fig = go.Figure()
 
 # Add traces (Avg Fitness and Best Fitness)
 fig.add_trace(go.Scatter(
-    x=list(range(GENERATIONS)),
+    x=list(range(len(best_fitnesses))),
     y=avg_fitnesses,
     mode='lines',
     name="Avg Fitness Iteration",
@@ -264,7 +148,7 @@ fig.add_trace(go.Scatter(
 ))
 
 fig.add_trace(go.Scatter(
-    x=list(range(GENERATIONS)),
+    x=list(range(len(best_fitnesses))),
     y=best_fitnesses,
     mode='lines',
     name="Best Fitness Iteration",
@@ -280,7 +164,6 @@ fig.update_layout(
     template="plotly_dark"
 )
 
-save_family_tree_to_file(family_tree)
 
 # Show the interactive plot
 # fig.show()
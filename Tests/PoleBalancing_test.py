@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+from NEAT.Network import Network
+from NEAT.Node import Node, NodeType
+from NEAT.Connection import Connection
+from NEAT.Activations import ActivationFunctions
+from NEAT.Population import Population
+from NEAT.Rollout import Rollout
+from NEAT.PoleBalancing import SinglePoleBalancing, DoublePoleBalancing
+
+# Constants
+POPULATION_SIZE = 150              # Size of the population
+GENERATIONS = 100                  # Maximum number of generations to evolve
+MUTATION_RATE = 0.7                # Mutation rate for the NEAT algorithm
+ELITE_COUNT = 2                    # Number of elite genomes to carry over to the next generation
+MAX_STEPS = 100_000                # Time steps a network has to keep the poles up to solve the task
+DOUBLE_POLE = "--double" in sys.argv
+
+env_class = DoublePoleBalancing if DOUBLE_POLE else SinglePoleBalancing
+
+# One input node per observation and a single output node for the force on the cart
+nodes = [Node(i + 1, NodeType.INPUT, 0.0) for i in range(env_class.observation_size)]
+output = Node(len(nodes) + 1, NodeType.OUTPUT, 0.0, ActivationFunctions.TanH)
+conns = [Connection(Innov=i + 1, weight=0.5, from_node=node, to_node=output, enabled=True) for i, node in enumerate(nodes)]
+template = Network(nodes + [output], conns)
+
+rollout = Rollout(env_class, max_steps=MAX_STEPS, seed=0)
+population = Population(template, size=POPULATION_SIZE, elite_count=ELITE_COUNT,
+                        mutation_rate=MUTATION_RATE, evaluator=rollout, seed=0)
+
+def on_generation(population: Population, gen_fitnesses):
+    print(f"Generation {population.generation - 1}: Avg = {population.avg_fitnesses[-1]:.1f} steps, Best = {population.best_fitnesses[-1]:.0f} steps")
+
+start = time.perf_counter()
+population.run(GENERATIONS, target_fitness=MAX_STEPS, callback=on_generation)
+print(f"{'Double' if DOUBLE_POLE else 'Single'} pole balancing: best {population.best_genome.network.fitness:.0f} "
+      f"of {MAX_STEPS} steps after {population.generation} generations ({time.perf_counter() - start:.1f}s)")
@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from NEAT.Node import Node, NodeType
+from NEAT.Connection import Connection
+from NEAT.Network import Network
+from NEAT.Activations import ActivationFunctions
+from NEAT.Population import Population
+
+# Checks the parent selection of Population: fitness-proportionate selection draws every
+# genome in proportion to its fitness, and a tournament always picks its fittest entrant.
+
+DRAWS = 200000
+
+nodes = [
+    Node(1, NodeType.INPUT, 0.0),
+    Node(2, NodeType.OUTPUT, 0.0, ActivationFunctions.TanH, 0.0),
+]
+template = Network(nodes, [Connection(1, 0.5, nodes[0], nodes[1])])
+
+def no_fitness(network: Network) -> float:
+    return 0.0  # Never called, the fitness vectors below are passed to the selection directly
+
+def frequencies(picks: np.ndarray, size: int) -> np.ndarray:
+    return np.bincount(picks, minlength=size) / len(picks)
+
+# Fitness-proportionate, positive fitness: P(i) = f_i / sum(f)
+population = Population(template, no_fitness, size=5, selection="proportionate", seed=0)
+fitness = np.array([1.0, 2.0, 3.0, 4.0, 10.0])
+expected = fitness / fitness.sum()
+observed = frequencies(population._draw(fitness, DRAWS), len(fitness))
+print(f"Proportionate: expected {np.round(expected, 4)}, observed {np.round(observed, 4)}")
+assert np.allclose(observed, expected, atol=0.005), (observed, expected)
+
+# Negative fitness is shifted so the weakest genome gets (almost) no chance
+fitness = np.array([-5.0, -3.0, -1.0, 0.0, 2.0])
+shifted = fitness - fitness.min()
+expected = shifted / shifted.sum()
+observed = frequencies(population._draw(fitness, DRAWS), len(fitness))
+print(f"Shifted:       expected {np.round(expected, 4)}, observed {np.round(observed, 4)}")
+assert np.allclose(observed, expected, atol=0.005), (observed, expected)
+
+# Equal fitness: every genome is as likely as any other
+fitness = np.zeros(5)
+observed = frequencies(population._draw(fitness, DRAWS), len(fitness))
+assert np.allclose(observed, 0.2, atol=0.005), observed
+
+# Tournament: replay the entrants from the same generator state, the winner is always their maximum
+population = Population(template, no_fitness, size=8, selection="tournament", tournament_size=3, seed=0)
+fitness = np.array([0.5, -2.0, 7.0, 3.0, 1.0, 6.5, -1.0, 2.0])
+state = population.rng.bit_generator.state
+picks = population._draw(fitness, DRAWS)
+population.rng.bit_generator.state = state
+entrants = population.rng.integers(0, len(fitness), size=(DRAWS, population.tournament_size))
+assert (fitness[picks] == fitness[entrants].max(axis=1)).all()
+
+# With k entrants drawn with replacement, the genome of rank r (0 = weakest) wins with
+# probability ((r + 1) / n) ** k - (r / n) ** k
+n, k = len(fitness), population.tournament_size
+rank = np.argsort(np.argsort(fitness))
+expected = ((rank + 1) / n) ** k - (rank / n) ** k
+observed = frequencies(picks, n)
+print(f"Tournament:    expected {np.round(expected, 4)}, observed {np.round(observed, 4)}")
+assert np.allclose(observed, expected, atol=0.005), (observed, expected)
+
+# A tournament as big as the population almost always finds the best genome
+population.tournament_size = 64
+assert (population._draw(fitness, 1000) == np.argmax(fitness)).mean() > 0.99
+
+print("OK")
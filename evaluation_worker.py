@@ -0,0 +1,29 @@
+# evaluation_worker.py
+# Worker for NEAT.DistributedEvaluator: connects to a coordinator, evaluates genomes
+# until the coordinator closes. Start as many as the machine has cores.
+# The module of the fitness function has to be importable here (see --path).
+#
+#   python evaluation_worker.py coordinator-host:50000 --authkey secret --path Tests
+import argparse
+import os
+import sys
+from NEAT.DistributedEvaluator import run_worker
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate genomes for a DistributedEvaluator coordinator.")
+    parser.add_argument("address", help="host:port of the coordinator")
+    parser.add_argument("--authkey", default=os.environ.get("NEAT_AUTHKEY"),
+                        help="Authkey of the coordinator (default: the NEAT_AUTHKEY environment variable)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Tasks taken per request")
+    parser.add_argument("--path", action="append", default=[], help="Directory to add to sys.path, can be repeated")
+    args = parser.parse_args()
+
+    if args.authkey is None:
+        parser.error("--authkey or NEAT_AUTHKEY is required")
+    host, _, port = args.address.rpartition(":")
+    sys.path[:0] = [os.path.abspath(path) for path in args.path]
+
+    run_worker((host, int(port)), args.authkey.encode(), args.batch_size)
+
+if __name__ == "__main__":
+    main()
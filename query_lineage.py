@@ -0,0 +1,28 @@
+# query_lineage.py
+# Print the ancestry of a genome from a lineage log written by NEAT.Lineage.LineageLog.
+# Only the records on the ancestry path are read from the file.
+#
+#   python query_lineage.py Outputs/lineage.bin 1234 --max-depth 5
+import argparse
+from NEAT.Lineage import LineageReader
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the ancestry of a genome from a lineage log.")
+    parser.add_argument("path", help="Lineage file written by LineageLog")
+    parser.add_argument("genome_id", type=int, help="Genome to trace")
+    parser.add_argument("--max-depth", type=int, default=None, help="Stop after this many generations of ancestors")
+    args = parser.parse_args()
+
+    reader = LineageReader(args.path)
+    ancestry = reader.ancestry(args.genome_id, args.max_depth)
+    if not ancestry:
+        print(f"Genome {args.genome_id} is not in {args.path}")
+        return
+
+    print("depth | genome | generation | parents")
+    for genome_id, parent_1, parent_2, generation, depth in ancestry:
+        parents = ", ".join(str(p) for p in (parent_1, parent_2) if p is not None) or "-"
+        print(f"{depth} | {genome_id} | {generation} | {parents}")
+
+if __name__ == "__main__":
+    main()
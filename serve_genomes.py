@@ -0,0 +1,45 @@
+# serve_genomes.py
+# Serve predictions of saved genomes over HTTP (see NEAT.InferenceServer).
+# Models are given as name=path, or just a path (named after the file). Genome files are
+# watched and reloaded when they change, e.g. when a run saves a new best genome.
+#
+#   python serve_genomes.py xor=Outputs/best_genome.npz --port 8000
+#   curl -s localhost:8000/predict/xor -d '{"inputs": [[0, 1], [1, 1]]}'
+import argparse
+import os
+from NEAT.InferenceServer import InferenceServer
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve predictions of saved genomes with micro-batching.")
+    parser.add_argument("genomes", nargs="*", default=["Outputs/best_genome.npz"],
+                        help="[name=]path of an .npz (or legacy .json) genome, can be repeated")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--unix-socket", help="Listen on this Unix socket instead of host:port")
+    parser.add_argument("--max-batch-size", type=int, default=256, help="Most rows per batched pass")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0, help="How long a batch waits for more requests")
+    parser.add_argument("--reload-interval", type=float, default=1.0,
+                        help="Seconds between checks for changed genome files, 0 turns reloading off")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    genomes = {}
+    for spec in args.genomes:
+        name, _, path = spec.rpartition("=")
+        genomes[name or os.path.splitext(os.path.basename(path))[0]] = path
+
+    server = InferenceServer(genomes, args.host, args.port, args.unix_socket, args.max_batch_size,
+                             args.max_delay_ms, args.reload_interval, args.verbose)
+    for name, model in server.models.items():
+        print(f"{name}: {model.path} ({model.n_inputs} inputs, {model.n_outputs} outputs)")
+    address = args.unix_socket or f"http://{server.address[0]}:{server.address[1]}"
+    print(f"Serving on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    main()